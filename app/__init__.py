@@ -8,20 +8,36 @@ import os
 import sys
 import json
 import uuid
+import time
 import traceback
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, g, render_template, request, jsonify, session
 from flask_cors import CORS
 from datetime import datetime
-
-# Google Sheets Integration
-import gspread
-from google.oauth2 import service_account
+from functools import lru_cache
 
 def create_app():
     app = Flask(__name__)
     app.secret_key = os.environ.get('SECRET_KEY', 'pc-mlra-secret-key-2026')
     CORS(app)
     
+    # HTTP caching for deterministic endpoints
+    from app.utils.http_cache import (
+        DEFAULT_CACHE_CONTROL, DEFAULT_QUERY_CACHE_CONTROL,
+        make_etag, is_not_modified, add_validators, not_modified_response
+    )
+    app.config['API_CACHE_CONTROL'] = os.environ.get('API_CACHE_CONTROL', DEFAULT_CACHE_CONTROL)
+    app.config['API_QUERY_CACHE_CONTROL'] = os.environ.get('API_QUERY_CACHE_CONTROL', DEFAULT_QUERY_CACHE_CONTROL)
+    
+    # Negotiated gzip/brotli for bodies above the threshold (0 disables)
+    from app.utils.compression import DEFAULT_MIN_SIZE, install_compression, negotiate
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE))
+    if app.config['COMPRESSION_MIN_SIZE'] > 0:
+        install_compression(app, app.config['COMPRESSION_MIN_SIZE'])
+    
+    # Bulk clients
+    app.config['BATCH_MAX_QUERIES'] = int(os.environ.get('BATCH_MAX_QUERIES', 500))
+    app.config['BATCH_CHUNK_SIZE'] = int(os.environ.get('BATCH_CHUNK_SIZE', 32))
+    
     # Get the absolute path
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -30,58 +46,151 @@ def create_app():
     sys.path.insert(0, os.path.join(current_dir, '..'))
     sys.path.insert(0, src_dir)
     
-    # Initialize PC-MLRA system
+    # Initialize PC-MLRA system; the engine is stateless and shared by all requests
     pc_mlra = None
     try:
-        from src.main import PCMLRAConsole
-        pc_mlra = PCMLRAConsole()
-        app.logger.info('✅ PC-MLRA system initialized')
+        build_started = time.perf_counter()
+        from src.engine import PCMLRAEngine, top_intent
+        pc_mlra = PCMLRAEngine()
+        app.engine_build_seconds = time.perf_counter() - build_started
+        app.logger.info(f'✅ PC-MLRA system initialized in {app.engine_build_seconds * 1000:.1f} ms')
     except Exception as e:
         app.logger.warning(f'⚠️ PC-MLRA core not available: {e}')
         pc_mlra = None
     
-    # Initialize Google Sheets
-    google_sheets_initialized = False
-    try:
-        creds_path = os.environ.get('GOOGLE_CREDENTIALS_PATH', './config/secrets/google_sheets_credentials.json')
-        sheet_id = os.environ.get('GOOGLE_SHEET_ID')
-        
-        if sheet_id and os.path.exists(creds_path):
-            scopes = ['https://www.googleapis.com/auth/spreadsheets']
-            credentials = service_account.Credentials.from_service_account_file(creds_path, scopes=scopes)
-            gc = gspread.authorize(credentials)
-            sheet = gc.open_by_key(sheet_id)
-            worksheet = sheet.get_worksheet(0)
-            
-            # Add headers if empty
-            if not worksheet.get_all_values():
-                headers = ['Timestamp', 'Query', 'Response', 'Intent', 'User IP', 'Session ID']
-                worksheet.append_row(headers)
-            
-            app.google_sheets = worksheet
-            google_sheets_initialized = True
-            app.logger.info(f'✅ Google Sheets connected: {sheet.title}')
-        else:
-            app.logger.warning('⚠️ Google Sheets not configured')
-            app.google_sheets = None
-    except Exception as e:
-        app.logger.error(f'❌ Google Sheets initialization failed: {e}')
-        app.google_sheets = None
+    engine_fingerprint = pc_mlra.engine_fingerprint if pc_mlra is not None else 'demo-mode'
     
-    # In-memory chat storage
-    chat_histories = {}
+    # Stats and examples never change for a given engine: serialize them once
+    from app.services.payload_snapshot import build_payload_snapshot
+    payload_snapshot = build_payload_snapshot(
+        engine_fingerprint, pc_mlra.kb if pc_mlra is not None else None,
+        dumps=lambda payload: app.json.dumps(payload, separators=(',', ':')) + '\n'
+    )
     
-    # Helper functions
-    def format_response_for_html(response_text):
-        """Format response text for HTML display"""
-        if not response_text:
-            return ""
-        formatted = response_text
-        formatted = formatted.replace('## ', '<h3>').replace('\n\n', '</h3>\n')
-        formatted = formatted.replace('**', '<strong>').replace('**', '</strong>')
-        formatted = formatted.replace('\n', '<br>')
-        return formatted
+    # Options such as show_proof come with each request, never from shared state
+    from app.utils.query_options import parse_bool, parse_query_options
+    
+    # Demo and error text come without engine HTML
+    from app.utils.formatters import format_response_for_html, format_structured_response
+    
+    # Google Sheets logging: connected and written from a background thread
+    # that starts with the first request, never during worker boot
+    from app.services.sheets_log_queue import SheetsLogQueue, connect_worksheet, make_log_row
+    creds_path = os.environ.get('GOOGLE_CREDENTIALS_PATH', './config/secrets/google_sheets_credentials.json')
+    sheet_id = os.environ.get('GOOGLE_SHEET_ID')
+    app.google_sheets = None
+    
+    def on_sheets_connected(worksheet):
+        app.google_sheets = worksheet
+    
+    sheets_log_queue = SheetsLogQueue(
+        connect=lambda: connect_worksheet(creds_path, sheet_id, app.logger),
+        max_size=int(os.environ.get('SHEETS_LOG_QUEUE_SIZE', 1000)),
+        on_connect=on_sheets_connected,
+        logger=app.logger
+    )
+    app.sheets_log_queue = sheets_log_queue
+    
+    @app.before_request
+    def start_background_integrations():
+        sheets_log_queue.start()
+    
+    # In-memory chat storage, shared by the threads of a worker
+    from app.services.chat_history import ChatHistoryStore
+    chat_histories = ChatHistoryStore()
+    app.chat_histories = chat_histories
+    
+    # Identical concurrent queries share one pipeline run
+    from app.services.query_coalescer import QueryCoalescer
+    query_coalescer = QueryCoalescer()
+    app.query_coalescer = query_coalescer
+    
+    # Prometheus metrics, summed across gunicorn workers via PC_MLRA_METRICS_DIR
+    from app.services.metrics_registry import MetricsRegistry
+    from src.stage_timing import STAGE_HISTOGRAMS
+    metrics = MetricsRegistry(
+        directory=os.environ.get('PC_MLRA_METRICS_DIR'),
+        flush_interval=float(os.environ.get('PC_MLRA_METRICS_FLUSH_INTERVAL', 5))
+    )
+    app.metrics = metrics
+    metrics.describe('pc_mlra_http_requests_total', 'counter', 'HTTP requests by route, method and status')
+    metrics.describe('pc_mlra_http_request_duration_seconds', 'histogram', 'HTTP request latency by route')
+    metrics.describe('pc_mlra_pipeline_stage_duration_seconds', 'histogram',
+                     'Pipeline stage latency (requires PC_MLRA_STAGE_TIMING=true)')
+    metrics.describe('pc_mlra_response_cache_hits_total', 'counter', 'Engine response cache hits')
+    metrics.describe('pc_mlra_response_cache_misses_total', 'counter', 'Engine response cache misses')
+    metrics.describe('pc_mlra_response_cache_hit_ratio', 'gauge', 'Engine response cache hit ratio across workers')
+    metrics.describe('pc_mlra_log_queue_depth', 'gauge', 'Google Sheets rows waiting to be written')
+    metrics.describe('pc_mlra_log_queue_dropped_total', 'counter', 'Google Sheets rows dropped')
+    metrics.describe('pc_mlra_log_queue_sent_total', 'counter', 'Google Sheets rows written')
+    metrics.describe('pc_mlra_log_queue_failed_total', 'counter', 'Google Sheets rows that failed to write')
+    metrics.describe('pc_mlra_query_coalescing_total', 'counter', 'Query pipeline runs executed vs coalesced')
+    metrics.describe('pc_mlra_responses_by_template_total', 'counter', 'Responses produced per template id')
+    metrics.describe('pc_mlra_responses_by_intent_total', 'counter', 'Responses produced per top intent')
+    metrics.describe('pc_mlra_engine_info', 'gauge', 'Engine version fingerprint and knowledge base version')
+    
+    def collect_component_metrics(snapshot):
+        for stage, hist in STAGE_HISTOGRAMS.snapshot().items():
+            snapshot.histogram('pc_mlra_pipeline_stage_duration_seconds', hist['buckets'], hist['sum'],
+                               {'stage': stage})
+        if pc_mlra is not None:
+            cache_stats = pc_mlra.assembler.response_cache.stats()
+            snapshot.counter('pc_mlra_response_cache_hits_total', cache_stats['hits'])
+            snapshot.counter('pc_mlra_response_cache_misses_total', cache_stats['misses'])
+        queue_stats = sheets_log_queue.stats()
+        snapshot.gauge('pc_mlra_log_queue_depth', queue_stats['depth'])
+        snapshot.counter('pc_mlra_log_queue_dropped_total', queue_stats['dropped'])
+        snapshot.counter('pc_mlra_log_queue_sent_total', queue_stats['sent'])
+        snapshot.counter('pc_mlra_log_queue_failed_total', queue_stats['failed'])
+        coalescing = query_coalescer.stats()
+        snapshot.counter('pc_mlra_query_coalescing_total', coalescing['executed'], {'outcome': 'executed'})
+        snapshot.counter('pc_mlra_query_coalescing_total', coalescing['coalesced'], {'outcome': 'coalesced'})
+    
+    metrics.add_collector(collect_component_metrics)
+    
+    def count_response(proof_trace):
+        intent = proof_trace.matched_intents[0][0] if proof_trace.matched_intents else 'none'
+        metrics.inc('pc_mlra_responses_by_template_total', {'template_id': proof_trace.template_used})
+        metrics.inc('pc_mlra_responses_by_intent_total', {'intent': intent})
+    
+    if pc_mlra is not None:
+        pc_mlra.assembler.add_response_listener(count_response)
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe('pc_mlra_http_request_duration_seconds', time.perf_counter() - started,
+                            {'route': route})
+            metrics.inc('pc_mlra_http_requests_total',
+                        {'route': route, 'method': request.method, 'status': str(response.status_code)})
+            metrics.maybe_flush()
+        return response
     
+    # Per-client token buckets, shared by all workers through RATELIMIT_STORAGE_PATH
+    # (installed after the metrics hooks so rejected requests are still counted)
+    from app.services.rate_limiter import DEFAULT_RATE_LIMITS, build_rate_limiter, install_rate_limiting
+    app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', 'false').lower() == 'true'
+    app.config['RATELIMIT_DEFAULT'] = os.environ.get('RATELIMIT_DEFAULT', DEFAULT_RATE_LIMITS)
+    app.config['RATELIMIT_PER_SESSION'] = os.environ.get('RATELIMIT_PER_SESSION')
+    app.config['RATELIMIT_STORAGE_PATH'] = os.environ.get('RATELIMIT_STORAGE_PATH')
+    # Reverse proxies in front of the app (Render's router is one): buckets are keyed on the
+    # X-Forwarded-For address they append, not on the proxy's own. Never trust more than exist.
+    app.config['RATELIMIT_TRUSTED_PROXIES'] = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 0))
+    if app.config['RATELIMIT_TRUSTED_PROXIES'] > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['RATELIMIT_TRUSTED_PROXIES'])
+    if app.config['RATELIMIT_ENABLED']:
+        install_rate_limiting(app, build_rate_limiter(app.config['RATELIMIT_DEFAULT'],
+                                                      app.config['RATELIMIT_STORAGE_PATH'],
+                                                      app.config['RATELIMIT_PER_SESSION']))
+    
+    # Helper functions
     def demo_process_query(query):
         """Demo response if PC-MLRA is not available"""
         demo_responses = {
@@ -97,23 +206,11 @@ def create_app():
         return f"I understand you're asking about '{query}'."
     
     def log_to_google_sheets(app, query, response, intent, user_ip='', session_id=''):
-        """Log query to Google Sheets"""
-        if not hasattr(app, 'google_sheets') or not app.google_sheets:
-            return {'status': 'error', 'message': 'Google Sheets not configured'}
-        
-        try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            query_short = query[:200] + '...' if len(query) > 200 else query
-            response_short = response[:200] + '...' if response and len(response) > 200 else (response or '')
-            
-            row_data = [timestamp, query_short, response_short, intent, user_ip, session_id]
-            app.google_sheets.append_row(row_data)
-            
-            return {'status': 'success', 'message': 'Logged to Google Sheets'}
-            
-        except Exception as e:
-            app.logger.error(f'⚠️ Failed to log to Google Sheets: {e}')
-            return {'status': 'error', 'message': str(e)}
+        """Queue a query for Google Sheets logging"""
+        row_data = make_log_row(query, response, intent, user_ip, session_id)
+        if sheets_log_queue.enqueue(row_data):
+            return {'status': 'queued', 'message': 'Queued for Google Sheets'}
+        return {'status': 'error', 'message': f'Google Sheets logging unavailable ({sheets_log_queue.state})'}
     # Routes
     @app.route('/')
     def index():
@@ -123,7 +220,7 @@ def create_app():
     def chat():
         if 'session_id' not in session:
             session['session_id'] = str(uuid.uuid4())
-            chat_histories[session['session_id']] = []
+            chat_histories.start(session['session_id'])
         return render_template('chat.html')
     
     @app.route('/api/health')
@@ -135,28 +232,33 @@ def create_app():
             'timestamp': datetime.now().isoformat()
         })
     
+    @app.route('/metrics')
+    def prometheus_metrics():
+        snapshot = metrics.collect_all()
+        counters = snapshot.data['counters']
+        hits = sum(counters.get('pc_mlra_response_cache_hits_total', {}).values())
+        misses = sum(counters.get('pc_mlra_response_cache_misses_total', {}).values())
+        snapshot.gauge('pc_mlra_response_cache_hit_ratio', hits / (hits + misses) if hits + misses else 0.0)
+        kb_version = pc_mlra.kb.get_metadata().get('version', 'unknown') if pc_mlra is not None else 'demo'
+        snapshot.gauge('pc_mlra_engine_info', 1, {'fingerprint': engine_fingerprint, 'kb_version': kb_version})
+        return Response(metrics.render(snapshot), content_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    def serve_static_payload(name):
+        """Send a pre-serialized payload, gzipped if the client accepts it"""
+        cache_control = app.config['API_CACHE_CONTROL']
+        body, etag, encoding = payload_snapshot[name].variant(negotiate(request.accept_encodings.quality))
+        if is_not_modified(request, etag):
+            response = not_modified_response(etag, cache_control)
+        else:
+            response = add_validators(app.response_class(body, mimetype='application/json'), etag, cache_control)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+    
     @app.route('/api/system/stats')
     def get_system_stats():
-        try:
-            if pc_mlra is None:
-                return jsonify({
-                    'system_name': 'PC-MLRA (Demo Mode)',
-                    'version': '1.0.0',
-                    'total_clauses': 46,
-                    'system_status': 'demo_mode'
-                })
-            
-            metadata = pc_mlra.kb.get_metadata()
-            clauses = pc_mlra.kb.get_all_clauses()
-            
-            return jsonify({
-                'system_name': metadata.get('system_name', 'PC-MLRA'),
-                'version': metadata.get('version', '1.0.0'),
-                'total_clauses': len(clauses),
-                'system_status': 'operational'
-            })
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+        return serve_static_payload('system_stats')
     
     @app.route('/api/query', methods=['POST'])
     def process_query():
@@ -172,25 +274,31 @@ def create_app():
             # Get or create session
             if 'session_id' not in session:
                 session['session_id'] = str(uuid.uuid4())
-                chat_histories[session['session_id']] = []
+                chat_histories.start(session['session_id'])
             
             session_id = session['session_id']
             
+            try:
+                options = parse_query_options(data, html=True)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
             # Process query
             response_data = {}
             intent = "unknown"
             
             if pc_mlra is not None:
                 try:
-                    result = pc_mlra.process_query(query_text)
-                    if result:
-                        if isinstance(result, dict):
-                            response_data = result
-                        else:
-                            response_data = {'response': str(result), 'intent': 'general_query'}
-                        intent = response_data.get('intent', 'unknown')
-                    else:
-                        response_data = {'response': "I couldn't process your query. Please try rephrasing.", 'intent': 'unknown'}
+                    coalesce_key = query_coalescer.key_for(query_text, options.show_proof, options.output_format)
+                    result = query_coalescer.run(coalesce_key, lambda: pc_mlra.answer(query_text, options))
+                    response_data = {'response': result.log_text, 'html': result.html, 'intent': result.intent}
+                    if result.sections is not None:
+                        response_data['sections'] = [
+                            {'section': section, 'text': text} for section, text in result.sections
+                        ]
+                    if result.components is not None:
+                        response_data['structured'] = format_structured_response(result, options.show_proof)
+                    intent = result.intent
                 except Exception as e:
                     response_data = {'response': f'System error: {str(e)}', 'intent': 'error'}
             else:
@@ -207,8 +315,8 @@ def create_app():
                     user_ip=request.remote_addr,
                     session_id=session_id
                 )
-                if log_result['status'] == 'success':
-                    app.logger.info('✅ Query logged to Google Sheets')
+                if log_result['status'] == 'queued':
+                    app.logger.debug('✅ Query queued for Google Sheets')
             except Exception as e:
                 app.logger.error(f'⚠️ Google Sheets logging error: {e}')
             
@@ -221,35 +329,193 @@ def create_app():
                 'intent': intent
             }
             
-            if session_id in chat_histories:
-                chat_histories[session_id].append(chat_entry)
-                if len(chat_histories[session_id]) > 50:
-                    chat_histories[session_id] = chat_histories[session_id][-50:]
+            chat_histories.append(session_id, chat_entry)
             
             # Return response
-            return jsonify({
+            payload = {
                 'status': 'success',
                 'query': query_text,
                 'response': response_data.get('response', ''),
-                'response_html': format_response_for_html(response_data.get('response', '')),
+                'response_html': response_data.get('html') or format_response_for_html(response_data.get('response', '')),
                 'intent': intent,
                 'timestamp': timestamp,
                 'session_id': session_id
-            })
+            }
+            if 'sections' in response_data:
+                payload['sections'] = response_data['sections']
+            if 'structured' in response_data:
+                # format=json: components instead of the assembled text
+                del payload['response'], payload['response_html']
+                payload.update(response_data['structured'])
+            # No ETag: every body carries its own timestamp and session, and every
+            # query must reach the Sheets log and chat history above
+            response = jsonify(payload)
+            response.headers['Cache-Control'] = app.config['API_QUERY_CACHE_CONTROL']
+            return response
             
         except Exception as e:
             app.logger.error(f'Error in /api/query: {e}')
             return jsonify({'error': 'Internal server error'}), 500
     
+    @app.route('/api/query/stream', methods=['GET', 'POST'])
+    def stream_query():
+        """
+        Server-Sent Events: the response section by section, headline first, proof trace last.
+        POST takes the /api/query body, keeping the complaint out of URLs and access logs;
+        GET (?q=) serves EventSource clients.
+        """
+        from app.utils.formatters import format_sse_event
+        
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+        else:
+            data = request.args
+        query_text = str(data.get('query', data.get('q', ''))).strip()
+        if not query_text:
+            return jsonify({'error': 'Query cannot be empty'}), 400
+        try:
+            show_proof = parse_bool(data.get('show_proof', True), 'show_proof')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if 'session_id' not in session:
+            session['session_id'] = str(uuid.uuid4())
+            chat_histories.start(session['session_id'])
+        session_id = session['session_id']
+        user_ip = request.remote_addr
+        
+        decision = None
+        if pc_mlra is not None:
+            try:
+                decision = pc_mlra.assembler.decide(query_text, show_proof)
+                sections = pc_mlra.assembler.render_sections(decision, show_proof)
+                intent = top_intent(decision.proof_trace)
+            except Exception as e:
+                app.logger.error(f'Error in /api/query/stream: {e}')
+                return jsonify({'error': 'Internal server error'}), 500
+        else:
+            sections = iter([('message', demo_process_query(query_text))])
+            intent = 'demo_mode'
+        
+        def generate():
+            parts = []
+            for section, text in sections:
+                parts.append(text)
+                yield format_sse_event('section', {'section': section, 'text': text})
+            
+            response_text = ''.join(parts)
+            timestamp = datetime.now().isoformat()
+            # The formatted answer, as /api/query returns it, replaces the streamed text
+            if decision is not None:
+                response_html = pc_mlra.assembler.render_html(decision, show_proof)
+            else:
+                response_html = format_response_for_html(response_text)
+            yield format_sse_event('done', {
+                'status': 'success',
+                'query': query_text,
+                'intent': intent,
+                'response_html': response_html,
+                'timestamp': timestamp,
+                'session_id': session_id
+            })
+            
+            # Bookkeeping happens after the client already has everything
+            try:
+                log_to_google_sheets(app, query=query_text, response=response_text, intent=intent,
+                                     user_ip=user_ip, session_id=session_id)
+            except Exception as e:
+                app.logger.error(f'⚠️ Google Sheets logging error: {e}')
+            chat_histories.append(session_id, {
+                'timestamp': timestamp,
+                'query': query_text,
+                'response': response_text,
+                'intent': intent
+            })
+        
+        response = Response(generate(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    @app.route('/api/query/batch', methods=['POST'])
+    def process_query_batch():
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('queries'), list):
+            return jsonify({'error': 'Request body must contain a "queries" array'}), 400
+        
+        queries = data['queries']
+        max_queries = app.config['BATCH_MAX_QUERIES']
+        if not queries:
+            return jsonify({'error': 'No queries provided'}), 400
+        if len(queries) > max_queries:
+            return jsonify({'error': f'Batch too large: {len(queries)} queries (limit {max_queries})'}), 413
+        
+        try:
+            options = parse_query_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        chunk_size = max(1, app.config['BATCH_CHUNK_SIZE'])
+        
+        def success_item(index, query_text, response_text, intent, sections=None):
+            item = {'index': index, 'status': 'success', 'query': query_text,
+                    'response': response_text, 'intent': intent}
+            if sections is not None:
+                item['sections'] = [{'section': section, 'text': text} for section, text in sections]
+            return item
+        
+        def result_item(index, query_text, result):
+            if result.components is None:
+                return success_item(index, query_text, result.response, result.intent, result.sections)
+            item = {'index': index, 'status': 'success', 'query': query_text, 'intent': result.intent}
+            item.update(format_structured_response(result, options.show_proof))
+            return item
+        
+        def error_item(index, message):
+            return {'index': index, 'status': 'error', 'error': message}
+        
+        def run_item(index, query_text):
+            """Answer one query on its own so a failure cannot affect its neighbours"""
+            try:
+                if pc_mlra is None:
+                    return success_item(index, query_text, demo_process_query(query_text), 'demo_mode')
+                return result_item(index, query_text, pc_mlra.answer(query_text, options))
+            except Exception as e:
+                app.logger.error(f'Error in /api/query/batch item {index}: {e}')
+                return error_item(index, 'Internal server error')
+        
+        def run_chunk(chunk):
+            valid = [(i, q.strip()) for i, q in chunk if isinstance(q, str) and q.strip()]
+            items = {i: error_item(i, 'Query must be a non-empty string') for i, _ in chunk}
+            if pc_mlra is not None and valid:
+                try:
+                    results = pc_mlra.answer_many([q for _, q in valid], options)
+                    for (i, q), result in zip(valid, results):
+                        items[i] = result_item(i, q, result)
+                    return [items[i] for i, _ in chunk]
+                except Exception as e:
+                    app.logger.warning(f'Batch chunk failed, answering items individually: {e}')
+            for i, q in valid:
+                items[i] = run_item(i, q)
+            return [items[i] for i, _ in chunk]
+        
+        def generate():
+            indexed = list(enumerate(queries))
+            for start in range(0, len(indexed), chunk_size):
+                for item in run_chunk(indexed[start:start + chunk_size]):
+                    yield app.json.dumps(item) + '\n'
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+    
     @app.route('/api/examples')
     def get_example_queries():
-        examples = [
-            "Can I get my medical reports?",
-            "Doctor was rude to me",
-            "I need a second opinion",
-            "Hospital is charging too much"
-        ]
-        return jsonify({'examples': examples})
+        return serve_static_payload('examples')
+    
+    @lru_cache(maxsize=256)
+    def search_payload(keyword):
+        """Serialized search results; the KB never changes while the app runs"""
+        results = pc_mlra.kb.search_clauses_by_keyword(keyword)
+        return app.json.dumps({'query': keyword, 'results': results[:10], 'total': len(results)})
     
     @app.route('/api/knowledge/search')
     def search_knowledge():
@@ -257,12 +523,18 @@ def create_app():
         if not keyword:
             return jsonify({'error': 'No search term'}), 400
         
+        cache_control = app.config['API_CACHE_CONTROL']
+        etag = make_etag(engine_fingerprint, 'search', keyword)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, cache_control)
+        
         try:
             if pc_mlra is None:
-                return jsonify({'query': keyword, 'results': [], 'note': 'Demo mode'})
+                return add_validators(jsonify({'query': keyword, 'results': [], 'note': 'Demo mode'}),
+                                      etag, cache_control)
             
-            results = pc_mlra.kb.search_clauses_by_keyword(keyword)
-            return jsonify({'query': keyword, 'results': results[:10], 'total': len(results)})
+            response = app.response_class(search_payload(keyword), mimetype='application/json')
+            return add_validators(response, etag, cache_control)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
@@ -282,6 +554,19 @@ def create_app():
         except Exception as e:
             return jsonify({'status': 'error', 'message': str(e)})
     
+    @app.route('/api/debug/sheets-queue')
+    def debug_sheets_queue():
+        return jsonify(sheets_log_queue.stats())
+    
+    @app.route('/api/debug/stage-timings')
+    def debug_stage_timings():
+        from src.stage_timing import STAGE_HISTOGRAMS
+        return jsonify({'enabled': STAGE_HISTOGRAMS.enabled, 'stages': STAGE_HISTOGRAMS.snapshot()})
+    
+    @app.route('/api/debug/coalescing')
+    def debug_coalescing():
+        return jsonify(query_coalescer.stats())
+    
     return app
 
 # For direct execution
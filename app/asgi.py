@@ -0,0 +1,391 @@
+"""
+PC-MLRA ASGI Application
+The query, search, stats and health API without a WSGI worker per request
+
+The engine answers in well under a millisecond, so it runs inline on the
+event loop. Google Sheets logging and chat history are recorded in a worker
+thread after the response has been sent. Sessions use Flask's signed
+cookie format and secret key, so a browser keeps its session id across the
+Flask and ASGI deployments.
+
+Serve with:
+    uvicorn --factory app.asgi:create_asgi_app --workers 4 --port 8000
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask.json.tag import TaggedJSONSerializer
+
+from app.services.chat_history import ChatHistoryStore
+from app.services.demo_service import DemoService
+from app.services.payload_snapshot import build_payload_snapshot
+from app.services.rate_limiter import (
+    DEFAULT_RATE_LIMITS, EXEMPT_PATHS, ClientRateLimiter, build_rate_limiter
+)
+from app.services.sheets_log_queue import SheetsLogQueue, connect_worksheet, make_log_row
+from app.utils.compression import (
+    DEFAULT_MIN_SIZE, CompressedVariantCache, compress, encoded_etag, negotiate, parse_accept_encoding
+)
+from app.utils.formatters import format_response_for_html, format_structured_response
+from app.utils.http_cache import (
+    DEFAULT_CACHE_CONTROL, DEFAULT_QUERY_CACHE_CONTROL, ENCODING_ETAG_SUFFIXES, make_etag
+)
+from app.utils.query_options import parse_query_options
+
+MAX_BODY_BYTES = 1024 * 1024
+SESSION_COOKIE = 'session'
+SESSION_MAX_AGE = 31 * 24 * 3600
+
+logger = logging.getLogger('pc_mlra.asgi')
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """The parts of an ASGI HTTP scope the routes need"""
+
+    def __init__(self, scope: Dict[str, Any], receive):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {key: values[0] for key, values in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', [])}
+        client = scope.get('client')
+        self.remote_addr = client[0] if client else ''
+        self._receive = receive
+
+    async def json(self) -> Any:
+        body = b''
+        while True:
+            message = await self._receive()
+            body += message.get('body', b'')
+            if len(body) > MAX_BODY_BYTES:
+                raise HTTPError(413, 'Request body too large')
+            if not message.get('more_body'):
+                break
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    def cookie(self, name: str) -> Optional[str]:
+        cookies = SimpleCookie()
+        cookies.load(self.headers.get('cookie', ''))
+        return cookies[name].value if name in cookies else None
+
+    def preferred_encoding(self) -> Optional[str]:
+        return negotiate(parse_accept_encoding(self.headers.get('accept-encoding', '')))
+
+    def not_modified(self, etag: str) -> bool:
+        """Weak If-None-Match comparison, as in app.utils.http_cache.is_not_modified"""
+        header = self.headers.get('if-none-match')
+        if not header:
+            return False
+        tags = {tag.strip().removeprefix('W/').strip('"') for tag in header.split(',')}
+        return '*' in tags or any(etag + suffix in tags for suffix in ENCODING_ETAG_SUFFIXES)
+
+
+class PCMLRAAsgiApp:
+    """ASGI callable serving /api/query, /api/knowledge/search, /api/system/stats and /api/health"""
+
+    def __init__(self, engine=None, secret_key: str = None, sheets_log_queue: Optional[SheetsLogQueue] = None,
+                 rate_limiter: Optional[ClientRateLimiter] = None):
+        self.engine = engine
+        self.rate_limiter = rate_limiter
+        self.engine_fingerprint = engine.engine_fingerprint if engine is not None else 'demo-mode'
+        self.cache_control = os.environ.get('API_CACHE_CONTROL', DEFAULT_CACHE_CONTROL)
+        self.query_cache_control = os.environ.get('API_QUERY_CACHE_CONTROL', DEFAULT_QUERY_CACHE_CONTROL)
+        self.sheets_log_queue = sheets_log_queue
+        self.chat_histories = ChatHistoryStore()
+        # Same signing scheme as Flask's SecureCookieSessionInterface
+        self.session_serializer = URLSafeTimedSerializer(
+            secret_key or os.environ.get('SECRET_KEY', 'pc-mlra-secret-key-2026'),
+            salt='cookie-session',
+            serializer=TaggedJSONSerializer(),
+            signer_kwargs={'key_derivation': 'hmac', 'digest_method': hashlib.sha1}
+        )
+        self.routes = {
+            '/api/health': {'GET': self.health_check},
+            '/api/system/stats': {'GET': self.get_system_stats},
+            '/api/query': {'POST': self.process_query},
+            '/api/knowledge/search': {'GET': self.search_knowledge},
+        }
+        self.payload_snapshot = build_payload_snapshot(
+            self.engine_fingerprint, engine.kb if engine is not None else None,
+            dumps=lambda payload: _dumps(payload).decode('utf-8')
+        )
+        self._search_payloads: Dict[str, bytes] = {}
+        self.compression_min_size = int(os.environ.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE))
+        self.compressed_variants = CompressedVariantCache()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if self.sheets_log_queue is not None:
+            self.sheets_log_queue.start()
+
+        request = Request(scope, receive)
+        methods = self.routes.get(request.path)
+        after_response = None
+        rate_limit = None
+        if self.rate_limiter is not None and request.path.startswith('/api/') and request.path not in EXEMPT_PATHS:
+            client = (request.remote_addr, self._cookie_session_id(request))
+            if self.rate_limiter.blocking:
+                # Lease renewals wait on SQLite (BEGIN IMMEDIATE); keep them off the event loop
+                rate_limit = await asyncio.to_thread(self.rate_limiter.hit, *client)
+            else:
+                rate_limit = self.rate_limiter.hit(*client)
+        try:
+            if rate_limit is not None and not rate_limit.allowed:
+                status, headers = 429, []
+                body = _dumps({'error': 'Rate limit exceeded', 'retry_after': rate_limit.retry_after()})
+            else:
+                if methods is None:
+                    raise HTTPError(404, 'Not found')
+                handler = methods.get(request.method)
+                if handler is None:
+                    raise HTTPError(405, 'Method not allowed')
+                status, body, headers, after_response = await handler(request)
+        except HTTPError as e:
+            status, body, headers = e.status, _dumps({'error': e.message}), []
+        except Exception as e:
+            logger.error(f'Error in {request.path}: {e}')
+            status, body, headers = 500, _dumps({'error': 'Internal server error'}), []
+
+        if status == 200 and len(body) >= self.compression_min_size > 0:
+            body, headers = self._compress(request, body, headers)
+        if rate_limit is not None:
+            headers = headers + [(name.lower(), value) for name, value in rate_limit.headers().items()]
+        await _send(send, status, body, headers)
+
+        # Bookkeeping happens after the client already has the response
+        if after_response is not None:
+            try:
+                await asyncio.to_thread(after_response)
+            except Exception as e:
+                logger.error(f'⚠️ Logging error: {e}')
+
+    def _compress(self, request: Request, body: bytes, headers: List[Tuple[str, str]]):
+        """Negotiated compression; public ETagged payloads are compressed once and cached"""
+        names = {name for name, _ in headers}
+        if 'content-encoding' in names:
+            return body, headers
+        headers = headers + [('vary', 'Accept-Encoding')] if 'vary' not in names else headers
+        encoding = request.preferred_encoding()
+        if encoding is None:
+            return body, headers
+
+        header_map = dict(headers)
+        etag = header_map.get('etag', '').strip('"')
+        if etag and 'public' in header_map.get('cache-control', ''):
+            compressed = self.compressed_variants.get_or_compress(etag, encoding, body)
+        else:
+            compressed = compress(body, encoding)
+        if len(compressed) >= len(body):
+            return body, headers
+
+        headers = [(name, f'"{encoded_etag(etag, encoding)}"' if name == 'etag' else value)
+                   for name, value in headers]
+        return compressed, headers + [('content-encoding', encoding)]
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.sheets_log_queue is not None:
+                    self.sheets_log_queue.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # Routes return (status, body, headers, after_response)
+
+    async def health_check(self, request: Request):
+        return 200, _dumps({
+            'status': 'healthy',
+            'service': 'PC-MLRA',
+            'pc_mlra_available': self.engine is not None,
+            'timestamp': datetime.now().isoformat()
+        }), [], None
+
+    async def get_system_stats(self, request: Request):
+        body, etag, encoding = self.payload_snapshot['system_stats'].variant(request.preferred_encoding())
+        headers = _validators(etag, self.cache_control) + [('vary', 'Accept-Encoding')]
+        if request.not_modified(etag):
+            return 304, b'', headers, None
+        if encoding:
+            headers.append(('content-encoding', encoding))
+        return 200, body, headers, None
+
+    async def search_knowledge(self, request: Request):
+        keyword = request.args.get('q', '')
+        if not keyword:
+            raise HTTPError(400, 'No search term')
+
+        etag = make_etag(self.engine_fingerprint, 'search', keyword)
+        headers = _validators(etag, self.cache_control)
+        if request.not_modified(etag):
+            return 304, b'', headers, None
+
+        if self.engine is None:
+            return 200, _dumps({'query': keyword, 'results': [], 'note': 'Demo mode'}), headers, None
+
+        body = self._search_payloads.get(keyword)
+        if body is None:
+            results = self.engine.kb.search_clauses_by_keyword(keyword)
+            body = _dumps({'query': keyword, 'results': results[:10], 'total': len(results)})
+            if len(self._search_payloads) < 256:
+                self._search_payloads[keyword] = body
+        return 200, body, headers, None
+
+    async def process_query(self, request: Request):
+        data = await request.json()
+        if not isinstance(data, dict) or 'query' not in data:
+            raise HTTPError(400, 'No query provided')
+        query_text = str(data['query']).strip()
+        if not query_text:
+            raise HTTPError(400, 'Query cannot be empty')
+        try:
+            options = parse_query_options(data, html=True)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        session_id, session_headers = self._session(request)
+
+        # No ETag, as in the Flask app: bodies carry a timestamp and session, and every query is recorded
+        headers = [('cache-control', self.query_cache_control)] + session_headers
+
+        sections = structured = None
+        if self.engine is not None:
+            result = self.engine.answer(query_text, options)
+            response_text, intent, sections = result.log_text, result.intent, result.sections
+            response_html = result.html
+            if result.components is not None:
+                structured = format_structured_response(result, options.show_proof)
+        else:
+            response_text, intent = DemoService.process_query(query_text)['response'], 'demo_mode'
+            response_html = format_response_for_html(response_text)
+
+        timestamp = datetime.now().isoformat()
+        payload = {
+            'status': 'success',
+            'query': query_text,
+            'response': response_text,
+            'response_html': response_html,
+            'intent': intent,
+            'timestamp': timestamp,
+            'session_id': session_id
+        }
+        if sections is not None:
+            payload['sections'] = [{'section': section, 'text': text} for section, text in sections]
+        if structured is not None:
+            # format=json: components instead of the assembled text
+            del payload['response'], payload['response_html']
+            payload.update(structured)
+
+        def record():
+            if self.sheets_log_queue is not None:
+                self.sheets_log_queue.enqueue(
+                    make_log_row(query_text, response_text, intent, request.remote_addr, session_id)
+                )
+            self.chat_histories.append(session_id, {
+                'timestamp': timestamp,
+                'query': query_text,
+                'response': response_text,
+                'intent': intent
+            })
+
+        return 200, _dumps(payload), headers, record
+
+    def _session(self, request: Request) -> Tuple[str, List[Tuple[str, str]]]:
+        """Session id from the signed cookie, or a new session and its Set-Cookie header"""
+        session_id = self._cookie_session_id(request)
+        if session_id:
+            self.chat_histories.start(session_id)
+            return session_id, []
+
+        session_id = str(uuid.uuid4())
+        self.chat_histories.start(session_id)
+        value = self.session_serializer.dumps({'session_id': session_id})
+        return session_id, [('set-cookie', f'{SESSION_COOKIE}={value}; HttpOnly; Path=/; SameSite=Lax')]
+
+    def _cookie_session_id(self, request: Request) -> Optional[str]:
+        """Session id of a valid signed session cookie, decoded once per request"""
+        if not hasattr(request, 'session_id'):
+            request.session_id = None
+            cookie = request.cookie(SESSION_COOKIE)
+            if cookie:
+                try:
+                    request.session_id = self.session_serializer.loads(cookie, max_age=SESSION_MAX_AGE).get('session_id')
+                except BadSignature:
+                    pass
+        return request.session_id
+
+
+def _dumps(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def _validators(etag: str, cache_control: str) -> List[Tuple[str, str]]:
+    headers = [('etag', f'"{etag}"')]
+    if cache_control:
+        headers.append(('cache-control', cache_control))
+    return headers
+
+
+async def _send(send, status: int, body: bytes, headers: List[Tuple[str, str]]):
+    all_headers = list(headers)
+    if status != 304:
+        all_headers.append(('content-type', 'application/json'))
+        all_headers.append(('content-length', str(len(body))))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in all_headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app() -> PCMLRAAsgiApp:
+    """Build the engine and Sheets log queue and return the ASGI app"""
+    engine = None
+    try:
+        build_started = time.perf_counter()
+        from src.engine import PCMLRAEngine
+        engine = PCMLRAEngine()
+        logger.info(f'✅ PC-MLRA system initialized in {(time.perf_counter() - build_started) * 1000:.1f} ms')
+    except Exception as e:
+        logger.warning(f'⚠️ PC-MLRA core not available: {e}')
+
+    creds_path = os.environ.get('GOOGLE_CREDENTIALS_PATH', './config/secrets/google_sheets_credentials.json')
+    sheet_id = os.environ.get('GOOGLE_SHEET_ID')
+    sheets_log_queue = SheetsLogQueue(
+        connect=lambda: connect_worksheet(creds_path, sheet_id, logger),
+        max_size=int(os.environ.get('SHEETS_LOG_QUEUE_SIZE', 1000)),
+        logger=logger
+    )
+    rate_limiter = None
+    if os.environ.get('RATELIMIT_ENABLED', 'false').lower() == 'true':
+        rate_limiter = build_rate_limiter(os.environ.get('RATELIMIT_DEFAULT', DEFAULT_RATE_LIMITS),
+                                          os.environ.get('RATELIMIT_STORAGE_PATH'),
+                                          os.environ.get('RATELIMIT_PER_SESSION'))
+    return PCMLRAAsgiApp(engine, sheets_log_queue=sheets_log_queue, rate_limiter=rate_limiter)
@@ -12,6 +12,7 @@ api_bp = Blueprint('api', __name__)
 from app.services.pc_mlra_service import PCMLRAService
 from app.services.google_sheets_service import GoogleSheetsService
 from app.services.demo_service import DemoService
+from app.utils.query_options import parse_query_options
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
@@ -56,6 +57,14 @@ def process_query():
                 'status': 'error'
             }), 400
         
+        try:
+            options = parse_query_options(data)
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
         # Generate or get session ID
         if 'session_id' not in session:
             session['session_id'] = str(uuid.uuid4())
@@ -68,7 +77,9 @@ def process_query():
             response_data = DemoService.process_query(query_text)
         else:
             # Use real PC-MLRA system
-            response_data = current_app.pc_mlra_service.process_query(query_text)
+            response_data = current_app.pc_mlra_service.process_query(
+                query_text, show_proof=options.show_proof, output_format=options.output_format
+            )
         
         # Log to Google Sheets
         try:
@@ -4,10 +4,12 @@ Web routes (HTML pages)
 from flask import Blueprint, render_template, session, jsonify
 import uuid
 
+from app.services.chat_history import ChatHistoryStore
+
 web_bp = Blueprint('web', __name__)
 
 # In-memory storage for chat history (in production, use database)
-chat_histories = {}
+chat_histories = ChatHistoryStore()
 
 @web_bp.route('/')
 def index():
@@ -20,7 +22,7 @@ def chat():
     # Generate a session ID if not exists
     if 'session_id' not in session:
         session['session_id'] = str(uuid.uuid4())
-        chat_histories[session['session_id']] = []
+        chat_histories.start(session['session_id'])
     
     return render_template('chat.html')
 
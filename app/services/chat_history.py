@@ -0,0 +1,38 @@
+"""
+In-memory chat history per session, safe for threaded workers
+"""
+import threading
+from typing import Any, Dict, List
+
+
+class ChatHistoryStore:
+    """Keeps the most recent entries of each session behind a lock"""
+
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self._histories: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, session_id: str):
+        """Begin an empty history for a new session"""
+        with self._lock:
+            self._histories.setdefault(session_id, [])
+
+    def append(self, session_id: str, entry: Dict[str, Any]):
+        """Add an entry to a known session, keeping only the newest max_entries"""
+        with self._lock:
+            history = self._histories.get(session_id)
+            if history is None:
+                return
+            history.append(entry)
+            if len(history) > self.max_entries:
+                del history[:-self.max_entries]
+
+    def get(self, session_id: str) -> List[Dict[str, Any]]:
+        """Copy of a session's history"""
+        with self._lock:
+            return list(self._histories.get(session_id, []))
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._histories
@@ -0,0 +1,321 @@
+"""
+Prometheus-compatible metrics with multi-process aggregation
+
+Each process keeps its own counters, gauges and histograms in memory. When
+PC_MLRA_METRICS_DIR is set (required under gunicorn prefork), every worker
+periodically writes a snapshot to <dir>/metrics_<pid>_<start>.json and a
+scrape of /metrics on any worker sums the snapshots of all of them. Nothing
+outside the filesystem is needed.
+
+The start time in the file name keeps a worker that reuses a dead worker's
+pid from overwriting its counters. Scrapes fold the counters and histograms
+of dead workers into <dir>/metrics_aggregate.json and delete their files,
+and the gunicorn master clears the directory when it starts
+(gunicorn.conf.py), so counters never go backwards within one server run.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # optional: Windows development servers run a single process
+    fcntl = None
+
+HTTP_LATENCY_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+AGGREGATE_FILENAME = 'metrics_aggregate.json'
+LOCK_FILENAME = '.metrics.lock'
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> str:
+    return json.dumps(sorted((labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(label_key: str, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = [tuple(pair) for pair in json.loads(label_key)] + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricsSnapshot:
+    """
+    JSON-serializable point-in-time view of one or more processes' metrics.
+    Histogram buckets are stored cumulatively so snapshots merge by addition.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        self.data = data or {'counters': {}, 'gauges': {}, 'histograms': {}}
+
+    def counter(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        series = self.data['counters'].setdefault(name, {})
+        key = _label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        series = self.data['gauges'].setdefault(name, {})
+        key = _label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def histogram(self, name: str, buckets: List[Tuple[Any, int]], total: float,
+                  labels: Optional[Dict[str, str]] = None):
+        """Add a histogram given cumulative (upper_bound, count) buckets ending with "+Inf\""""
+        series = self.data['histograms'].setdefault(name, {})
+        key = _label_key(labels)
+        existing = series.get(key)
+        if existing is None:
+            series[key] = {'buckets': [[bound, count] for bound, count in buckets], 'sum': total}
+            return
+        for pair, (_, count) in zip(existing['buckets'], buckets):
+            pair[1] += count
+        existing['sum'] += total
+
+    def merge(self, other: 'MetricsSnapshot', include_gauges: bool = True):
+        for name, series in other.data['counters'].items():
+            for key, value in series.items():
+                self.counter(name, value, dict(json.loads(key)))
+        if include_gauges:
+            for name, series in other.data['gauges'].items():
+                for key, value in series.items():
+                    self.gauge(name, value, dict(json.loads(key)))
+        for name, series in other.data['histograms'].items():
+            for key, hist in series.items():
+                self.histogram(name, hist['buckets'], hist['sum'], dict(json.loads(key)))
+
+    def render(self, descriptions: Dict[str, Tuple[str, str]]) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+
+        def header(name, kind):
+            help_text = descriptions.get(name, (kind, name))[1]
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for kind, section in (('counter', 'counters'), ('gauge', 'gauges')):
+            for name in sorted(self.data[section]):
+                header(name, kind)
+                for key, value in sorted(self.data[section][name].items()):
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+        for name in sorted(self.data['histograms']):
+            header(name, 'histogram')
+            for key, hist in sorted(self.data['histograms'][name].items()):
+                for bound, count in hist['buckets']:
+                    le = bound if bound == '+Inf' else repr(float(bound))
+                    lines.append(f'{name}_bucket{_format_labels(key, [("le", le)])} {count}')
+                lines.append(f'{name}_sum{_format_labels(key)} {repr(float(hist["sum"]))}')
+                lines.append(f'{name}_count{_format_labels(key)} {hist["buckets"][-1][1]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsRegistry:
+    """In-process metrics plus optional file-based multi-process aggregation"""
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._histograms: Dict[Tuple[str, str], List] = {}
+        self._bounds: Dict[str, Tuple[float, ...]] = {}
+        self._descriptions: Dict[str, Tuple[str, str]] = {}
+        self._collectors: List[Callable[[MetricsSnapshot], None]] = []
+        self._last_flush = 0.0
+        # (pid, start) naming this process's file; renewed after a fork
+        self._worker: Optional[Tuple[int, int]] = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def describe(self, name: str, kind: str, help_text: str, bounds: Optional[Tuple[float, ...]] = None):
+        self._descriptions[name] = (kind, help_text)
+        if bounds is not None:
+            self._bounds[name] = tuple(bounds)
+
+    def add_collector(self, collector: Callable[[MetricsSnapshot], None]):
+        """collector(snapshot) adds values read from other components at snapshot time"""
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        bounds = self._bounds.get(name, HTTP_LATENCY_BOUNDS)
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(bounds) + 1), 0.0]
+            hist[0][bisect_left(bounds, value)] += 1
+            hist[1] += value
+
+    def snapshot(self) -> MetricsSnapshot:
+        """This process's metrics, including collector values"""
+        snapshot = MetricsSnapshot()
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h[0]), h[1]) for key, h in self._histograms.items()}
+
+        for (name, key), value in counters.items():
+            snapshot.counter(name, value, dict(json.loads(key)))
+        for (name, key), (counts, total) in histograms.items():
+            bounds = self._bounds.get(name, HTTP_LATENCY_BOUNDS) + ('+Inf',)
+            cumulative, buckets = 0, []
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            snapshot.histogram(name, buckets, total, dict(json.loads(key)))
+        for collector in self._collectors:
+            collector(snapshot)
+        return snapshot
+
+    def maybe_flush(self):
+        """Write this process's snapshot if the flush interval has passed"""
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _worker_filename(self) -> str:
+        pid = os.getpid()
+        if self._worker is None or self._worker[0] != pid:
+            self._worker = (pid, time.time_ns())
+        return f'metrics_{self._worker[0]}_{self._worker[1]}.json'
+
+    def flush(self):
+        if not self.directory:
+            return
+        self._last_flush = time.monotonic()
+        _write_json(os.path.join(self.directory, self._worker_filename()), self.snapshot().data)
+
+    def collect_all(self) -> MetricsSnapshot:
+        """Metrics summed over every process sharing the metrics directory"""
+        if not self.directory:
+            return self.snapshot()
+
+        self.flush()
+        own = self._worker_filename()
+        with _directory_lock(self.directory):
+            workers = _worker_files(self.directory)
+            live = _fold_dead_workers(self.directory, workers, own)
+            combined = _read_snapshot(os.path.join(self.directory, AGGREGATE_FILENAME)) or MetricsSnapshot()
+            for filename in live:
+                worker = _read_snapshot(os.path.join(self.directory, filename))
+                if worker is not None:
+                    combined.merge(worker)
+        return combined
+
+    def render(self, snapshot: Optional[MetricsSnapshot] = None) -> str:
+        """Render a snapshot (default: all processes) in Prometheus text format"""
+        if snapshot is None:
+            snapshot = self.collect_all()
+        return snapshot.render(self._descriptions)
+
+
+def clear_metrics_directory(directory: str):
+    """Remove every metrics file; the gunicorn master calls this before forking workers"""
+    if not os.path.isdir(directory):
+        return
+    with _directory_lock(directory):
+        for filename in os.listdir(directory):
+            if filename.startswith('metrics_') and filename.endswith(('.json', '.tmp')):
+                os.remove(os.path.join(directory, filename))
+
+
+@contextmanager
+def _directory_lock(directory: str):
+    """Serialize folding between workers (a no-op without fcntl)"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILENAME), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(path: str) -> Optional[MetricsSnapshot]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return MetricsSnapshot(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def _worker_files(directory: str) -> Dict[str, Tuple[int, int]]:
+    """{filename: (pid, start)} for every worker file in the directory"""
+    workers = {}
+    for filename in os.listdir(directory):
+        if not (filename.startswith('metrics_') and filename.endswith('.json')):
+            continue
+        try:
+            pid, start = (int(part) for part in filename[len('metrics_'):-len('.json')].split('_'))
+        except ValueError:
+            continue
+        workers[filename] = (pid, start)
+    return workers
+
+
+def _fold_dead_workers(directory: str, workers: Dict[str, Tuple[int, int]], own: str) -> List[str]:
+    """
+    Add the counters and histograms of exited workers to the aggregate file
+    and delete their files (gauges of exited workers are stale). Of several
+    files with one pid only the newest can belong to a running process.
+    Returns the live workers' file names. Call with the directory locked.
+    """
+    newest: Dict[int, int] = {}
+    for pid, start in workers.values():
+        newest[pid] = max(start, newest.get(pid, start))
+    live, dead = [], []
+    for filename, (pid, start) in sorted(workers.items()):
+        if filename == own or (start == newest[pid] and _pid_alive(pid)):
+            live.append(filename)
+        else:
+            dead.append(filename)
+    if not dead:
+        return live
+
+    aggregate_path = os.path.join(directory, AGGREGATE_FILENAME)
+    aggregate = _read_snapshot(aggregate_path) or MetricsSnapshot()
+    for filename in dead:
+        worker = _read_snapshot(os.path.join(directory, filename))
+        if worker is not None:
+            aggregate.merge(worker, include_gauges=False)
+    _write_json(aggregate_path, aggregate.data)
+    for filename in dead:
+        os.remove(os.path.join(directory, filename))
+    return live
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,90 @@
+"""
+Pre-serialized static API payloads
+
+System stats and example queries depend only on the engine build, so they
+are serialized (and compressed) once per engine fingerprint and served as
+bytes; a request costs a lookup and a copy.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.utils.compression import encoded_etag, precompress
+from app.utils.http_cache import make_etag
+
+EXAMPLE_QUERIES = (
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "I need a second opinion",
+    "Hospital is charging too much"
+)
+
+DEMO_SYSTEM_STATS = {
+    'system_name': 'PC-MLRA (Demo Mode)',
+    'version': '1.0.0',
+    'total_clauses': 46,
+    'system_status': 'demo_mode'
+}
+
+
+def system_stats_payload(kb) -> Dict[str, Any]:
+    """Summary of the knowledge base behind /api/system/stats"""
+    if kb is None:
+        return dict(DEMO_SYSTEM_STATS)
+    metadata = kb.get_metadata()
+    return {
+        'system_name': metadata.get('system_name', 'PC-MLRA'),
+        'version': metadata.get('version', '1.0.0'),
+        'total_clauses': len(kb.get_all_clauses()),
+        'system_status': 'operational'
+    }
+
+
+def category_counts(kb) -> Dict[str, int]:
+    """Clause count per category, keyed by readable category name"""
+    counts = {}
+    for clause in kb.get_all_clauses():
+        category = clause.get('category', 'uncategorized')
+        counts[category] = counts.get(category, 0) + 1
+    return {category.replace('_', ' ').title(): count for category, count in counts.items()}
+
+
+class StaticPayload:
+    """One payload's serialized body, its precompressed variants and their ETags"""
+
+    __slots__ = ('body', 'etag', 'variants')
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+        # Tiny payloads can grow when compressed; those are only sent as-is
+        self.variants = precompress(body, min_size=0)
+
+    def variant(self, encoding: Optional[str]) -> Tuple[bytes, str, Optional[str]]:
+        """(body, etag, content_encoding) of the representation to send"""
+        if encoding in self.variants:
+            return self.variants[encoding], encoded_etag(self.etag, encoding), encoding
+        return self.body, self.etag, None
+
+
+class PayloadSnapshot:
+    """Static payloads of one engine version, serialized once"""
+
+    def __init__(self, fingerprint: str, payloads: Dict[str, Any], dumps: Callable[[Any], str]):
+        self.fingerprint = fingerprint
+        self._payloads = {
+            name: StaticPayload(dumps(payload).encode('utf-8'), make_etag(fingerprint, name))
+            for name, payload in payloads.items()
+        }
+
+    def __getitem__(self, name: str) -> StaticPayload:
+        return self._payloads[name]
+
+
+def build_payload_snapshot(fingerprint: str, kb=None, dumps: Optional[Callable[[Any], str]] = None) -> PayloadSnapshot:
+    """Serialize /api/system/stats and /api/examples for an engine (kb None in demo mode)"""
+    if dumps is None:
+        import json
+        dumps = lambda payload: json.dumps(payload, separators=(',', ':'), sort_keys=True)
+    return PayloadSnapshot(fingerprint, {
+        'system_stats': system_stats_payload(kb),
+        'examples': {'examples': list(EXAMPLE_QUERIES)},
+    }, dumps)
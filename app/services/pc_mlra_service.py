@@ -11,8 +11,9 @@ class PCMLRAService:
     
     def __init__(self):
         """Initialize PC-MLRA system"""
-        self.console = None
+        self.engine = None
         self.initialized = False
+        self._system_stats = None
         self._initialize()
     
     def _initialize(self):
@@ -26,14 +27,15 @@ class PCMLRAService:
                 sys.path.insert(0, src_dir)
             
             # Import PC-MLRA
-            from src.main import PCMLRAConsole
+            from src.engine import PCMLRAEngine
             
             # Initialize
-            self.console = PCMLRAConsole()
+            self.engine = PCMLRAEngine()
             self.initialized = True
             
-            # Quick test
-            test_response = self.console.process_query("Can I get my medical reports?")
+            # Optional warmup query; off by default to keep worker boot fast
+            if os.environ.get('PC_MLRA_WARMUP', 'false').lower() == 'true':
+                self.engine.answer("Can I get my medical reports?")
             
             return True
             
@@ -45,9 +47,10 @@ class PCMLRAService:
             traceback.print_exc()
             return False
     
-    def process_query(self, query: str) -> Dict[str, Any]:
-        """Process a user query"""
-        if not self.initialized or not self.console:
+    def process_query(self, query: str, show_proof: bool = True,
+                      output_format: str = 'text') -> Dict[str, Any]:
+        """Process a user query with per-request options"""
+        if not self.initialized or not self.engine:
             return {
                 'response': 'PC-MLRA system not available',
                 'intent': 'system_error',
@@ -55,16 +58,24 @@ class PCMLRAService:
             }
         
         try:
-            result = self.console.process_query(query)
+            from src.engine import QueryOptions
             
-            if isinstance(result, dict):
-                return result
-            else:
-                return {
-                    'response': str(result),
-                    'intent': 'general_query',
-                    'confidence': 1.0
-                }
+            result = self.engine.answer(query, QueryOptions(show_proof=show_proof, output_format=output_format))
+            response_data = {
+                'response': result.response,
+                'intent': result.intent,
+                'confidence': result.proof_trace.matched_intents[0][1] if result.proof_trace.matched_intents else 0.0,
+                'template_id': result.template_id
+            }
+            if result.sections is not None:
+                response_data['sections'] = [
+                    {'section': section, 'text': text} for section, text in result.sections
+                ]
+            if result.components is not None:
+                from app.utils.formatters import format_structured_response
+                response_data['response'] = result.log_text
+                response_data.update(format_structured_response(result, show_proof))
+            return response_data
                 
         except Exception as e:
             print(f"Query processing error: {e}")
@@ -75,40 +86,30 @@ class PCMLRAService:
             }
     
     def get_system_stats(self) -> Dict[str, Any]:
-        """Get system statistics"""
-        if not self.initialized or not self.console:
+        """Get system statistics (computed once; the knowledge base never changes)"""
+        if not self.initialized or not self.engine:
             return self._get_demo_stats()
         
+        if self._system_stats is not None:
+            return self._system_stats
+        
         try:
-            # Get metadata from knowledge base
-            metadata = self.console.kb.get_metadata()
-            
-            # Get all clauses
-            clauses = self.console.kb.get_all_clauses()
-            
-            # Count by category
-            categories = {}
-            for clause in clauses:
-                category = clause.get("category", "uncategorized")
-                categories[category] = categories.get(category, 0) + 1
+            from app.services.payload_snapshot import category_counts
+            from src.immutable import freeze
             
-            # Format categories
-            formatted_categories = {}
-            for cat, count in categories.items():
-                readable_name = cat.replace('_', ' ').title()
-                formatted_categories[readable_name] = count
-            
-            return {
+            metadata = self.engine.kb.get_metadata()
+            self._system_stats = freeze({
                 'system_name': metadata.get('system_name', 'PC-MLRA'),
                 'version': metadata.get('version', '1.0.0'),
-                'total_clauses': len(clauses),
+                'total_clauses': len(self.engine.kb.get_all_clauses()),
                 'documents': [
                     'NHRC Patient Charter (2019)',
                     'IMC Ethics Regulations (2002)'
                 ],
-                'categories': formatted_categories,
+                'categories': category_counts(self.engine.kb),
                 'system_status': 'operational'
-            }
+            })
+            return self._system_stats
             
         except Exception as e:
             print(f"Error getting stats: {e}")
@@ -116,7 +117,7 @@ class PCMLRAService:
     
     def search_knowledge(self, keyword: str) -> Dict[str, Any]:
         """Search the knowledge base"""
-        if not self.initialized or not self.console:
+        if not self.initialized or not self.engine:
             return {
                 'query': keyword,
                 'results': [],
@@ -125,7 +126,7 @@ class PCMLRAService:
             }
         
         try:
-            results = self.console.kb.search_clauses_by_keyword(keyword)
+            results = self.engine.kb.search_clauses_by_keyword(keyword)
             
             # Format results
             formatted_results = []
@@ -0,0 +1,93 @@
+"""
+Single-flight coalescing for identical concurrent queries
+"""
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _InFlightCall:
+    """A pipeline run shared by every request waiting on the same key"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryCoalescer:
+    """
+    Collapses concurrent requests for the same normalized query into one
+    pipeline run. The first caller executes, later callers block until it
+    finishes and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _InFlightCall] = {}
+        self._executed = 0
+        self._coalesced = 0
+        self._failed = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query the same way ResponseAssembler.clean_query does"""
+        return re.sub(r'\s+', ' ', query.strip())
+
+    def key_for(self, query: str, *options: Hashable) -> Tuple:
+        """Build the coalescing key for a query plus any output-affecting options"""
+        return (self.normalize(query),) + options
+
+    def run(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Run func for key, or wait for the identical in-flight run"""
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = _InFlightCall()
+                self._in_flight[key] = call
+                self._executed += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            # Unregister before waking waiters so new arrivals start a fresh run
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get coalescing counters for this process"""
+        with self._lock:
+            executed = self._executed
+            coalesced = self._coalesced
+            failed = self._failed
+            in_flight = len(self._in_flight)
+
+        total = executed + coalesced
+        return {
+            'requests_total': total,
+            'executed': executed,
+            'coalesced': coalesced,
+            'failed': failed,
+            'in_flight': in_flight,
+            'coalesced_ratio': coalesced / total if total else 0.0
+        }
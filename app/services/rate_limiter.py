@@ -0,0 +1,388 @@
+"""
+Token-bucket rate limiting shared by all gunicorn workers
+
+Every client IP gets one token bucket per configured limit, e.g. "200 per
+day, 50 per hour". Optional per-session limits narrow that further within
+an IP; they never widen it, so a client rotating its session cookie still
+drains one per-IP bucket. Buckets live in a SQLite database
+(RATELIMIT_STORAGE_PATH) that every prefork worker opens, or in process
+memory when no path is set.
+
+Workers do not go to SQLite on every request. Each one leases a few tokens
+at a time and spends them locally, so the common check is a dict lookup and
+a decrement. Unused tokens go back to the shared bucket when a lease
+expires. A denied client is remembered locally until it may retry, so a
+scraper hammering the API costs no database work either.
+"""
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from itertools import repeat
+from operator import length_hint
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_RATE_LIMITS = '200 per day, 50 per hour'
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+    'month': 30 * 86400,
+    'year': 365 * 86400,
+}
+
+# "50 per hour", "10/minute", "100 per 15 minutes"
+_LIMIT = re.compile(r'\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day|month|year)s?\s*', re.IGNORECASE)
+
+# Leases never exceed this many tokens, nor 1/20 of the tightest limit
+MAX_LEASE_SIZE = 100
+DEFAULT_LEASE_TTL = 1.0
+
+# Paths that are never limited: load balancer probes and metric scrapes
+EXEMPT_PATHS = frozenset({'/api/health', '/metrics'})
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """count requests per period seconds, refilled continuously"""
+    count: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.period
+
+
+def parse_rate_limits(spec: str) -> Tuple[RateLimit, ...]:
+    """Parse a Flask-Limiter style string such as "200 per day, 50 per hour"; raises ValueError"""
+    limits = []
+    for part in re.split(r'[,;]', spec or ''):
+        if not part.strip():
+            continue
+        match = _LIMIT.fullmatch(part)
+        if match is None:
+            raise ValueError(f'Invalid rate limit "{part.strip()}" (expected e.g. "50 per hour")')
+        count, multiplier, unit = match.groups()
+        if int(count) < 1:
+            raise ValueError(f'Invalid rate limit "{part.strip()}": count must be at least 1')
+        limits.append(RateLimit(int(count), int(multiplier or 1) * PERIODS[unit.lower()]))
+    if not limits:
+        raise ValueError('No rate limits given')
+    return tuple(limits)
+
+
+@dataclass
+class Grant:
+    """Outcome of one acquisition from the shared buckets"""
+    granted: int
+    remaining: int
+    reset: float
+    retry_after: float
+
+
+def _refill(limit: RateLimit, state: Optional[Tuple[float, float]], now: float) -> float:
+    if state is None:
+        return float(limit.count)
+    tokens, updated = state
+    return min(float(limit.count), tokens + max(0.0, now - updated) * limit.rate)
+
+
+def _take(limits: Sequence[RateLimit], states: List[Optional[Tuple[float, float]]],
+          want: int, refund: int, now: float) -> Tuple[Grant, List[float]]:
+    """
+    Take up to want tokens from every bucket of a client, all or nothing.
+    refund returns unused tokens of an expired lease first. Returns the
+    grant and the new token counts, in limit order.
+    """
+    tokens = [
+        min(float(limit.count), _refill(limit, state, now) + refund)
+        for limit, state in zip(limits, states)
+    ]
+    granted = max(0, min(want, min(int(t) for t in tokens)))
+    tokens = [t - granted for t in tokens]
+    retry_after = 0.0 if granted else max(
+        ((1 - t) / limit.rate for limit, t in zip(limits, tokens) if t < 1), default=0.0
+    )
+    return Grant(
+        granted=granted,
+        remaining=max(0, min(int(t) for t in tokens)),
+        reset=max((limit.count - t) / limit.rate for limit, t in zip(limits, tokens)),
+        retry_after=retry_after,
+    ), tokens
+
+
+class MemoryBucketStore:
+    """Buckets in this process only (single worker, tests)"""
+
+    # acquire() only takes a lock, so event loops may call it directly
+    blocking = False
+
+    # Buckets idle for longer than their period are full again; prune them now and then
+    PRUNE_EVERY = 1000
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, RateLimit], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._acquisitions = 0
+
+    def acquire(self, key: str, limits: Sequence[RateLimit], want: int, refund: int = 0,
+                now: Optional[float] = None) -> Grant:
+        now = time.time() if now is None else now
+        with self._lock:
+            states = [self._buckets.get((key, limit)) for limit in limits]
+            grant, tokens = _take(limits, states, want, refund, now)
+            for limit, t in zip(limits, tokens):
+                self._buckets[(key, limit)] = (t, now)
+            self._acquisitions += 1
+            if self._acquisitions % self.PRUNE_EVERY == 0:
+                for bucket in [bucket for bucket, (_, updated) in self._buckets.items()
+                               if updated + bucket[1].period < now]:
+                    del self._buckets[bucket]
+        return grant
+
+
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file shared by every worker process. Each
+    acquisition is one IMMEDIATE transaction, so concurrent workers see a
+    consistent bucket. Connections are per thread and per process.
+    """
+
+    PRUNE_EVERY = MemoryBucketStore.PRUNE_EVERY
+
+    # acquire() can wait up to timeout seconds for another worker's transaction
+    blocking = True
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._acquisitions = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS buckets ('
+            ' key TEXT NOT NULL, count INTEGER NOT NULL, period REAL NOT NULL,'
+            ' tokens REAL NOT NULL, updated REAL NOT NULL,'
+            ' PRIMARY KEY (key, count, period))'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            # Never reuse a connection inherited across fork
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, pid
+        return conn
+
+    def acquire(self, key: str, limits: Sequence[RateLimit], want: int, refund: int = 0,
+                now: Optional[float] = None) -> Grant:
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = {
+                (count, period): (tokens, updated)
+                for count, period, tokens, updated in conn.execute(
+                    'SELECT count, period, tokens, updated FROM buckets WHERE key = ?', (key,)
+                )
+            }
+            states = [rows.get((limit.count, float(limit.period))) for limit in limits]
+            grant, tokens = _take(limits, states, want, refund, now)
+            conn.executemany(
+                'INSERT OR REPLACE INTO buckets (key, count, period, tokens, updated) VALUES (?, ?, ?, ?, ?)',
+                [(key, limit.count, float(limit.period), t, now) for limit, t in zip(limits, tokens)]
+            )
+            self._acquisitions += 1
+            if self._acquisitions % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM buckets WHERE updated + period < ?', (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return grant
+
+
+class RateLimitDecision:
+    """Whether one request may proceed, plus the quota to report to the client"""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'reset_at', 'retry_at')
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, reset_at: float, retry_at: float = 0.0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.retry_at = retry_at
+
+    def retry_after(self, now: Optional[float] = None) -> int:
+        """Whole seconds until the client may retry (at least 1 when denied)"""
+        now = time.time() if now is None else now
+        return max(1, math.ceil(self.retry_at - now)) if not self.allowed else 0
+
+    def headers(self, now: Optional[float] = None) -> Dict[str, str]:
+        now = time.time() if now is None else now
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(max(0, math.ceil(self.reset_at - now))),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after(now))
+        return headers
+
+
+class _Lease:
+    """
+    Decisions prepared when tokens were leased, handed out with next():
+    one per leased token, or a denial repeated until the client may retry.
+    """
+
+    __slots__ = ('decisions', 'expires', 'refundable')
+
+    def __init__(self, decisions: Iterator[RateLimitDecision], expires: float, refundable: bool):
+        self.decisions = decisions
+        self.expires = expires
+        self.refundable = refundable
+
+
+class RateLimiter:
+    """
+    Checks requests against the limits, spending locally leased tokens when
+    possible and going to the shared store only to renew a lease.
+
+    The fast path takes no lock: next() on a lease's iterator is atomic, so
+    two threads can never spend the same leased token.
+    """
+
+    # Expired leases are dropped once this many clients are tracked
+    MAX_TRACKED_CLIENTS = 10000
+
+    def __init__(self, limits: Sequence[RateLimit], store=None, lease_size: Optional[int] = None,
+                 lease_ttl: float = DEFAULT_LEASE_TTL):
+        self.limits = tuple(limits)
+        self.store = store if store is not None else MemoryBucketStore()
+        tightest = min(self.limits, key=lambda limit: limit.count)
+        self.limit = tightest.count
+        self.lease_size = lease_size or max(1, min(MAX_LEASE_SIZE, tightest.count // 20))
+        self.lease_ttl = lease_ttl
+        self._leases: Dict[str, _Lease] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> RateLimitDecision:
+        """Spend one token for key"""
+        now = time.time()
+        lease = self._leases.get(key)
+        if lease is not None and now < lease.expires:
+            decision = next(lease.decisions, None)
+            if decision is not None:
+                return decision
+        return self._renew(key, now)
+
+    def _renew(self, key: str, now: float) -> RateLimitDecision:
+        """Lease tokens from the shared store (or learn how long to deny)"""
+        with self._lock:
+            lease = self._leases.pop(key, None)
+        # An expired lease's unused tokens go back to the shared bucket
+        refund = length_hint(lease.decisions) if lease is not None and lease.refundable else 0
+
+        grant = self.store.acquire(key, self.limits, self.lease_size, refund, now)
+
+        if grant.granted:
+            decisions = [
+                RateLimitDecision(True, self.limit, grant.remaining + left, now + grant.reset)
+                for left in range(grant.granted - 1, -1, -1)
+            ]
+            lease = _Lease(iter(decisions), now + self.lease_ttl, refundable=True)
+        else:
+            denied = RateLimitDecision(False, self.limit, 0, now + grant.reset, now + grant.retry_after)
+            lease = _Lease(repeat(denied), now + grant.retry_after, refundable=False)
+        decision = next(lease.decisions)
+
+        with self._lock:
+            if len(self._leases) >= self.MAX_TRACKED_CLIENTS:
+                self._prune(now)
+            self._leases[key] = lease
+        return decision
+
+    def _prune(self, now: float):
+        for key in [key for key, lease in self._leases.items() if lease.expires <= now]:
+            del self._leases[key]
+
+
+def client_key(remote_addr: Optional[str], session_id: Optional[str] = None) -> str:
+    """Bucket key: the client IP, or one session of it"""
+    return f'{remote_addr or "unknown"}|{session_id or ""}'
+
+
+class ClientRateLimiter:
+    """
+    Per-IP limits for every request, plus optional per-session limits
+    checked only once the IP is within its own. Sessions are chosen by the
+    client, so they may only narrow the quota.
+    """
+
+    def __init__(self, ip_limiter: RateLimiter, session_limiter: Optional[RateLimiter] = None):
+        self.ip_limiter = ip_limiter
+        self.session_limiter = session_limiter
+
+    @property
+    def blocking(self) -> bool:
+        """Whether hit() may wait on a store shared with other processes"""
+        return self.ip_limiter.store.blocking or (
+            self.session_limiter is not None and self.session_limiter.store.blocking
+        )
+
+    def hit(self, remote_addr: Optional[str], session_id: Optional[str] = None) -> RateLimitDecision:
+        """Spend one token for the client; the tighter of the two decisions is reported"""
+        decision = self.ip_limiter.hit(client_key(remote_addr))
+        if not decision.allowed or self.session_limiter is None or not session_id:
+            return decision
+        session_decision = self.session_limiter.hit(client_key(remote_addr, session_id))
+        if not session_decision.allowed or session_decision.remaining < decision.remaining:
+            return session_decision
+        return decision
+
+
+def build_rate_limiter(spec: str = DEFAULT_RATE_LIMITS, storage_path: Optional[str] = None,
+                       session_spec: Optional[str] = None) -> ClientRateLimiter:
+    """
+    Limiter for a per-IP limits string and, optionally, a per-session one;
+    shared across processes when storage_path is set
+    """
+    store = SQLiteBucketStore(storage_path) if storage_path else MemoryBucketStore()
+    session_limiter = RateLimiter(parse_rate_limits(session_spec), store) if session_spec else None
+    return ClientRateLimiter(RateLimiter(parse_rate_limits(spec), store), session_limiter)
+
+
+def install_rate_limiting(app, limiter: ClientRateLimiter, exempt_paths=EXEMPT_PATHS):
+    """Limit /api/ requests per client and report the quota on every limited response"""
+    from flask import g, jsonify, request, session
+
+    app.rate_limiter = limiter
+
+    @app.before_request
+    def check_rate_limit():
+        if not request.path.startswith('/api/') or request.path in exempt_paths:
+            return None
+        decision = limiter.hit(request.remote_addr, session.get('session_id'))
+        g.rate_limit = decision
+        if not decision.allowed:
+            return jsonify({'error': 'Rate limit exceeded', 'retry_after': decision.retry_after()}), 429
+        return None
+
+    @app.after_request
+    def add_rate_limit_headers(response):
+        decision = g.pop('rate_limit', None)
+        if decision is not None:
+            response.headers.update(decision.headers())
+        return response
@@ -0,0 +1,139 @@
+"""
+Background Google Sheets logging
+
+Connecting to Sheets and appending rows are network calls, so neither
+happens on the request path: rows go into a bounded in-memory queue and a
+daemon thread connects on first use and drains it.
+"""
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SHEET_HEADERS = ['Timestamp', 'Query', 'Response', 'Intent', 'User IP', 'Session ID']
+
+
+def make_log_row(query: str, response: str, intent: str, user_ip: str = '', session_id: str = '') -> List[Any]:
+    """One Sheets row, with query and response truncated to 200 characters"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    query_short = query[:200] + '...' if len(query) > 200 else query
+    response_short = response[:200] + '...' if response and len(response) > 200 else (response or '')
+    return [timestamp, query_short, response_short, intent, user_ip, session_id]
+
+
+def connect_worksheet(creds_path: str, sheet_id: str, logger=None):
+    """Open the first worksheet of the logging sheet, or return None if not configured"""
+    if not sheet_id or not creds_path or not os.path.exists(creds_path):
+        if logger:
+            logger.warning('⚠️ Google Sheets not configured')
+        return None
+
+    # Optional integration: only imported once logging actually starts
+    import gspread
+    from google.oauth2 import service_account
+
+    scopes = ['https://www.googleapis.com/auth/spreadsheets']
+    credentials = service_account.Credentials.from_service_account_file(creds_path, scopes=scopes)
+    gc = gspread.authorize(credentials)
+    sheet = gc.open_by_key(sheet_id)
+    worksheet = sheet.get_worksheet(0)
+
+    # Add headers if empty
+    if not worksheet.get_all_values():
+        worksheet.append_row(SHEET_HEADERS)
+
+    if logger:
+        logger.info(f'✅ Google Sheets connected: {sheet.title}')
+    return worksheet
+
+
+class SheetsLogQueue:
+    """Bounded queue of Sheets rows drained by one background thread per process"""
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 1000,
+                 on_connect: Optional[Callable[[Any], None]] = None, logger=None):
+        self._connect = connect
+        self._on_connect = on_connect
+        self._logger = logger
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self.state = 'idle'
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the worker thread once per process (safe to call on every request)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # A forked worker inherits the object but not the thread
+            self._pid = os.getpid()
+            self.state = 'connecting'
+            threading.Thread(target=self._run, name='sheets-log-queue', daemon=True).start()
+
+    def enqueue(self, row: List[Any]) -> bool:
+        """Queue a row without blocking; returns False if it was not accepted"""
+        if self.state == 'not_configured':
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _run(self):
+        try:
+            worksheet = self._connect()
+        except Exception as e:
+            worksheet = None
+            if self._logger:
+                self._logger.error(f'❌ Google Sheets initialization failed: {e}')
+
+        if worksheet is None:
+            self.state = 'not_configured'
+            self._discard_pending()
+            return
+
+        if self._on_connect:
+            self._on_connect(worksheet)
+        self.state = 'connected'
+
+        while True:
+            row = self._queue.get()
+            try:
+                worksheet.append_row(row)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                if self._logger:
+                    self._logger.error(f'⚠️ Failed to log to Google Sheets: {e}')
+            finally:
+                self._queue.task_done()
+
+    def _discard_pending(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self.dropped += 1
+            self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and delivery counters for this process"""
+        return {
+            'state': self.state,
+            'depth': self._queue.qsize(),
+            'capacity': self._queue.maxsize,
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped
+        }
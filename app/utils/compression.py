@@ -0,0 +1,142 @@
+"""
+Negotiated response compression (brotli when installed, else gzip)
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DEFAULT_MIN_SIZE = 500
+
+# Preferred first
+AVAILABLE_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+# Per-response compression favours speed; precompressed variants are made once, so use the best ratio
+FAST_LEVELS = {'gzip': 6, 'br': 4}
+BEST_LEVELS = {'gzip': 9, 'br': 11}
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    level = (BEST_LEVELS if best else FAST_LEVELS)[encoding]
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    # mtime=0 makes the output a pure function of the input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def parse_accept_encoding(header: str) -> Callable[[str], float]:
+    """quality(encoding) for a raw Accept-Encoding header, like werkzeug's accept_encodings.quality"""
+    qualities = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+    return lambda encoding: qualities.get(encoding, qualities.get('*', 0.0))
+
+
+def negotiate(quality: Callable[[str], float]) -> Optional[str]:
+    """Best available encoding the client accepts, or None for identity"""
+    best, best_quality = None, 0.0
+    for encoding in AVAILABLE_ENCODINGS:
+        q = quality(encoding)
+        if q > best_quality:
+            best, best_quality = encoding, q
+    return best
+
+
+def precompress(body: bytes, min_size: int = DEFAULT_MIN_SIZE) -> Dict[str, bytes]:
+    """Best-ratio variants of a payload, keeping only those that are smaller"""
+    if len(body) < min_size:
+        return {}
+    variants = {}
+    for encoding in AVAILABLE_ENCODINGS:
+        compressed = compress(body, encoding, best=True)
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Each representation needs its own strong ETag"""
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+class CompressedVariantCache:
+    """Bounded LRU of compressed bodies keyed by (ETag, encoding)"""
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, etag: str, encoding: str, body: bytes) -> bytes:
+        key = (etag, encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compressed = compress(body, encoding, best=True)
+        with self._lock:
+            self._entries[key] = compressed
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compressed
+
+
+def install_compression(app, min_size: int = DEFAULT_MIN_SIZE, cache: Optional[CompressedVariantCache] = None):
+    """
+    Compress eligible Flask responses after the view runs. Responses with
+    an ETag and a public Cache-Control are identical for every client, so
+    their compressed bodies are cached; everything else is compressed per
+    response at a fast level. Streams and small bodies are sent as-is.
+    """
+    cache = cache or CompressedVariantCache()
+    app.compressed_variants = cache
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        from flask import request
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings.quality)
+        body = response.get_data()
+        if encoding is None or len(body) < min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        cacheable = etag and not weak and 'public' in response.headers.get('Cache-Control', '')
+        compressed = cache.get_or_compress(etag, encoding, body) if cacheable else compress(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak=weak)
+        return response
@@ -1,22 +1,16 @@
 """
 Response formatting utilities
 """
+import json
+
+from src.html_renderer import render_markup
+
 def format_response_for_html(response_text: str) -> str:
-    """Format response text for HTML display"""
-    if not response_text:
-        return ""
-    
-    # Convert markdown-style headers
-    formatted = response_text
-    formatted = formatted.replace('## ', '<h3>').replace('\n\n', '</h3>\n')
-    
-    # Convert bold text
-    formatted = formatted.replace('**', '<strong>').replace('**', '</strong>')
-    
-    # Convert newlines to <br>
-    formatted = formatted.replace('\n', '<br>')
-    
-    return formatted
+    """
+    Format response text for HTML display. Engine answers carry their own
+    HTML (QueryOptions(html=True)); this is for text from anywhere else.
+    """
+    return render_markup(response_text)
 
 def format_response_for_json(response_text: str, intent: str = '') -> dict:
     """Format response for JSON API"""
@@ -26,3 +20,18 @@ def format_response_for_json(response_text: str, intent: str = '') -> dict:
         'intent': intent,
         'timestamp': ''
     }
+
+def format_structured_response(result, show_proof: bool = True) -> dict:
+    """format=json fields of an engine answer: components, matched clauses and the proof trace"""
+    trace = result.proof_trace.to_dict()
+    fields = {
+        'components': [{'type': component_type, 'text': text} for component_type, text in result.components],
+        'clauses': trace['matched_clauses']
+    }
+    if show_proof:
+        fields['proof_trace'] = trace
+    return fields
+
+def format_sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message with a single-line JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,39 @@
+"""
+HTTP caching helpers (ETags and Cache-Control) for deterministic endpoints
+"""
+import hashlib
+import json
+from flask import Response
+
+DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+# /api/query bodies are per request (timestamp, session), so they are never stored
+DEFAULT_QUERY_CACHE_CONTROL = 'private, no-store'
+
+
+def make_etag(fingerprint: str, *parts) -> str:
+    """Strong ETag value derived from the engine fingerprint plus request input"""
+    payload = json.dumps([fingerprint, *parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+# Compressed representations carry the base ETag plus one of these suffixes
+ENCODING_ETAG_SUFFIXES = ('', '-gzip', '-br')
+
+
+def is_not_modified(request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag or its compressed variants"""
+    # If-None-Match uses weak comparison (RFC 9110, section 13.1.2)
+    return any(request.if_none_match.contains_weak(etag + suffix) for suffix in ENCODING_ETAG_SUFFIXES)
+
+
+def add_validators(response: Response, etag: str, cache_control: str) -> Response:
+    """Attach ETag and Cache-Control headers to a response"""
+    response.set_etag(etag)
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """Empty 304 response carrying the same validators as a full one"""
+    return add_validators(Response(status=304), etag, cache_control)
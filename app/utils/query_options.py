@@ -0,0 +1,27 @@
+"""
+Per-request query options from JSON bodies and query strings
+"""
+from typing import Any, Mapping
+
+from src.engine import QueryOptions
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+FALSE_VALUES = {'0', 'false', 'no', 'off'}
+
+
+def parse_bool(value: Any, name: str) -> bool:
+    """Accept JSON booleans and the usual query-string spellings"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in TRUE_VALUES | FALSE_VALUES:
+        return value.lower() in TRUE_VALUES
+    raise ValueError(f'"{name}" must be a boolean')
+
+
+def parse_query_options(data: Mapping[str, Any], html: bool = False) -> QueryOptions:
+    """
+    Build QueryOptions from "show_proof" and "format"; raises ValueError on
+    bad values. html is decided by the endpoint, not by the client.
+    """
+    show_proof = parse_bool(data.get('show_proof', True), 'show_proof')
+    return QueryOptions(show_proof=show_proof, output_format=data.get('format', 'text'), html=html)
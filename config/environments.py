@@ -22,6 +22,13 @@ class Config:
     
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
+    
+    # HTTP caching (ETags on GET endpoints; these control shared caches)
+    API_CACHE_CONTROL = os.environ.get('API_CACHE_CONTROL', 'public, max-age=300')
+    API_QUERY_CACHE_CONTROL = os.environ.get('API_QUERY_CACHE_CONTROL', 'private, no-store')
+    
+    # gzip/brotli for API responses of at least this many bytes (0 disables)
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))
 
 
 class DevelopmentConfig(Config):
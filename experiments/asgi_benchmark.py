@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+ASGI vs gunicorn sync benchmark for PC-MLRA
+
+Starts each deployment locally with the same number of worker processes,
+drives it with concurrent keep-alive clients for a fixed duration and
+reports requests/sec and latency percentiles per deployment.
+
+Usage:
+    python experiments/asgi_benchmark.py
+    python experiments/asgi_benchmark.py --workers 2 --concurrency 32 --duration 15 --json asgi_benchmark.json
+
+Requires gunicorn and uvicorn (requirements/production.txt). The load
+generator is a Python thread pool, so compare the two deployments with
+each other rather than reading the absolute numbers as server capacity.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEPLOYMENTS = {
+    'gunicorn-sync': lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', '--worker-class', 'sync', '-w', str(workers),
+        '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'run:app'
+    ],
+    'uvicorn-asgi': lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', '--factory', 'app.asgi:create_asgi_app',
+        '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port),
+        '--log-level', 'warning', '--no-access-log'
+    ],
+}
+
+QUERIES = [
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "I need a second opinion",
+    "Hospital is charging too much",
+    "Emergency! Hospital refused to admit my father after an accident",
+    "The doctor performed surgery without my consent",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not become ready')
+
+
+def client_loop(port, stop_at, latencies, errors, index):
+    """One keep-alive client posting queries until the deadline"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    i = index
+    while time.perf_counter() < stop_at:
+        body = json.dumps({'query': QUERIES[i % len(QUERIES)]})
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request('POST', '/api/query', body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException):
+            errors.append('connection')
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def run_load(port, concurrency, duration):
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client_loop, args=(port, stop_at, latencies, errors, i))
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def benchmark(name, workers, concurrency, duration, warmup):
+    port = free_port()
+    server = subprocess.Popen(DEPLOYMENTS[name](port, workers), cwd=PROJECT_ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port)
+        run_load(port, concurrency, warmup)
+        latencies, errors, elapsed = run_load(port, concurrency, duration)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        'deployment': name,
+        'workers': workers,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_sec': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the ASGI app with the gunicorn sync deployment')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes per deployment')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent keep-alive clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds per deployment')
+    parser.add_argument('--warmup', type=float, default=2.0, help='unmeasured seconds before each run')
+    parser.add_argument('--only', choices=sorted(DEPLOYMENTS), action='append', help='run only this deployment')
+    parser.add_argument('--json', dest='json_path', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    results = [
+        benchmark(name, args.workers, args.concurrency, args.duration, args.warmup)
+        for name in (args.only or DEPLOYMENTS)
+    ]
+
+    print("⚡ PC-MLRA ASGI vs gunicorn sync")
+    print("=" * 72)
+    print(f"{'deployment':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'errors':>8}")
+    for r in results:
+        print(f"{r['deployment']:<16}{r['requests_per_sec']:>10.1f}{r['p50_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['mean_ms']:>10.2f}{r['errors']:>8}")
+    print("=" * 72)
+    print(f"{args.workers} workers, {args.concurrency} clients, {args.duration:.0f}s per deployment")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compression benchmark for PC-MLRA API responses
+
+Builds real /api/query and /api/system/stats bodies through the Flask app,
+then reports bytes on the wire and CPU time per response for identity,
+gzip and (if installed) brotli at several levels, plus the cost of serving
+a cached precompressed variant.
+
+Usage:
+    python experiments/compression_benchmark.py
+    python experiments/compression_benchmark.py --repeat 200 --json compression_benchmark.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.compression import CompressedVariantCache, brotli
+
+QUERIES = [
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "I need a second opinion",
+    "Hospital is charging too much",
+    "Emergency! Hospital refused to admit my father after an accident",
+    "The doctor performed surgery without my consent",
+    "The hospital will not release the body until we pay the bill",
+]
+
+CODECS = [('gzip', level, lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+          for level in (1, 6, 9)]
+if brotli is not None:
+    CODECS += [('br', quality, lambda body, quality=quality: brotli.compress(body, quality=quality))
+               for quality in (4, 11)]
+
+
+def collect_bodies():
+    """Uncompressed response bodies as the API returns them"""
+    os.environ['COMPRESSION_MIN_SIZE'] = '0'
+    client = create_app().test_client()
+    bodies = {}
+    for query in QUERIES:
+        for show_proof in (True, False):
+            response = client.post('/api/query', json={'query': query, 'show_proof': show_proof})
+            bodies[f'query:{query[:30]}:proof={show_proof}'] = response.data
+    bodies['system_stats'] = client.get('/api/system/stats').data
+    return bodies
+
+
+def cpu_seconds(func, body, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        func(body)
+    return (time.process_time() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure bytes on the wire and CPU cost of response compression')
+    parser.add_argument('--repeat', type=int, default=50, help='compressions per body and codec')
+    parser.add_argument('--json', dest='json_path', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    bodies = collect_bodies()
+    identity_bytes = statistics.mean(len(body) for body in bodies.values())
+    rows = [{'encoding': 'identity', 'level': None, 'mean_bytes': identity_bytes, 'ratio': 1.0, 'cpu_us': 0.0}]
+
+    for encoding, level, func in CODECS:
+        sizes = [len(func(body)) for body in bodies.values()]
+        cpu = [cpu_seconds(func, body, args.repeat) for body in bodies.values()]
+        rows.append({
+            'encoding': encoding,
+            'level': level,
+            'mean_bytes': statistics.mean(sizes),
+            'ratio': statistics.mean(len(body) / size for body, size in zip(bodies.values(), sizes)),
+            'cpu_us': statistics.mean(cpu) * 1e6,
+        })
+
+    # Cached precompressed variant: a lookup instead of a compression
+    cache = CompressedVariantCache()
+    for name, body in bodies.items():
+        cache.get_or_compress(name, 'gzip', body)
+    cached_cpu = [cpu_seconds(lambda b, name=name: cache.get_or_compress(name, 'gzip', b), body, args.repeat)
+                  for name, body in bodies.items()]
+    best_gzip = next(r for r in rows if r['encoding'] == 'gzip' and r['level'] == 9)
+    rows.append({
+        'encoding': 'gzip (cached)',
+        'level': 9,
+        'mean_bytes': best_gzip['mean_bytes'],
+        'ratio': best_gzip['ratio'],
+        'cpu_us': statistics.mean(cached_cpu) * 1e6,
+    })
+
+    print("🗜️  PC-MLRA Response Compression")
+    print("=" * 64)
+    print(f"{len(bodies)} response bodies, mean {identity_bytes:.0f} bytes uncompressed")
+    print(f"{'encoding':<16}{'level':>6}{'bytes':>10}{'ratio':>8}{'CPU µs/resp':>14}")
+    for r in rows:
+        level = '' if r['level'] is None else r['level']
+        print(f"{r['encoding']:<16}{level:>6}{r['mean_bytes']:>10.0f}{r['ratio']:>8.2f}{r['cpu_us']:>14.1f}")
+    print("=" * 64)
+    if brotli is None:
+        print("brotli not installed: pip install brotli to include it")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'bodies': len(bodies), 'results': rows}, f, indent=2)
+        print(f"📄 Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Pipeline performance benchmark for PC-MLRA
+
+Times each pipeline component in isolation (intent classification, KB
+lookups, KB keyword search, template filling) and end-to-end
+generate_response, with and without the response cache. Each point
+pairs a query length with a corpus size (the number of distinct
+synthetic queries cycled through), which is what decides response
+cache hit rates.
+
+Per benchmark it reports ops/sec, p50/p95/p99 latency and, in a
+separate traced pass so tracing does not skew the timings, the
+tracemalloc peak and the number of memory blocks still allocated
+afterwards. The process RSS high-water mark is recorded for the run.
+
+Usage:
+    python experiments/pipeline_benchmark.py
+    python experiments/pipeline_benchmark.py --json bench.json --save-baseline experiments/pipeline_baseline.json
+    python experiments/pipeline_benchmark.py --baseline experiments/pipeline_baseline.json --threshold 0.15
+
+With --baseline the exit status is 1 when any benchmark's ops/sec drops,
+or its p95 latency rises, by more than the threshold.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.response_assembler import ResponseAssembler
+from tests_metrices.generators.synthetic_corpus import CorpusConfig, CorpusGenerator, load_profiles
+
+DEFAULT_LENGTHS = (8, 32, 128)
+DEFAULT_CORPUS_SIZES = (100, 2000)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def build_queries(assembler, median_words, corpus_size, seed):
+    config = CorpusConfig(seed=seed, median_words=median_words, length_sigma=0.25,
+                          max_words=median_words * 3)
+    generator = CorpusGenerator(load_profiles(assembler.classifier, assembler.kb), config)
+    return [case["user_query"] for case in generator.cases(corpus_size)]
+
+
+def kb_lookup(kb, intents, clause_ids):
+    for intent in intents:
+        kb.get_clauses_by_intent(intent)
+    for clause_id in clause_ids:
+        kb.get_clause_by_id(clause_id)
+
+
+def kb_search(kb, keywords):
+    for keyword in keywords:
+        kb.search_clauses_by_keyword(keyword)
+
+
+def workloads(assembler, queries):
+    """(name, func, argument tuples) per benchmarked component"""
+    classifier, kb, templates = assembler.classifier, assembler.kb, assembler.template_engine
+    cleaned = [assembler.clean_query(q) for q in queries]
+    decisions = [assembler.decide(q) for q in queries]
+
+    yield "classify", classifier.classify, [(q,) for q in cleaned]
+    yield "kb_lookup", kb_lookup, [
+        (kb, [intent for intent, _ in classifier.classify(q)], [c["id"] for c in d.clauses])
+        for q, d in zip(cleaned, decisions)
+    ]
+    yield "kb_search", kb_search, [(kb, assembler.extract_keywords(q)) for q in cleaned]
+    yield "fill_template", templates.fill_template, [(d.template_id, d.context) for d in decisions]
+    yield "generate_response", assembler.generate_response, [(q,) for q in queries]
+
+    # Cold cache per point: hits depend only on this corpus
+    cached = ResponseAssembler()
+    yield "generate_response_cached", cached.generate_response, [(q,) for q in queries]
+
+
+def time_workload(func, args_list, ops):
+    latencies = []
+    n = len(args_list)
+    started = time.perf_counter()
+    for i in range(ops):
+        args = args_list[i % n]
+        t0 = time.perf_counter_ns()
+        func(*args)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops": ops,
+        "ops_per_sec": ops / elapsed,
+        "p50_us": percentile(latencies, 0.50) / 1000,
+        "p95_us": percentile(latencies, 0.95) / 1000,
+        "p99_us": percentile(latencies, 0.99) / 1000,
+    }
+
+
+def trace_workload(func, args_list, ops):
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    n = len(args_list)
+    for i in range(ops):
+        func(*args_list[i % n])
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    gc.collect()
+    return {
+        "peak_kib": peak / 1024,
+        "retained_blocks": sys.getallocatedblocks() - blocks_before,
+    }
+
+
+def run_benchmarks(lengths, corpus_sizes, ops, memory_ops, seed):
+    started = time.perf_counter()
+    assembler = ResponseAssembler(response_cache_size=0)
+    build_seconds = time.perf_counter() - started
+
+    results = []
+    for median_words in lengths:
+        for corpus_size in corpus_sizes:
+            queries = build_queries(assembler, median_words, corpus_size, seed)
+            mean_words = sum(len(q.split()) for q in queries) / len(queries)
+            for name, func, args_list in workloads(assembler, queries):
+                row = {"name": name, "query_words": median_words, "corpus_size": corpus_size,
+                       "mean_query_words": round(mean_words, 1)}
+                # Warm up once over the corpus so one-time costs are not timed
+                for args in args_list[:min(len(args_list), 50)]:
+                    func(*args)
+                row.update(time_workload(func, args_list, max(ops, 1)))
+                if memory_ops:
+                    row.update(trace_workload(func, args_list, memory_ops))
+                results.append(row)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine_fingerprint": assembler.engine_fingerprint,
+            "engine_build_seconds": build_seconds,
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "ops": ops,
+            "memory_ops": memory_ops,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def result_key(row):
+    return row["name"], row["query_words"], row["corpus_size"]
+
+
+def compare(current, baseline, threshold):
+    """Rows that regressed past threshold, with the baseline numbers they are compared to"""
+    base_rows = {result_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        base = base_rows.get(result_key(row))
+        if base is None:
+            continue
+        slower = row["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold)
+        laggier = row["p95_us"] > base["p95_us"] * (1 + threshold)
+        if slower or laggier:
+            regressions.append((row, base))
+    return regressions
+
+
+def print_results(report):
+    meta = report["meta"]
+    print("⏱️  PC-MLRA Pipeline Benchmark")
+    print("=" * 96)
+    print(f"Python {meta['python']}, engine {meta['engine_fingerprint']} built in "
+          f"{meta['engine_build_seconds'] * 1000:.0f} ms, max RSS {meta['max_rss_kib'] / 1024:.1f} MiB")
+    print(f"{'benchmark':<26}{'words':>6}{'corpus':>8}{'ops/s':>11}{'p50 µs':>9}{'p95 µs':>9}"
+          f"{'p99 µs':>9}{'peak KiB':>10}{'blocks':>8}")
+    for r in report["results"]:
+        memory = (f"{r['peak_kib']:>10.1f}{r['retained_blocks']:>8}" if "peak_kib" in r else "")
+        print(f"{r['name']:<26}{r['query_words']:>6}{r['corpus_size']:>8}{r['ops_per_sec']:>11.0f}"
+              f"{r['p50_us']:>9.1f}{r['p95_us']:>9.1f}{r['p99_us']:>9.1f}{memory}")
+    print("=" * 96)
+
+
+def parse_points(spec):
+    return tuple(int(value) for value in spec.split(",") if value.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PC-MLRA pipeline components and end-to-end responses")
+    parser.add_argument("--lengths", type=parse_points, default=DEFAULT_LENGTHS,
+                        help="median query lengths in words, comma-separated")
+    parser.add_argument("--corpus-sizes", type=parse_points, default=DEFAULT_CORPUS_SIZES,
+                        help="distinct queries per point, comma-separated")
+    parser.add_argument("--ops", type=int, default=2000, help="timed operations per benchmark")
+    parser.add_argument("--memory-ops", type=int, default=200,
+                        help="operations in the traced memory pass; 0 skips it")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None, help="write results to this file")
+    parser.add_argument("--baseline", default=None, help="compare against this results file")
+    parser.add_argument("--save-baseline", default=None, help="write results to this file as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed fractional drop in ops/sec or rise in p95 before failing")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.lengths, args.corpus_sizes, args.ops, args.memory_ops, args.seed)
+    print_results(report)
+
+    for path in filter(None, (args.json_path, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:")
+            for row, base in regressions:
+                print(f"   {row['name']} words={row['query_words']} corpus={row['corpus_size']}: "
+                      f"{base['ops_per_sec']:.0f} → {row['ops_per_sec']:.0f} ops/s, "
+                      f"p95 {base['p95_us']:.1f} → {row['p95_us']:.1f} µs")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Gunicorn server hooks (read from the working directory by default)
+Worker counts and binding stay on the command line (Procfile, render.yaml)
+"""
+
+import os
+
+
+def on_starting(server):
+    """Start every server run with empty metrics, before any worker is forked"""
+    directory = os.environ.get('PC_MLRA_METRICS_DIR')
+    if directory:
+        from app.services.metrics_registry import clear_metrics_directory
+        clear_metrics_directory(directory)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Startup profile for the PC-MLRA web app
+
+Reports import time per module (python -X importtime), engine build time
+and total create_app() time, each measured in a fresh interpreter. Exits
+non-zero when a budget is exceeded or a deferred optional integration is
+imported at startup, so it can guard against cold-start regressions.
+
+Usage:
+    python scripts/startup_profile.py
+    python scripts/startup_profile.py --budget-ms 400 --json startup_profile.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported while a worker boots
+DEFERRED_MODULES = ['gspread', 'google.oauth2', 'google_auth_oauthlib']
+
+TIMING_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+print(json.dumps({
+    'import_app_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'engine_build_ms': getattr(app, 'engine_build_seconds', 0.0) * 1000,
+}))
+"""
+
+
+def run_python(args, env_extra=None):
+    env = dict(os.environ, **(env_extra or {}))
+    return subprocess.run(
+        [sys.executable] + args, cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+
+
+def profile_imports():
+    """Per-module import times (ms) for `import app`, with nesting depth"""
+    result = run_python(['-X', 'importtime', '-c', 'from app import create_app; create_app()'])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        name = name.rstrip()
+        modules.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip(' '))) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def profile_startup(repeat):
+    """Median import/create_app/engine-build times over several fresh interpreters"""
+    runs = [json.loads(run_python(['-c', TIMING_SNIPPET]).stdout.strip().splitlines()[-1])
+            for _ in range(repeat)]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile PC-MLRA web app startup')
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters to time (median is reported)')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest modules to list')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='fail if import + create_app exceeds this many milliseconds')
+    parser.add_argument('--json', dest='json_path', default=None, help='write the full report to this file')
+    args = parser.parse_args()
+
+    modules = profile_imports()
+    timings = profile_startup(args.repeat)
+    imported = {m['module'] for m in modules}
+    deferred_violations = [name for name in DEFERRED_MODULES if name in imported]
+    total_ms = timings['import_app_ms'] + timings['create_app_ms']
+
+    print("⏱️  PC-MLRA Startup Profile")
+    print("=" * 60)
+    print(f"import app:        {timings['import_app_ms']:8.1f} ms")
+    print(f"create_app():      {timings['create_app_ms']:8.1f} ms")
+    print(f"  engine build:    {timings['engine_build_ms']:8.1f} ms")
+    print(f"total:             {total_ms:8.1f} ms  (median of {args.repeat})")
+    print()
+    print("Slowest top-level imports (cumulative):")
+    top_level = sorted((m for m in modules if m['depth'] <= 1),
+                       key=lambda m: m['cumulative_ms'], reverse=True)
+    for m in top_level[:args.top]:
+        print(f"  {m['cumulative_ms']:8.1f} ms  {m['module']}")
+    print("=" * 60)
+
+    failures = []
+    if deferred_violations:
+        failures.append(f"optional integrations imported at startup: {', '.join(deferred_violations)}")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"startup took {total_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'timings_ms': timings,
+                'total_ms': total_ms,
+                'deferred_violations': deferred_violations,
+                'modules': modules,
+            }, f, indent=2)
+        print(f"📄 Report written to {args.json_path}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Startup within limits")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Decision Coverage for PC-MLRA
+Counts how often each intent, clause, template and hard-override branch
+is reached, to find the parts of the engine no traffic exercises
+"""
+
+import threading
+from typing import Dict, Iterable, Tuple
+
+from src.intent_classifier import CLASSIFY_BRANCHES
+from src.response_assembler import DECISION_BRANCHES
+
+# Rendered after every response's own template
+ALWAYS_RENDERED_TEMPLATES = ("TEMPLATE_DISCLAIMER",)
+
+COVERAGE_KINDS = ("intents", "clauses", "templates", "branches")
+
+# (intent names, clause ids, template id, branches taken)
+CoverageSignature = Tuple[Tuple[str, ...], Tuple[str, ...], str, Tuple[str, ...]]
+
+
+def coverage_signature(proof_trace) -> CoverageSignature:
+    """The parts of a proof trace that coverage counts"""
+    return (
+        tuple(intent for intent, _ in proof_trace.matched_intents),
+        tuple(clause["id"] for clause in proof_trace.matched_clauses),
+        proof_trace.template_used,
+        tuple(proof_trace.branches),
+    )
+
+
+class DecisionCoverage:
+    """
+    Hit counts per intent, clause id, template id and override branch.
+    observe() only counts whole decision signatures, one dict update per
+    response, so it is cheap enough for a response listener; per-item
+    counts are expanded from the few distinct signatures in snapshot().
+    """
+
+    def __init__(self, intents: Iterable[str] = (), clauses: Iterable[str] = (),
+                 templates: Iterable[str] = (), branches: Iterable[str] = CLASSIFY_BRANCHES + DECISION_BRANCHES):
+        # Everything that could be hit, so unreached items are reported too
+        self.universe = {
+            "intents": tuple(intents),
+            "clauses": tuple(clauses),
+            "templates": tuple(templates),
+            "branches": tuple(branches),
+        }
+        self._lock = threading.Lock()
+        self._signatures: Dict[CoverageSignature, int] = {}
+
+    @classmethod
+    def for_assembler(cls, assembler) -> "DecisionCoverage":
+        """Coverage over every intent, clause and template the assembler has loaded"""
+        return cls(
+            intents=assembler.classifier.intents.keys(),
+            clauses=(clause["id"] for clause in assembler.kb.get_all_clauses()),
+            templates=assembler.template_engine.templates.keys(),
+        )
+
+    def observe(self, proof_trace):
+        """Count one response; usable as a ResponseAssembler response listener"""
+        self.add(coverage_signature(proof_trace))
+
+    def add(self, signature: CoverageSignature, count: int = 1):
+        with self._lock:
+            self._signatures[signature] = self._signatures.get(signature, 0) + count
+
+    def merge(self, other: "DecisionCoverage"):
+        """Add another collector's counts (e.g. from a worker process)"""
+        for signature, count in other.signatures().items():
+            self.add(signature, count)
+
+    def signatures(self) -> Dict[CoverageSignature, int]:
+        with self._lock:
+            return dict(self._signatures)
+
+    def snapshot(self) -> Dict:
+        """
+        {"responses": n, "distinct_decisions": n,
+         "hits": {kind: {name: count}}, "unreached": {kind: [names]},
+         "unknown": {kind: [names hit but not in the universe]},
+         "coverage": {kind: fraction of the universe reached}}
+        Hits are listed universe first, then anything seen outside it.
+        """
+        signatures = self.signatures()
+        hits = {kind: dict.fromkeys(self.universe[kind], 0) for kind in COVERAGE_KINDS}
+        responses = 0
+        for (intents, clauses, template_id, branches), count in signatures.items():
+            responses += count
+            for kind, names in (("intents", intents), ("clauses", clauses),
+                                ("templates", (template_id,) + ALWAYS_RENDERED_TEMPLATES),
+                                ("branches", branches)):
+                counts = hits[kind]
+                for name in names:
+                    counts[name] = counts.get(name, 0) + count
+
+        return {
+            "responses": responses,
+            "distinct_decisions": len(signatures),
+            "hits": hits,
+            "unreached": {kind: [name for name, count in hits[kind].items() if not count]
+                          for kind in COVERAGE_KINDS},
+            "unknown": {kind: [name for name in hits[kind] if name not in self.universe[kind]]
+                        for kind in COVERAGE_KINDS},
+            "coverage": {
+                kind: (sum(1 for name in self.universe[kind] if hits[kind][name]) / len(self.universe[kind])
+                       if self.universe[kind] else 1.0)
+                for kind in COVERAGE_KINDS
+            },
+        }
+
+    def reset(self):
+        with self._lock:
+            self._signatures = {}
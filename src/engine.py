@@ -0,0 +1,108 @@
+"""
+PC-MLRA Engine
+Stateless query API shared by the web app, the services and the CLI
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from src.response_assembler import ProofTrace, ResponseAssembler
+
+# "text": the assembled response; "sections": also the (section, text) parts;
+# "json": only the rendered (type, text) components, no assembled text
+OUTPUT_FORMATS = ("text", "sections", "json")
+
+
+@dataclass(frozen=True)
+class QueryOptions:
+    """Per-request options; nothing about a request is stored on the engine"""
+    show_proof: bool = True
+    output_format: str = "text"
+    # Also render the response as HTML (QueryResult.html)
+    html: bool = False
+
+    def __post_init__(self):
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format '{self.output_format}' (expected one of {', '.join(OUTPUT_FORMATS)})"
+            )
+
+
+DEFAULT_OPTIONS = QueryOptions()
+
+
+@dataclass
+class QueryResult:
+    """Answer to one query (response is None in the "json" format)"""
+    response: Optional[str]
+    proof_trace: ProofTrace
+    intent: str
+    template_id: str
+    sections: Optional[List[Tuple[str, str]]] = None
+    html: Optional[str] = None
+    components: Optional[List[Tuple[str, str]]] = None
+
+    @property
+    def log_text(self) -> str:
+        """Text for logs and chat history: the response, or the headline component"""
+        if self.response is not None:
+            return self.response
+        return self.components[0][1] if self.components else ""
+
+
+class PCMLRAEngine:
+    """
+    Answers queries without keeping any per-user or per-request state, so
+    one instance can be shared by every request and thread of a worker.
+    Every query is answered as a question: console commands such as
+    "proof off" or "quit" belong to the CLI (src/main.py).
+    """
+
+    def __init__(self, assembler: Optional[ResponseAssembler] = None):
+        self.assembler = assembler or ResponseAssembler()
+        self.kb = self.assembler.kb
+
+    @property
+    def engine_fingerprint(self) -> str:
+        return self.assembler.engine_fingerprint
+
+    def answer(self, query: str, options: QueryOptions = DEFAULT_OPTIONS) -> QueryResult:
+        """Answer one query with the given options"""
+        response = sections = html = components = None
+        if options.output_format == "json":
+            components, proof_trace = self.assembler.generate_components(query, options.show_proof)
+        elif options.output_format == "sections":
+            decision = self.assembler.decide(query, options.show_proof)
+            sections = list(self.assembler.render_sections(decision, options.show_proof))
+            response = "".join(text for _, text in sections)
+            proof_trace = decision.proof_trace
+            if options.html:
+                html = self.assembler.render_html(decision, options.show_proof)
+        elif options.html:
+            response, html, proof_trace = self.assembler.generate_rendered(query, options.show_proof)
+        else:
+            response, proof_trace = self.assembler.generate_response(query, options.show_proof)
+
+        return QueryResult(
+            response=response,
+            proof_trace=proof_trace,
+            intent=top_intent(proof_trace),
+            template_id=proof_trace.template_used,
+            sections=sections,
+            html=html,
+            components=components
+        )
+
+    def answer_many(self, queries: List[str], options: QueryOptions = DEFAULT_OPTIONS) -> List[QueryResult]:
+        """Answer several queries, in order, sharing classification work"""
+        if options.output_format != "text" or options.html:
+            return [self.answer(query, options) for query in queries]
+        return [
+            QueryResult(response, proof_trace, top_intent(proof_trace), proof_trace.template_used)
+            for response, proof_trace in self.assembler.generate_responses(queries, options.show_proof)
+        ]
+
+
+def top_intent(proof_trace: ProofTrace) -> str:
+    """Highest-ranked intent of a response, or "unknown" if none matched"""
+    return proof_trace.matched_intents[0][0] if proof_trace.matched_intents else "unknown"
@@ -0,0 +1,64 @@
+"""
+Engine Version Fingerprint for PC-MLRA
+Identifies the exact intents, knowledge base, templates and assembly code
+behind a response, so anything derived from it can be cached safely
+"""
+
+import hashlib
+import json
+import os
+
+# Modules whose code decides what a response contains
+ENGINE_SOURCE_FILES = (
+    "intent_classifier.py",
+    "knowledge_loader.py",
+    "template_engine.py",
+    "response_assembler.py",
+    "html_renderer.py",
+)
+
+
+def compute_engine_fingerprint(classifier, kb, template_engine) -> str:
+    """Hash the loaded intent table, KB data, templates and engine source"""
+    digest = hashlib.sha256()
+
+    for part in (
+        classifier.INTENT_PRIORITY,
+        classifier.intents,
+        kb.data,
+        template_engine.templates,
+    ):
+        digest.update(
+            json.dumps(part, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        )
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for filename in ENGINE_SOURCE_FILES:
+        with open(os.path.join(src_dir, filename), "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()[:16]
+
+
+def component_fingerprints(classifier, kb, template_engine) -> dict:
+    """Separate hashes of the intent table, KB, templates and engine source"""
+    def digest_of(*parts) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(
+                json.dumps(part, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            )
+        return digest.hexdigest()[:16]
+
+    code = hashlib.sha256()
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for filename in ENGINE_SOURCE_FILES:
+        with open(os.path.join(src_dir, filename), "rb") as f:
+            code.update(f.read())
+
+    return {
+        "intents": digest_of(classifier.INTENT_PRIORITY, classifier.intents),
+        "kb": digest_of(kb.data),
+        "templates": digest_of(template_engine.templates),
+        "code": code.hexdigest()[:16],
+    }
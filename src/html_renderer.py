@@ -0,0 +1,169 @@
+"""
+HTML Renderer for PC-MLRA
+Renders the response markup (headers, bullets, numbered steps, bold,
+dividers) to escaped HTML in a single pass per line
+"""
+
+import re
+from html import escape
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+# A rendered line: (kind, inner HTML). Kinds: blank, rule, h1-h3, bullet, numbered, text
+Line = Tuple[str, str]
+
+VARIABLE = re.compile(r'\{(\w+)\}')
+
+# Bold or italic span; an unmatched "*" stays literal instead of opening a tag
+_EMPHASIS = re.compile(r'\*\*(?=\S)(.+?)\*\*|\*(?=\S)([^*\n]+?)\*')
+
+_HEADING = re.compile(r'(#{1,3}) (.*)')
+_BULLET = re.compile(r'\s*• (.*)')
+_NUMBERED = re.compile(r'\s*\d+\. (.*)')
+_RULE = re.compile(r'\s*(?:-{3,}|={3,})\s*')
+
+HEADING_STYLES = {"h1", "h2", "h3"}
+INLINE_STYLES = {"bold": "strong", "italic": "em"}
+
+# Block element opened by a run of consecutive lines of one kind
+_CONTAINERS = {
+    "bullet": ("<ul>", "</ul>"),
+    "numbered": ("<ol>", "</ol>"),
+    "text": ("<p>", "</p>"),
+}
+
+
+def render_inline(text: str) -> str:
+    """Escape text and turn paired **bold** / *italic* spans into tags"""
+    parts = []
+    pos = 0
+    for match in _EMPHASIS.finditer(text):
+        parts.append(escape(text[pos:match.start()]))
+        if match.group(1) is not None:
+            parts.append(f"<strong>{escape(match.group(1))}</strong>")
+        else:
+            parts.append(f"<em>{escape(match.group(2))}</em>")
+        pos = match.end()
+    parts.append(escape(text[pos:]))
+    return "".join(parts)
+
+
+def classify_line(line: str) -> Tuple[str, str]:
+    """(kind, content without its marker) for one line of markup"""
+    if not line.strip():
+        return "blank", ""
+    if _RULE.fullmatch(line):
+        return "rule", ""
+    match = _HEADING.fullmatch(line)
+    if match:
+        return f"h{len(match.group(1))}", match.group(2)
+    match = _BULLET.fullmatch(line)
+    if match:
+        return "bullet", match.group(1)
+    match = _NUMBERED.fullmatch(line)
+    if match:
+        return "numbered", match.group(1)
+    return "text", line.strip()
+
+
+def markup_lines(text: str) -> Iterator[Line]:
+    """Rendered lines of a markup string"""
+    for line in text.split("\n"):
+        kind, content = classify_line(line)
+        yield kind, render_inline(content)
+
+
+def render_blocks(lines: Iterable[Line]) -> str:
+    """
+    Group rendered lines into block elements: runs of bullets become one
+    <ul>, numbered steps one <ol>, text lines one <p> (broken with <br>);
+    a blank line ends the current block.
+    """
+    out = []
+    current = None
+    for kind, html in lines:
+        if current is not None and kind != current:
+            out.append(_CONTAINERS[current][1])
+            current = None
+        if kind == "blank":
+            continue
+        if kind == "rule":
+            out.append("<hr>")
+        elif kind in HEADING_STYLES:
+            out.append(f"<{kind}>{html}</{kind}>")
+        else:
+            if current is None:
+                out.append(_CONTAINERS[kind][0])
+                current = kind
+            elif kind == "text":
+                out.append("<br>")
+            out.append(html if kind == "text" else f"<li>{html}</li>")
+    if current is not None:
+        out.append(_CONTAINERS[current][1])
+    return "".join(out)
+
+
+def render_markup(text: str) -> str:
+    """HTML for a complete markup string"""
+    if not text:
+        return ""
+    return render_blocks(markup_lines(text))
+
+
+# A variable resolves to list items (rendered as bullets) or to a markup string
+VariableValue = Union[List[str], str]
+
+
+class CompiledComponent:
+    """
+    One template component with its markup converted to HTML ahead of time.
+    Each line keeps its kind and its HTML pieces, alternating static HTML and
+    variable names, so rendering only escapes and splices variable values.
+    """
+
+    __slots__ = ("style", "lines", "variables")
+
+    def __init__(self, text: str, style: Optional[str] = None):
+        self.style = style
+        self.lines = []
+        variables = set()
+        for line in text.split("\n"):
+            kind, content = classify_line(line)
+            # Placeholders contain no markup or escapable characters, so they survive render_inline
+            pieces = VARIABLE.split(render_inline(content))
+            variables.update(pieces[1::2])
+            self.lines.append((kind, pieces))
+        self.variables = frozenset(variables)
+
+    def render(self, resolve: Callable[[str], VariableValue]) -> str:
+        """HTML for this component, with resolve(variable) supplying each value"""
+        lines = []
+        for kind, pieces in self.lines:
+            if kind == "text" and len(pieces) == 3 and not pieces[0] and not pieces[2]:
+                # A variable on a line of its own may expand to several lines
+                lines.extend(_value_lines(resolve(pieces[1])))
+                continue
+            html = "".join(
+                piece if i % 2 == 0 else _inline_value(resolve(piece))
+                for i, piece in enumerate(pieces)
+            )
+            lines.append((kind, html))
+
+        if self.style in HEADING_STYLES:
+            heading = " ".join(html for kind, html in lines if kind != "blank")
+            return f"<{self.style}>{heading}</{self.style}>"
+        if self.style in INLINE_STYLES:
+            tag = INLINE_STYLES[self.style]
+            lines = [(kind, f"<{tag}>{html}</{tag}>" if html else html) for kind, html in lines]
+        return render_blocks(lines)
+
+
+def _value_lines(value: VariableValue) -> List[Line]:
+    if isinstance(value, list):
+        return [("bullet", escape(str(item))) for item in value]
+    return list(markup_lines(value))
+
+
+def _inline_value(value: VariableValue) -> str:
+    if isinstance(value, list):
+        return escape(", ".join(str(item) for item in value))
+    return "<br>".join(render_inline(line) for line in value.split("\n"))
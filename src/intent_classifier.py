@@ -4,14 +4,24 @@ Updated with all 17 NHRC rights and IMC provisions
 """
 
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+from src.immutable import freeze
+
+# Hard overrides in classify(), in the order they are checked
+CLASSIFY_BRANCHES = (
+    "classify.nhrc15_first",
+    "classify.clinical_trial_first",
+    "classify.research_first",
+    "classify.referral_first",
+)
 
 class IntentClassifier:
     """
     Deterministic rule-based intent classifier.
     NHRC intents are priority-governed.
     """
-    INTENT_PRIORITY = [
+    INTENT_PRIORITY = (
         # 🔴 Absolute protections
         "detained_for_payment",        # NHRC-15
         "body_withheld",               # NHRC-15
@@ -44,10 +54,11 @@ class IntentClassifier:
         
         # 🟢 Generic fallback
         "right_to_information"         # NHRC-1
-    ]
+    )
 
     def __init__(self):
-        self.intents = self._load_intents()
+        # Read-only once built, so one classifier can serve every thread
+        self.intents = freeze(self._load_intents())
         
     def _load_intents(self) -> Dict:
         """Load predefined intents with keywords and patterns"""
@@ -395,11 +406,14 @@ class IntentClassifier:
         query = re.sub(r'\s+', ' ', query)  # Normalize whitespace
         return query
     
-    def classify(self, query: str) -> List[Tuple[str, float]]:
+    def classify(self, query: str, branches: Optional[List[str]] = None) -> List[Tuple[str, float]]:
         """
         Classify query into one or more intents
         Returns list of (intent, confidence_score)
+        When branches is a list, the CLASSIFY_BRANCHES taken are appended to it
         """
+        branches = [] if branches is None else branches
+        
         # 🔒 HARD LEGAL OVERRIDE: Commercial referral beats choice-of-source
         cleaned_query = self.clean_query(query)
         words = cleaned_query.split()
@@ -447,27 +461,51 @@ class IntentClassifier:
             sorted_intents.sort(
                 key=lambda x: 0 if x[0] in {"detained_for_payment", "body_withheld"} else 1
             )
+            branches.append("classify.nhrc15_first")
 
         # NHRC-13 (Clinical Trials) highest
         if "clinical_trial_rights" in intent_names:
             sorted_intents.sort(
                 key=lambda x: 0 if x[0] == "clinical_trial_rights" else 1
             )
+            branches.append("classify.clinical_trial_first")
 
         # NHRC-14 (Biomedical Research) next
         elif any(i in intent_names for i in {"biomedical_research", "research_rights"}):
             sorted_intents.sort(
                 key=lambda x: 0 if x[0] in {"biomedical_research", "research_rights"} else 1
             )
+            branches.append("classify.research_first")
 
         # NHRC-12 beats NHRC-11
         elif any(i in intent_names for i in {"kickback_commission", "referral_issues", "proper_referral"}):
             sorted_intents.sort(
                 key=lambda x: 0 if x[0] in {"kickback_commission", "referral_issues", "proper_referral"} else 1
             )
+            branches.append("classify.referral_first")
 
         return sorted_intents[:3]
 
+    def classify_batch(self, queries: List[str],
+                       branches: Optional[List[List[str]]] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Classify many queries at once.
+        Queries that normalize to the same text are scored only once.
+        When branches is a list, one list of branches taken is appended per query.
+        """
+        scored = {}
+        results = []
+        for query in queries:
+            key = self.clean_query(query)
+            if key not in scored:
+                taken = []
+                scored[key] = (self.classify(query, taken), taken)
+            intents, taken = scored[key]
+            results.append(list(intents))
+            if branches is not None:
+                branches.append(list(taken))
+        return results
+
     def get_intent_details(self, intent_name: str) -> Dict:
         """Get detailed information about a specific intent"""
         return self.intents.get(intent_name, {})
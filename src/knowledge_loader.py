@@ -6,13 +6,16 @@ Loads and manages the structured knowledge base
 import json
 from typing import Dict, List, Optional, Any
 
+from src.immutable import FrozenDict, freeze
+
 class KnowledgeBase:
     def __init__(self, knowledge_file: str = "data/structured/knowledge_base_complete.json"):
         self.knowledge_file = knowledge_file
-        self.data = self._load_knowledge_base()
-        self.clauses_by_id = {clause["id"]: clause for clause in self.data["clauses"]}
-        self.clauses_by_intent = self._index_by_intent()
-        self.clauses_by_right = self._index_by_right()
+        # Data and indexes are read-only once built, so one KB can serve every thread
+        self.data = freeze(self._load_knowledge_base())
+        self.clauses_by_id = FrozenDict((clause["id"], clause) for clause in self.data["clauses"])
+        self.clauses_by_intent = freeze(self._index_by_intent())
+        self.clauses_by_right = freeze(self._index_by_right())
         
     def _load_knowledge_base(self) -> Dict:
         """Load the knowledge base from JSON file"""
@@ -9,13 +9,15 @@ import os
 # Add the parent directory to Python path so we can import from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.response_assembler import ResponseAssembler
-from src.knowledge_loader import KnowledgeBase
+from src.engine import PCMLRAEngine, QueryOptions
 
 class PCMLRAConsole:
-    def __init__(self):
-        self.assembler = ResponseAssembler()
-        self.kb = KnowledgeBase()
+    """Interactive CLI; console commands and the proof toggle live here, not in the engine"""
+    
+    def __init__(self, engine: PCMLRAEngine = None):
+        self.engine = engine or PCMLRAEngine()
+        self.assembler = self.engine.assembler
+        self.kb = self.engine.kb
         self.show_proof = True
         
     def display_banner(self):
@@ -176,8 +178,7 @@ Available Commands:
             return None
         
         # Handle regular query
-        response, proof_trace = self.assembler.generate_response(query, self.show_proof)
-        return response
+        return self.engine.answer(query, QueryOptions(show_proof=self.show_proof)).response
     
     def run(self):
         """Run the console application"""
@@ -3,13 +3,19 @@ Response Assembler for PC-MLRA
 Assembles complete responses from intents and knowledge
 """
 
-from typing import Dict, List, Tuple, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
+from html import escape
 import re
 
 from src.intent_classifier import IntentClassifier
 from src.knowledge_loader import KnowledgeBase
 from src.template_engine import TemplateEngine
+from src.engine_fingerprint import compute_engine_fingerprint
+from src.html_renderer import render_blocks, render_markup
+from src.immutable import FrozenList
+from src.response_cache import ResponseCache
+from src.stage_timing import STAGE_HISTOGRAMS, StageTimer, new_timer
 
 EMERGENCY_KEYWORDS = {
     "emergency",
@@ -34,6 +40,42 @@ ABUSE_KEYWORDS = {
     "harassed",
     "insulted"
 }
+
+# Appended (after a divider) when the query signals professional misconduct
+PROFESSIONAL_CONDUCT_NOTICE = (
+    "*Note:* Certain concerns in your query relate to **professional conduct**, "
+    "which is governed separately from patient rights. While patient rights "
+    "are defined under the NHRC Charter, professional behavior of doctors is "
+    "regulated under the IMC Ethics Regulations.\n"
+    "\n\n---\n\n"
+    "**Professional Conduct Standards (Awareness Only)**\n\n"
+    "Medical professionals are required to maintain dignity, respect, "
+    "and appropriate behavior toward patients. These duties are "
+    "explicitly codified under the Indian Medical Council (IMC) Ethics Regulations.\n\n"
+    "**Relevant Ethical Provisions:**\n"
+    "• IMC Ethics Regulations, Section 1.1.1 – Upholding the dignity and honor of the profession\n"
+    "• IMC Ethics Regulations, Section 1.1.2 – Respectful and humane conduct toward patients\n"
+    "• IMC Ethics Regulations, Section 1.1.3 – Proper etiquette and professional behavior\n"
+    "• IMC Ethics Regulations, Section 2.1 – Obligations to the sick\n\n"
+    "This system does not determine misconduct, fault, or liability. "
+    "It only provides awareness of formally defined professional standards."
+)
+PROFESSIONAL_CONDUCT_HTML = render_markup(f"---\n\n{PROFESSIONAL_CONDUCT_NOTICE}")
+
+# Context variables taken from the query text rather than from the decision
+QUERY_VARIABLES = ("query", "query_keywords", "user_query")
+
+# Hard overrides in _decide(), in the order they are checked
+DECISION_BRANCHES = (
+    "decide.emergency_gate",
+    "decide.records_priority",
+    "decide.nhrc16_override",
+    "decide.nhrc17_override",
+    "decide.nhrc8_override",
+    "decide.nhrc15_template",
+    "decide.terminal_single_clause",
+)
+
 @dataclass
 class ProofTrace:
     """Tracks the proof chain for a response"""
@@ -42,10 +84,13 @@ class ProofTrace:
     matched_clauses: List[Dict]
     template_used: str
     variables_used: List[str]
+    stage_timings: Optional[Dict[str, float]] = None
+    # CLASSIFY_BRANCHES and DECISION_BRANCHES taken, in order
+    branches: Tuple[str, ...] = ()
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for display"""
-        return {
+        result = {
             "query": self.query,
             "matched_intents": [
                 {"intent": intent, "confidence": confidence}
@@ -62,6 +107,9 @@ class ProofTrace:
             "template_used": self.template_used,
             "variables_filled": len(self.variables_used)
         }
+        if self.stage_timings is not None:
+            result["stage_timings"] = dict(self.stage_timings)
+        return result
     
     def format(self) -> str:
         """Format proof trace for display"""
@@ -84,11 +132,55 @@ class ProofTrace:
         lines.append("=" * 50)
         return "\n".join(lines)
 
+    def format_html(self) -> str:
+        """Proof trace as HTML, laid out like format() but built from the trace fields"""
+        lines = [("text", "<strong>Proof Trace</strong>"), ("rule", "")]
+        lines.append(("text", f"<strong>Query:</strong> {escape(self.query)}"))
+        lines.append(("blank", ""))
+        lines.append(("text", "<strong>Matched Intents:</strong>"))
+        for intent, confidence in self.matched_intents:
+            lines.append(("bullet", f"{escape(intent)} (confidence: {confidence:.2f})"))
+        lines.append(("blank", ""))
+        lines.append(("text", "<strong>Legal Sources Cited:</strong>"))
+        for clause in self.matched_clauses:
+            lines.append(("bullet", f"{escape(clause['citation_format'])} - {escape(clause['title'])}"))
+        lines.append(("blank", ""))
+        lines.append(("text", "<strong>Generation Method:</strong>"))
+        lines.append(("text", f"Template: {escape(self.template_used)}"))
+        lines.append(("text", f"Variables filled: {len(self.variables_used)}"))
+        lines.append(("rule", ""))
+        return render_blocks(lines)
+
+@dataclass
+class ResponseDecision:
+    """Everything decided about a response before any text is rendered"""
+    intents: List[Tuple[str, float]]
+    clauses: List[Dict]
+    template_id: str
+    context: Dict
+    ethics_signal: bool
+    proof_trace: ProofTrace
+
 class ResponseAssembler:
-    def __init__(self):
+    def __init__(self, response_cache_size: int = 1024, html_cache_size: int = 256):
         self.classifier = IntentClassifier()
         self.kb = KnowledgeBase()
         self.template_engine = TemplateEngine()
+        self.engine_fingerprint = compute_engine_fingerprint(
+            self.classifier, self.kb, self.template_engine
+        )
+        self.response_cache = ResponseCache(response_cache_size)
+        # HTML of everything but the proof trace, keyed by decision signature
+        self.html_cache = ResponseCache(html_cache_size)
+        self._response_listeners = []
+    
+    def add_response_listener(self, listener: Callable[[ProofTrace], None]):
+        """Call listener(proof_trace) for every response produced, cached or not"""
+        self._response_listeners.append(listener)
+    
+    def _notify(self, proof_trace: ProofTrace):
+        for listener in self._response_listeners:
+            listener(proof_trace)
         
     def clean_query(self, query: str) -> str:
         """Clean user query for processing"""
@@ -300,22 +392,231 @@ class ResponseAssembler:
             })
         return context
     
-    def generate_response(self, user_query: str, show_proof: bool = True) -> Tuple[str, ProofTrace]:
-        """Generate complete response for user query"""
+    def generate_response(self, user_query: str, show_proof: bool = True,
+                          collect_timings: bool = False) -> Tuple[str, ProofTrace]:
+        """
+        Generate complete response for user query.
+        With collect_timings, per-stage seconds are attached to the proof
+        trace (the response cache is bypassed so every stage really runs).
+        """
+        timer = new_timer(collect_timings)
+        
         # Clean query
         cleaned_query = self.clean_query(user_query)
+        if timer:
+            timer.mark("clean")
+        
+        cache_key = (cleaned_query, show_proof)
+        cached = None if collect_timings else self.response_cache.get(cache_key)
+        if timer:
+            timer.mark("cache_lookup")
+        if cached is not None:
+            if STAGE_HISTOGRAMS.enabled:
+                STAGE_HISTOGRAMS.record(timer.timings)
+            self._notify(cached[1])
+            return cached
+        
+        # Step 1: Intent classification
+        branches = []
+        intents = self.classifier.classify(cleaned_query, branches)
+        if timer:
+            timer.mark("classify")
+        
+        result = self._assemble_response(cleaned_query, intents, show_proof, timer, branches)
+        
+        if collect_timings:
+            result[1].stage_timings = timer.timings
+        else:
+            self.response_cache.put(cache_key, result)
+        if STAGE_HISTOGRAMS.enabled:
+            STAGE_HISTOGRAMS.record(timer.timings)
+        self._notify(result[1])
+        return result
+    
+    def generate_responses(self, user_queries: List[str], show_proof: bool = True) -> List[Tuple[str, ProofTrace]]:
+        """Generate responses for a batch of queries, classifying each distinct query once"""
+        cleaned_queries = [self.clean_query(query) for query in user_queries]
+        results = [self.response_cache.get((query, show_proof)) for query in cleaned_queries]
+        
+        pending = [query for query, result in zip(cleaned_queries, results) if result is None]
+        batch_branches = []
+        batch_intents = iter(self.classifier.classify_batch(pending, batch_branches))
+        batch_branches = iter(batch_branches)
+        
+        assembled = {}
+        for i, query in enumerate(cleaned_queries):
+            if results[i] is not None:
+                continue
+            intents, branches = next(batch_intents), next(batch_branches)
+            if query not in assembled:
+                assembled[query] = self._assemble_response(query, intents, show_proof, branches=branches)
+                self.response_cache.put((query, show_proof), assembled[query])
+            results[i] = assembled[query]
+        
+        for _, proof_trace in results:
+            self._notify(proof_trace)
+        return results
+    
+    def generate_rendered(self, user_query: str, show_proof: bool = True) -> Tuple[str, str, ProofTrace]:
+        """Generate the response text and its HTML from one decision"""
+        timer = new_timer()
+        
+        cleaned_query = self.clean_query(user_query)
+        if timer:
+            timer.mark("clean")
+        cache_key = (cleaned_query, show_proof, "html")
+        cached = self.response_cache.get(cache_key)
+        if timer:
+            timer.mark("cache_lookup")
+        if cached is not None:
+            if timer:
+                STAGE_HISTOGRAMS.record(timer.timings)
+            self._notify(cached[2])
+            return cached
+        
+        branches = []
+        intents = self.classifier.classify(cleaned_query, branches)
+        if timer:
+            timer.mark("classify")
+        decision = self._decide(cleaned_query, intents, show_proof, timer, branches)
+        response = "".join(text for _, text in self._iter_sections(decision, show_proof, timer))
+        html = self.render_html(decision, show_proof)
+        if timer:
+            # The HTML is a second fill of the same templates
+            timer.mark("fill")
+            STAGE_HISTOGRAMS.record(timer.timings)
+        result = (response, html, decision.proof_trace)
+        self.response_cache.put(cache_key, result)
+        self._notify(decision.proof_trace)
+        return result
+    
+    def generate_components(self, user_query: str, show_proof: bool = True) -> Tuple[List[Tuple[str, str]], ProofTrace]:
+        """Generate the rendered components of a response without joining them into one text"""
+        timer = new_timer()
+        
+        cleaned_query = self.clean_query(user_query)
+        if timer:
+            timer.mark("clean")
+        cache_key = (cleaned_query, show_proof, "components")
+        cached = self.response_cache.get(cache_key)
+        if timer:
+            timer.mark("cache_lookup")
+        if cached is not None:
+            if timer:
+                STAGE_HISTOGRAMS.record(timer.timings)
+            self._notify(cached[1])
+            return cached
+        
+        branches = []
+        intents = self.classifier.classify(cleaned_query, branches)
+        if timer:
+            timer.mark("classify")
+        decision = self._decide(cleaned_query, intents, show_proof, timer, branches)
+        result = (self.render_components(decision, timer), decision.proof_trace)
+        if timer:
+            STAGE_HISTOGRAMS.record(timer.timings)
+        self.response_cache.put(cache_key, result)
+        self._notify(decision.proof_trace)
+        return result
+    
+    def stream_response(self, user_query: str, show_proof: bool = True) -> Tuple[Iterator[Tuple[str, str]], ProofTrace]:
+        """
+        Decide the response up front, then render it lazily.
+        Returns an iterator of (section, text) pieces whose concatenation
+        equals the text generate_response returns, plus the proof trace.
+        """
+        decision = self.decide(user_query, show_proof)
+        return self.render_sections(decision, show_proof), decision.proof_trace
+    
+    def decide(self, user_query: str, show_proof: bool = True) -> ResponseDecision:
+        """Clean, classify and decide a query without rendering anything"""
+        cleaned_query = self.clean_query(user_query)
+        branches = []
+        intents = self.classifier.classify(cleaned_query, branches)
+        decision = self._decide(cleaned_query, intents, show_proof, branches=branches)
+        self._notify(decision.proof_trace)
+        return decision
+    
+    def render_sections(self, decision: ResponseDecision, show_proof: bool = True) -> Iterator[Tuple[str, str]]:
+        """(section, text) pieces of a decided response"""
+        return self._iter_sections(decision, show_proof)
+    
+    def render_components(self, decision: ResponseDecision,
+                          timer: Optional[StageTimer] = None) -> List[Tuple[str, str]]:
+        """
+        (component type, text) for every rendered component, in response
+        order: the template's, the conduct notice, then the disclaimer's.
+        The proof trace is left to the caller (ProofTrace.to_dict).
+        """
+        components = list(self.template_engine.iter_template(decision.template_id, decision.context))
+        if timer:
+            timer.mark("fill")
+        if decision.ethics_signal:
+            components.append(("professional_conduct", PROFESSIONAL_CONDUCT_NOTICE))
+        if timer:
+            timer.mark("imc_notice")
+        components.extend(self.template_engine.iter_template("TEMPLATE_DISCLAIMER", decision.context))
+        if timer:
+            timer.mark("disclaimer")
+        # Frozen: cached results are shared between threads
+        return FrozenList(components)
+    
+    def render_html(self, decision: ResponseDecision, show_proof: bool = True) -> str:
+        """
+        HTML of a decided response, rendered from the template components
+        rather than from its text. Everything before the proof trace depends
+        only on the decision signature, so that part is cached.
+        """
+        signature = self._html_signature(decision, show_proof)
+        body = self.html_cache.get(signature)
+        if body is None:
+            parts = [html for _, html in self.template_engine.iter_template_html(decision.template_id, decision.context)]
+            if decision.ethics_signal:
+                parts.append(PROFESSIONAL_CONDUCT_HTML)
+            parts.extend(html for _, html in self.template_engine.iter_template_html("TEMPLATE_DISCLAIMER", decision.context))
+            body = "\n".join(parts)
+            self.html_cache.put(signature, body)
         
+        if show_proof:
+            return f"{body}\n{decision.proof_trace.format_html()}"
+        return body
+    
+    def _html_signature(self, decision: ResponseDecision, show_proof: bool) -> Tuple:
+        """Everything the pre-proof-trace HTML depends on"""
+        variables = self.template_engine.template_variables(decision.template_id)
+        return (
+            decision.template_id,
+            tuple(clause["id"] for clause in decision.clauses),
+            decision.ethics_signal,
+            show_proof,
+            tuple(decision.context.get(name) for name in QUERY_VARIABLES if name in variables),
+        )
+    
+    def _assemble_response(self, cleaned_query: str, intents: List[Tuple[str, float]],
+                           show_proof: bool, timer: Optional[StageTimer] = None,
+                           branches: Optional[List[str]] = None) -> Tuple[str, ProofTrace]:
+        """Assemble the response for a cleaned, already classified query"""
+        decision = self._decide(cleaned_query, intents, show_proof, timer, branches)
+        response = "".join(text for _, text in self._iter_sections(decision, show_proof, timer))
+        return response, decision.proof_trace
+    
+    def _decide(self, cleaned_query: str, intents: List[Tuple[str, float]],
+                show_proof: bool, timer: Optional[StageTimer] = None,
+                branches: Optional[List[str]] = None) -> ResponseDecision:
+        """
+        Run every decision step (overrides, retrieval, template, context) without rendering text.
+        branches holds the classifier branches already taken; the overrides taken here are added.
+        """
         query_lower = cleaned_query.lower()
+        branches = [] if branches is None else branches
 
         
         ethics_signal = any(
             word in query_lower for word in ABUSE_KEYWORDS
         )
-        # Step 1: Intent classification
-        intents = self.classifier.classify(cleaned_query)
         
         # 🚑 EMERGENCY HARD GATE
-        intents = [
+        gated = [
             (intent, score)
             for intent, score in intents
             if not (
@@ -323,23 +624,34 @@ class ResponseAssembler:
                 and not self.has_emergency_signal(cleaned_query)
             )
         ]
+        if len(gated) != len(intents):
+            branches.append("decide.emergency_gate")
+        intents = gated
         intent_names = [intent for intent, _ in intents]
+        if timer:
+            timer.mark("emergency_gate")
         
         # 🔒 ACCESS TO RECORDS HAS PRIORITY OVER SECOND OPINION
         if "access_medical_records" in intent_names:
             intents = [(i, s) for i, s in intents if i == "access_medical_records"]
+            branches.append("decide.records_priority")
 
         # 🔒 NHRC-16 HARD OVERRIDE
         if "patient_education" in intent_names:
             intents = [(i, s) for i, s in intents if i == "patient_education"]
+            branches.append("decide.nhrc16_override")
 
         # 🔒 NHRC-17 HARD OVERRIDE
         elif "grievance_redressal" in intent_names:
             intents = [(i, s) for i, s in intents if i == "grievance_redressal"]
+            branches.append("decide.nhrc17_override")
 
         # 🔒 NHRC-8 HARD OVERRIDE
         elif "non_discrimination" in intent_names:
             intents = [(i, s) for i, s in intents if i == "non_discrimination"]
+            branches.append("decide.nhrc8_override")
+        if timer:
+            timer.mark("overrides")
 
         # Step 2: Knowledge retrieval
         matched_clauses = []
@@ -357,6 +669,8 @@ class ResponseAssembler:
             if clause["id"] not in seen_ids:
                 seen_ids.add(clause["id"])
                 unique_clauses.append(clause)
+        if timer:
+            timer.mark("kb_retrieval")
         
         # Step 3: Template selection
         template_id = self.select_template(intents, unique_clauses)
@@ -380,17 +694,54 @@ class ResponseAssembler:
         # 🔒 NHRC-15 hard override (absolute)
         if top_intent in {"detained_for_payment", "body_withheld"}:
             template_id = "TEMPLATE_RIGHT_TO_DISCHARGE_BODY"
+            branches.append("decide.nhrc15_template")
 
         # 🔒 Terminal template restriction (once)
         if template_id in terminal_templates and unique_clauses:
             unique_clauses = [unique_clauses[0]]
+            branches.append("decide.terminal_single_clause")
+        if timer:
+            timer.mark("template_selection")
 
         # Step 4: Context preparation
         context = self.prepare_context(template_id, intents, unique_clauses, cleaned_query)
         context["show_proof_trace"] = show_proof
         
+        # Step 8: Create proof trace (frozen: cached traces are shared between threads)
+        proof_trace = ProofTrace(
+            query=cleaned_query,
+            matched_intents=FrozenList(intents),
+            matched_clauses=FrozenList(unique_clauses),
+            template_used=template_id,
+            variables_used=FrozenList(context.keys()),
+            branches=tuple(branches)
+        )
+        if timer:
+            timer.mark("context_preparation")
+        
+        return ResponseDecision(
+            intents=intents,
+            clauses=unique_clauses,
+            template_id=template_id,
+            context=context,
+            ethics_signal=ethics_signal,
+            proof_trace=proof_trace
+        )
+    
+    def _iter_sections(self, decision: ResponseDecision, show_proof: bool,
+                       timer: Optional[StageTimer] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Render the response section by section, headline first and proof trace last.
+        Each piece carries its own leading separator, so the pieces joined
+        with "" are exactly the complete response text.
+        """
         # Step 5: Template filling
-        response = self.template_engine.fill_template(template_id, context)
+        separator = ""
+        for component_type, text in self.template_engine.iter_template(decision.template_id, decision.context):
+            yield component_type, f"{separator}{text}"
+            separator = "\n\n"
+        if timer:
+            timer.mark("fill")
         
         # Step 6: Append professional conduct awareness (with IMC citations) if applicable
         misconduct_intents = {
@@ -401,51 +752,25 @@ class ResponseAssembler:
             "doctor_absenteeism"
         }
 
-        detected_misconduct = ethics_signal
+        detected_misconduct = decision.ethics_signal
 
         if detected_misconduct:
-            bridge_note = (
-                "\n\n---\n\n"
-                "*Note:* Certain concerns in your query relate to **professional conduct**, "
-                "which is governed separately from patient rights. While patient rights "
-                "are defined under the NHRC Charter, professional behavior of doctors is "
-                "regulated under the IMC Ethics Regulations.\n"
-            )
-            ethics_notice = (
-                "\n\n---\n\n"
-                "**Professional Conduct Standards (Awareness Only)**\n\n"
-                "Medical professionals are required to maintain dignity, respect, "
-                "and appropriate behavior toward patients. These duties are "
-                "explicitly codified under the Indian Medical Council (IMC) Ethics Regulations.\n\n"
-                "**Relevant Ethical Provisions:**\n"
-                "• IMC Ethics Regulations, Section 1.1.1 – Upholding the dignity and honor of the profession\n"
-                "• IMC Ethics Regulations, Section 1.1.2 – Respectful and humane conduct toward patients\n"
-                "• IMC Ethics Regulations, Section 1.1.3 – Proper etiquette and professional behavior\n"
-                "• IMC Ethics Regulations, Section 2.1 – Obligations to the sick\n\n"
-                "This system does not determine misconduct, fault, or liability. "
-                "It only provides awareness of formally defined professional standards."
-            )
-            response = f"{response}{bridge_note}{ethics_notice}"
+            yield "professional_conduct", f"\n\n---\n\n{PROFESSIONAL_CONDUCT_NOTICE}"
+        if timer:
+            timer.mark("imc_notice")
             
         # Step 7: Add disclaimer
-        disclaimer = self.template_engine.fill_template("TEMPLATE_DISCLAIMER", context)
-        response = f"{response}\n\n{disclaimer}"
-        
-        # Step 8: Create proof trace
-        proof_trace = ProofTrace(
-            query=cleaned_query,
-            matched_intents=intents,
-            matched_clauses=unique_clauses,
-            template_used=template_id,
-            variables_used=list(context.keys())
-        )
+        disclaimer = self.template_engine.fill_template("TEMPLATE_DISCLAIMER", decision.context)
+        if timer:
+            timer.mark("disclaimer")
+        yield "disclaimer", f"\n\n{disclaimer}"
         
         # Step 9: Add proof trace if requested
         if show_proof:
-            proof_section = f"\n\n{proof_trace.format()}"
-            response += proof_section
-        
-        return response, proof_trace
+            proof_section = f"\n\n{decision.proof_trace.format()}"
+            if timer:
+                timer.mark("proof_formatting")
+            yield "proof_trace", proof_section
     
     def generate_detailed_response(self, clause_id: str) -> str:
         """Generate detailed response for a specific clause"""
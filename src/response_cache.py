@@ -0,0 +1,104 @@
+"""
+Response Cache for PC-MLRA
+Bounded LRU cache of assembled responses keyed by cleaned query and options
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+DEFAULT_STRIPES = 16
+
+
+class _Stripe:
+    """One independently locked LRU segment"""
+
+    __slots__ = ("max_size", "entries", "lock", "hits", "misses")
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache. Responses are deterministic for a given engine
+    build, so entries never need invalidation while the engine is alive.
+    A max_size of 0 disables caching.
+
+    Keys are spread over lock stripes so concurrent requests for different
+    queries rarely wait on each other; recency is tracked per stripe.
+    """
+
+    def __init__(self, max_size: int = 1024, stripes: int = DEFAULT_STRIPES):
+        self.max_size = max_size
+        count = max(1, min(stripes, max_size))
+        # Split capacity so the stripes together hold exactly max_size entries
+        self._stripes = [
+            _Stripe(max_size // count + (1 if i < max_size % count else 0))
+            for i in range(count)
+        ]
+
+    def _stripe(self, key: Hashable) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    @property
+    def hits(self) -> int:
+        return sum(stripe.hits for stripe in self._stripes)
+
+    @property
+    def misses(self) -> int:
+        return sum(stripe.misses for stripe in self._stripes)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None on a miss"""
+        if not self.max_size:
+            return None
+        stripe = self._stripe(key)
+        with stripe.lock:
+            value = stripe.entries.get(key)
+            if value is None:
+                stripe.misses += 1
+                return None
+            stripe.entries.move_to_end(key)
+            stripe.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the stripe's least recently used entry if full"""
+        if not self.max_size:
+            return
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.entries[key] = value
+            stripe.entries.move_to_end(key)
+            if len(stripe.entries) > stripe.max_size:
+                stripe.entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.hits = 0
+                stripe.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        size = hits = misses = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                size += len(stripe.entries)
+                hits += stripe.hits
+                misses += stripe.misses
+        lookups = hits + misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,113 @@
+"""
+Stage Timing for PC-MLRA
+Per-stage latency measurement for the ResponseAssembler pipeline
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Optional
+
+# Pipeline stages, in execution order
+STAGES = (
+    "clean",
+    "cache_lookup",
+    "classify",
+    "emergency_gate",
+    "overrides",
+    "kb_retrieval",
+    "template_selection",
+    "context_preparation",
+    "fill",
+    "imc_notice",
+    "disclaimer",
+    "proof_formatting",
+)
+
+# Histogram upper bounds in seconds; stages run in microseconds
+BUCKET_BOUNDS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025,
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1,
+)
+
+
+class StageTimer:
+    """
+    Records the time since the previous mark under each stage name.
+    One timer per response; callers hold None instead when timing is off,
+    so the disabled cost is a single truth test per stage.
+    """
+
+    __slots__ = ("timings", "_last")
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._last = perf_counter()
+
+    def mark(self, stage: str):
+        now = perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+
+class StageHistograms:
+    """Process-wide latency histograms, one per stage"""
+
+    def __init__(self, enabled: bool = False, bounds=BUCKET_BOUNDS):
+        self.enabled = enabled
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+
+    def record(self, timings: Dict[str, float]):
+        """Add one response's stage timings"""
+        with self._lock:
+            for stage, seconds in timings.items():
+                counts = self._counts.get(stage)
+                if counts is None:
+                    counts = self._counts[stage] = [0] * (len(self.bounds) + 1)
+                    self._sums[stage] = 0.0
+                counts[bisect_left(self.bounds, seconds)] += 1
+                self._sums[stage] += seconds
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Export cumulative histograms:
+        {stage: {"buckets": [(upper_bound, cumulative_count), ...], "count": n, "sum": seconds}}
+        The last bucket's bound is "+Inf".
+        """
+        with self._lock:
+            counts = {stage: list(c) for stage, c in self._counts.items()}
+            sums = dict(self._sums)
+
+        result = {}
+        for stage in sorted(counts, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(self.bounds + ("+Inf",), counts[stage]):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            result[stage] = {"buckets": buckets, "count": cumulative, "sum": sums[stage]}
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+
+# Process-wide aggregation; enable with PC_MLRA_STAGE_TIMING=true
+STAGE_HISTOGRAMS = StageHistograms(
+    enabled=os.environ.get("PC_MLRA_STAGE_TIMING", "false").lower() == "true"
+)
+
+
+def new_timer(requested: bool = False) -> Optional[StageTimer]:
+    """A timer if this call or the process-wide histograms want one, else None"""
+    if requested or STAGE_HISTOGRAMS.enabled:
+        return StageTimer()
+    return None
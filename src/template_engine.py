@@ -5,10 +5,13 @@ Deterministic template-based response generation
 
 import json
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from src.html_renderer import CompiledComponent, VariableValue
+from src.immutable import freeze
+
 class ComponentType(Enum):
     HEADER = "header"
     CITATION = "citation"
@@ -38,7 +41,17 @@ class TemplateComponent:
 
 class TemplateEngine:
     def __init__(self, template_file: str = "data/templates/response_templates.json"):
-        self.templates = self._load_templates(template_file)
+        # Read-only once built, so one engine can serve every thread
+        self.templates = freeze(self._load_templates(template_file))
+        # Markup converted to HTML once per component, not once per response
+        self._compiled = {
+            template_id: [
+                CompiledComponent(component.get("text", ""), component.get("style"))
+                for component in template.get("components", [])
+            ]
+            for template_id, template in self.templates.items()
+            if isinstance(template, dict)
+        }
         
     def _load_templates(self, template_file: str) -> Dict:
         """Load templates from JSON file"""
@@ -135,35 +148,56 @@ class TemplateEngine:
 
     def fill_template(self, template_id: str, context: Dict) -> str:
         """Fill a template with context data"""
+        return "\n\n".join(text for _, text in self.iter_template(template_id, context))
+    
+    def iter_template(self, template_id: str, context: Dict) -> Iterator[Tuple[str, str]]:
+        """Yield (component type, filled text) for each rendered component, in order"""
+        for component, _, context in self._iter_components(template_id, context):
+            # Get component text
+            component_text = component.get("text", "")
+            
+            # Replace variables in component text
+            filled_text = self._replace_variables(component_text, context, component.get("type"))
+            
+            # Apply styling if needed
+            filled_text = self._apply_styling(filled_text, component.get("style"))
+            
+            if filled_text:
+                yield component.get("type", ""), filled_text
+    
+    def iter_template_html(self, template_id: str, context: Dict) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (component type, HTML) for the same components iter_template
+        renders, straight from the compiled component tree
+        """
+        for component, compiled, context in self._iter_components(template_id, context):
+            html = compiled.render(lambda var: self._get_variable_html_value(var, context))
+            if html:
+                yield component.get("type", ""), html
+    
+    def template_variables(self, template_id: str) -> frozenset:
+        """Names of the context variables a template can reference"""
+        return frozenset().union(*(c.variables for c in self._compiled.get(template_id, [])))
+    
+    def _iter_components(self, template_id: str, context: Dict) -> Iterator[Tuple[Dict, Any, Dict]]:
+        """(component, compiled component, normalized context) for each component whose condition holds"""
         template = self.get_template(template_id)
         if not template:
-            return f"Template '{template_id}' not found."
+            missing = f"Template '{template_id}' not found."
+            yield {"type": ComponentType.MESSAGE.value, "text": missing}, CompiledComponent(missing), context
+            return
         
         # ✅ APPLY NORMALIZATION HERE
         context = self._normalize_context_keys(context)
         
         components = template.get("components", [])
-        result_parts = []
         
-        for component in components:
+        for component, compiled in zip(components, self._compiled[template_id]):
             # Check condition
             condition = component.get("condition")
             if not self.process_condition(condition, context):
                 continue
-            
-            # Get component text
-            component_text = component.get("text", "")
-            
-            # Replace variables in component text
-            filled_text = self._replace_variables(component_text, context, component.get("type"))
-            
-            # Apply styling if needed
-            filled_text = self._apply_styling(filled_text, component.get("style"))
-            
-            if filled_text:
-                result_parts.append(filled_text)
-        
-        return "\n\n".join(result_parts)
+            yield component, compiled, context
     
     def _replace_variables(self, text: str, context: Dict, component_type: str) -> str:
         """Replace variables in text with context values"""
@@ -219,6 +253,13 @@ class TemplateEngine:
         
         return str(value) if value is not None else ""
     
+    def _get_variable_html_value(self, var: str, context: Dict) -> VariableValue:
+        """Bulleted lists stay items for the HTML renderer; everything else is the text value"""
+        value = context.get(var, "")
+        if var.endswith("_bulleted") and isinstance(value, list) and value:
+            return [str(item) for item in value]
+        return self._get_variable_value(var, context, "")
+    
     def _apply_styling(self, text: str, style: Optional[str]) -> str:
         """Apply text styling"""
         if not style:
@@ -0,0 +1,132 @@
+# tests_metrices/coverage_report.py
+
+"""
+Decision coverage over one or more query corpora: which intents, clauses,
+templates and hard-override branches the queries reach, and which they
+never do.
+
+Corpora can be golden sets or synthetic corpora (.json / .jsonl, relative
+to tests_metrices/ or absolute), a CSV export of the query log sheet (its
+'Query' column; the log keeps only the first 200 characters of a query),
+or plain text with one query per line.
+
+Usage:
+    python -m tests_metrices.coverage_report --corpus datasets/golden_cases_v6.json
+    python -m tests_metrices.coverage_report --corpus query_log.csv --corpus datasets/synthetic_1m.jsonl --workers 4
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from src.decision_coverage import COVERAGE_KINDS, CoverageSignature, DecisionCoverage, coverage_signature
+from tests_metrices.loaders.dataset_loader import iter_dataset
+from tests_metrices.loaders.parallel_runner import iter_evaluated
+from tests_metrices.loaders.response_runner import ResponseRunner
+
+COVERAGE_FILE = Path("tests_metrices/results/decision_coverage.json")
+
+# Per-process memo of signatures by query; logs repeat popular queries
+MEMO_LIMIT = 200_000
+
+# Column holding the query in the query log sheet (SHEET_HEADERS)
+LOG_QUERY_COLUMN = "Query"
+
+_memo: Dict[str, CoverageSignature] = {}
+
+
+def iter_queries(path: str) -> Iterator[Dict]:
+    """Cases ({"user_query": ...}) from a dataset, a query log CSV or a text file"""
+    suffix = Path(path).suffix
+    if suffix in (".json", ".jsonl"):
+        yield from iter_dataset(path)
+    elif suffix == ".csv":
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get(LOG_QUERY_COLUMN):
+                    yield {"user_query": row[LOG_QUERY_COLUMN]}
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield {"user_query": line.rstrip("\n")}
+
+
+def decision_signature(runner: ResponseRunner, case: Dict) -> CoverageSignature:
+    query = case["user_query"]
+    signature = _memo.get(query)
+    if signature is None:
+        decision = runner.response_assembler.decide(query, show_proof=False)
+        signature = coverage_signature(decision.proof_trace)
+        if len(_memo) >= MEMO_LIMIT:
+            _memo.clear()
+        _memo[query] = signature
+    return signature
+
+
+def collect_coverage(corpora: List[str], workers: int = 1, chunk_size: int = None,
+                     runner: ResponseRunner = None) -> DecisionCoverage:
+    runner = runner or ResponseRunner()
+    coverage = DecisionCoverage.for_assembler(runner.response_assembler)
+    cases = chain.from_iterable(iter_queries(path) for path in corpora)
+    for signature in iter_evaluated(cases, decision_signature, workers, chunk_size, runner):
+        coverage.add(signature)
+    return coverage
+
+
+def format_report(snapshot: Dict, top: int = 5) -> List[str]:
+    lines = [f"{snapshot['responses']} responses, {snapshot['distinct_decisions']} distinct decisions"]
+    for kind in COVERAGE_KINDS:
+        hits = snapshot["hits"][kind]
+        unreached, unknown = snapshot["unreached"][kind], snapshot["unknown"][kind]
+        known = len(hits) - len(unknown)
+        lines.append(f"{kind}: {known - len(unreached)}/{known} reached ({snapshot['coverage'][kind]:.0%})")
+        busiest = sorted(hits.items(), key=lambda item: -item[1])[:top]
+        lines.append("  most hit: " + ", ".join(f"{name} ({count})" for name, count in busiest if count))
+        if unreached:
+            lines.append("  never hit: " + ", ".join(unreached))
+        if unknown:
+            lines.append("  ⚠️  hit but not loaded: " + ", ".join(f"{name} ({hits[name]})" for name in unknown))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report which intents, clauses, templates and overrides a corpus reaches")
+    parser.add_argument("--corpus", action="append", required=True,
+                        help=".json/.jsonl dataset, query log .csv or one-query-per-line text; repeatable")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--output", type=Path, default=COVERAGE_FILE, help="machine-readable report")
+    parser.add_argument("--top", type=int, default=5, help="most hit items listed per kind")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    runner = ResponseRunner()
+    coverage = collect_coverage(args.corpus, args.workers, args.chunk_size, runner)
+    snapshot = coverage.snapshot()
+    seconds = time.perf_counter() - started
+
+    print("🧭 PC-MLRA Decision Coverage")
+    print("=" * 60)
+    print("\n".join(format_report(snapshot, args.top)))
+    print("=" * 60)
+    print(f"⏱️  {seconds:.1f} s ({snapshot['responses'] / seconds:,.0f} queries/s)")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "engine_fingerprint": runner.response_assembler.engine_fingerprint,
+            "corpora": args.corpus,
+            **snapshot,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"📄 Coverage written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+# tests_metrices/differential_runner.py
+
+"""
+Differential runner: stream a query corpus through two engine builds and
+report only the queries whose decision changes.
+
+A build is a directory holding src/ and data/ (a checkout, a worktree or
+an exported revision). Each build runs in its own pool of spawned worker
+processes, with that directory on sys.path and as the working directory,
+so both builds' `src` packages load side by side without clashing.
+Workers return a compact decision signature per query: intents, clause
+ids and template. The parent compares the two streams chunk by chunk in
+corpus order.
+
+Usage:
+    python -m tests_metrices.differential_runner --old-rev HEAD~1 --corpus corpus.jsonl
+    python -m tests_metrices.differential_runner --old ../pc-mlra-main --new . --corpus corpus.jsonl --output diffs.jsonl
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Nothing imported here may import src: workers import this module before
+# _init_build puts their build root first on sys.path
+from tests_metrices.loaders.dataset_loader import iter_dataset
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_CHUNK_SIZE = 256
+
+# Per-worker memo of signatures by query; corpora repeat popular queries
+MEMO_LIMIT = 200_000
+
+# Signature: (intent names in order, clause ids, template id)
+Signature = Tuple[Tuple[str, ...], Tuple[str, ...], Optional[str]]
+
+_assembler = None
+_memo: Dict[str, Signature] = {}
+
+
+def _init_build(build_root: str):
+    """Load the engine from build_root; only runs in spawned workers"""
+    global _assembler
+    sys.path.insert(0, build_root)
+    os.chdir(build_root)
+    from src.response_assembler import ResponseAssembler
+    _assembler = ResponseAssembler()
+
+
+def _signature(query: str) -> Signature:
+    decide = getattr(_assembler, "decide", None)
+    if decide is not None:
+        decision = decide(query, show_proof=False)
+        intents, clauses, template_id = decision.intents, decision.clauses, decision.template_id
+    else:
+        # Builds from before decide() existed: same fields from the proof trace
+        _, trace = _assembler.generate_response(query, show_proof=True)
+        intents, clauses, template_id = trace.matched_intents, trace.matched_clauses, trace.template_used
+    return (
+        tuple(name for name, _ in intents),
+        tuple(clause["id"] for clause in clauses),
+        template_id,
+    )
+
+
+def _signatures(queries: List[str]) -> List[Signature]:
+    results = []
+    for query in queries:
+        signature = _memo.get(query)
+        if signature is None:
+            signature = _signature(query)
+            if len(_memo) >= MEMO_LIMIT:
+                _memo.clear()
+            _memo[query] = signature
+        results.append(signature)
+    return results
+
+
+def signature_diff(old: Signature, new: Signature) -> Dict:
+    """Only the parts of the decision that changed"""
+    diff = {}
+    for name, a, b in (("intents", old[0], new[0]), ("clauses", old[1], new[1])):
+        if a != b:
+            diff[name] = {
+                "old": list(a),
+                "new": list(b),
+                "added": [x for x in b if x not in a],
+                "removed": [x for x in a if x not in b],
+            }
+    if old[2] != new[2]:
+        diff["template"] = {"old": old[2], "new": new[2]}
+    return diff
+
+
+@dataclass
+class DiffReport:
+    queries: int = 0
+    divergent: int = 0
+    seconds: float = 0.0
+    changed_fields: Counter = field(default_factory=Counter)
+    template_moves: Counter = field(default_factory=Counter)
+
+    @property
+    def queries_per_minute(self) -> float:
+        return self.queries / self.seconds * 60 if self.seconds else 0.0
+
+
+def export_revision(revision: str, repo: Path = REPO_ROOT) -> tempfile.TemporaryDirectory:
+    """Extract src/ and data/ at a git revision into a temporary build root"""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision, "src", "data"],
+        cwd=repo, check=True, capture_output=True,
+    ).stdout
+    build = tempfile.TemporaryDirectory(prefix="pc_mlra_build_")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(build.name)
+    return build
+
+
+def iter_diffs(
+    old_root: str,
+    new_root: str,
+    queries: Iterable[str],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report: Optional[DiffReport] = None,
+) -> Iterator[Dict]:
+    """
+    Yield {"index", "query", "diff"} for every query whose signature
+    differs between the builds, in corpus order. workers is per build.
+    """
+    report = report if report is not None else DiffReport()
+    context = multiprocessing.get_context("spawn")
+    window = max(2, workers * 4)
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_build, initargs=(old_root,)) as old_pool, \
+            ProcessPoolExecutor(workers, mp_context=context, initializer=_init_build, initargs=(new_root,)) as new_pool:
+
+        def submit(chunk):
+            return chunk, old_pool.submit(_signatures, chunk), new_pool.submit(_signatures, chunk)
+
+        queries = iter(queries)
+        chunks = iter(lambda: list(islice(queries, chunk_size)), [])
+        pending = deque(submit(chunk) for chunk in islice(chunks, window))
+        offset = 0
+        while pending:
+            chunk, old_future, new_future = pending.popleft()
+            old_signatures, new_signatures = old_future.result(), new_future.result()
+            for following in islice(chunks, 1):
+                pending.append(submit(following))
+            for i, (query, old, new) in enumerate(zip(chunk, old_signatures, new_signatures)):
+                if old != new:
+                    diff = signature_diff(old, new)
+                    report.divergent += 1
+                    report.changed_fields.update(diff.keys())
+                    if "template" in diff:
+                        report.template_moves[(old[2], new[2])] += 1
+                    yield {"index": offset + i, "query": query, "diff": diff}
+            offset += len(chunk)
+            report.queries = offset
+            report.seconds = time.perf_counter() - started
+
+
+def print_diff(item: Dict) -> None:
+    print(f"  #{item['index']}: {item['query'][:100]}")
+    for name, change in item["diff"].items():
+        if name == "template":
+            print(f"      template: {change['old']} → {change['new']}")
+        else:
+            parts = [f"+{x}" for x in change["added"]] + [f"-{x}" for x in change["removed"]]
+            print(f"      {name}: {' '.join(parts) or 'reordered ' + ', '.join(change['new'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report queries whose decision differs between two engine builds")
+    old = parser.add_mutually_exclusive_group(required=True)
+    old.add_argument("--old", help="old build root (directory with src/ and data/)")
+    old.add_argument("--old-rev", help="git revision of this repository to use as the old build")
+    parser.add_argument("--new", default=str(REPO_ROOT), help="new build root (default: this checkout)")
+    parser.add_argument("--corpus", required=True, help=".json or .jsonl cases; paths relative to tests_metrices/")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="worker processes per build")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many queries")
+    parser.add_argument("--output", default=None, help="write every divergent case to this JSONL file")
+    parser.add_argument("--show", type=int, default=20, help="divergent cases printed to the console")
+    args = parser.parse_args(argv)
+
+    exported = export_revision(args.old_rev) if args.old_rev else None
+    old_root = exported.name if exported else str(Path(args.old).resolve())
+    new_root = str(Path(args.new).resolve())
+
+    queries = (case["user_query"] for case in iter_dataset(args.corpus))
+    if args.limit is not None:
+        queries = islice(queries, args.limit)
+
+    report = DiffReport()
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        print(f"🔀 {args.old_rev or old_root} → {new_root}")
+        for item in iter_diffs(old_root, new_root, queries, args.workers, args.chunk_size, report):
+            if report.divergent <= args.show:
+                print_diff(item)
+            if out is not None:
+                out.write(json.dumps(item, ensure_ascii=False))
+                out.write("\n")
+    finally:
+        if out is not None:
+            out.close()
+        if exported is not None:
+            exported.cleanup()
+
+    print(f"\n{report.divergent} of {report.queries} queries diverge "
+          f"({report.queries_per_minute:,.0f} queries/min, {report.seconds:.1f} s)")
+    for name, count in report.changed_fields.most_common():
+        print(f"  {name} changed: {count}")
+    for (a, b), count in report.template_moves.most_common(10):
+        print(f"  {a} → {b}: {count}")
+    return 1 if report.divergent else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# tests_metrices/fuzz_harness.py
+
+"""
+Fuzz harness for the classification and assembly pipeline.
+
+Drives seeded adversarial queries (tests_metrices/generators/fuzz_inputs.py)
+through ResponseAssembler.generate_response in worker processes and checks
+every input against these invariants:
+
+  exception          generate_response does not raise
+  nondeterministic   a second run gives the same text and decision
+  missing_proof      when clauses match, the proof trace and every cited
+                     clause appear in the response
+  slow               latency stays within base + per-byte budget (re-measured
+                     before it is reported, to rule out scheduler noise)
+
+Workers return only indices and verdicts; the parent regenerates the
+queries it needs. Each distinct failure is minimized to a small input that
+still fails the same way. The inputs using most of their latency budget are
+written as a JSONL corpus, which --replay re-checks as a regression gate.
+Cross-process determinism (PYTHONHASHSEED) is covered separately by
+tests_metrices/loaders/determinism_check.py.
+
+Usage:
+    python -m tests_metrices.fuzz_harness --count 1000000 --workers 8
+    python -m tests_metrices.fuzz_harness --replay tests_metrices/results/fuzz_slowest.jsonl
+"""
+
+import argparse
+import heapq
+import json
+import math
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.decision_coverage import coverage_signature
+from tests_metrices.generators.fuzz_inputs import STRATEGIES, FuzzConfig, FuzzInputs
+from tests_metrices.generators.synthetic_corpus import load_profiles
+from tests_metrices.loaders.dataset_loader import iter_dataset
+from tests_metrices.loaders.parallel_runner import iter_evaluated
+from tests_metrices.loaders.response_runner import ResponseRunner
+
+REPORT_FILE = Path("tests_metrices/results/fuzz_report.json")
+SLOWEST_FILE = Path("tests_metrices/results/fuzz_slowest.jsonl")
+
+# Re-measurements (best one kept) before an input is reported as slow
+SLOW_RECHECKS = 3
+
+# Test runs per distinct failure while minimizing it
+MINIMIZE_STEPS = 500
+
+PROOF_HEADER = "**Proof Trace**"
+
+# (kind, message) for each invariant an input breaks
+Failure = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class LatencyBudget:
+    base_seconds: float = 0.010
+    per_byte_seconds: float = 5e-6
+
+    def seconds_for(self, size: int) -> float:
+        return self.base_seconds + self.per_byte_seconds * size
+
+
+def byte_length(query: str) -> int:
+    return len(query.encode("utf-8", "surrogatepass"))
+
+
+def _timed_response(assembler, query: str):
+    started = time.perf_counter()
+    # collect_timings bypasses the response cache, so every run does the full work
+    response, proof_trace = assembler.generate_response(query, show_proof=True, collect_timings=True)
+    return response, proof_trace, time.perf_counter() - started
+
+
+def check_query(assembler, query: str, budget: LatencyBudget = LatencyBudget()) -> Tuple[float, List[Failure]]:
+    """(best latency in seconds, invariants broken) for one query"""
+    try:
+        response, proof_trace, seconds = _timed_response(assembler, query)
+    except Exception as e:
+        return 0.0, [("exception", f"{type(e).__name__}: {e}")]
+
+    failures = []
+    try:
+        again, again_trace, again_seconds = _timed_response(assembler, query)
+    except Exception as e:
+        failures.append(("nondeterministic", f"second run raised {type(e).__name__}: {e}"))
+    else:
+        seconds = min(seconds, again_seconds)
+        if again != response or coverage_signature(again_trace) != coverage_signature(proof_trace):
+            failures.append(("nondeterministic", "second run gave a different response"))
+
+    if proof_trace.matched_clauses:
+        if PROOF_HEADER not in response:
+            failures.append(("missing_proof", "clauses matched but the response has no proof trace"))
+        else:
+            missing = [c["id"] for c in proof_trace.matched_clauses if c["citation_format"] not in response]
+            if missing:
+                failures.append(("missing_proof", f"matched clauses not cited: {', '.join(missing)}"))
+
+    limit = budget.seconds_for(byte_length(query))
+    if seconds > limit:
+        for _ in range(SLOW_RECHECKS):
+            seconds = min(seconds, _timed_response(assembler, query)[2])
+        if seconds > limit:
+            failures.append(("slow", f"{seconds * 1000:.3g} ms over the {limit * 1000:.3g} ms budget"))
+    return seconds, failures
+
+
+def minimize(query: str, still_fails: Callable[[str], bool], max_steps: int = MINIMIZE_STEPS) -> str:
+    """
+    Shrink query while still_fails holds: drop ever smaller runs of words,
+    then of characters (ddmin without the complement step)
+    """
+    steps = 0
+    for units in (re.findall(r"\S+\s*|\s+", query), None):
+        if units is None:
+            units = list(query)
+        granularity = 2
+        while len(units) >= 2 and steps < max_steps:
+            size = math.ceil(len(units) / granularity)
+            for start in range(0, len(units), size):
+                candidate = units[:start] + units[start + size:]
+                steps += 1
+                if still_fails("".join(candidate)):
+                    units = candidate
+                    granularity = max(granularity - 1, 2)
+                    break
+                if steps >= max_steps:
+                    break
+            else:
+                if granularity >= len(units):
+                    break
+                granularity = min(len(units), granularity * 2)
+        query = "".join(units)
+    return query
+
+
+# Per-worker generator, built from the worker's own engine
+_inputs: Optional[FuzzInputs] = None
+
+
+def _worker_inputs(runner: ResponseRunner, config: FuzzConfig) -> FuzzInputs:
+    global _inputs
+    if _inputs is None or _inputs.config != config:
+        assembler = runner.response_assembler
+        _inputs = FuzzInputs(load_profiles(assembler.classifier, assembler.kb), config)
+    return _inputs
+
+
+def fuzz_case(runner: ResponseRunner, case: Dict) -> Tuple[int, str, int, float, List[Failure]]:
+    """(index, strategy, bytes, seconds, failures) for generated input case["index"]"""
+    strategy, query = _worker_inputs(runner, case["config"]).generate(case["index"])
+    seconds, failures = check_query(runner.response_assembler, query, case["budget"])
+    return case["index"], strategy, byte_length(query), seconds, failures
+
+
+def _failure_key(failure: Failure) -> Failure:
+    # Exceptions differing only in quoted values are the same bug
+    kind, message = failure
+    return kind, re.sub(r"'[^']*'|\d+(\.\d+)?", "…", message)[:200]
+
+
+def run_fuzz(count: int, config: FuzzConfig = FuzzConfig(), budget: LatencyBudget = LatencyBudget(),
+             workers: int = 1, chunk_size: Optional[int] = None, keep_slowest: int = 20,
+             minimize_failures: bool = True) -> Dict:
+    runner = ResponseRunner()
+    assembler = runner.response_assembler
+    inputs = _worker_inputs(runner, config)
+
+    started = time.perf_counter()
+    per_strategy = {s: {"inputs": 0, "bytes": 0, "seconds": 0.0, "max_budget_used": 0.0} for s in STRATEGIES}
+    failures: Dict[Failure, Dict] = {}
+    slowest: List[Tuple[float, int, float]] = []
+
+    cases = ({"index": i, "config": config, "budget": budget} for i in range(count))
+    for index, strategy, size, seconds, broken in iter_evaluated(cases, fuzz_case, workers, chunk_size, runner):
+        used = seconds / budget.seconds_for(size)
+        stats = per_strategy[strategy]
+        stats["inputs"] += 1
+        stats["bytes"] += size
+        stats["seconds"] += seconds
+        stats["max_budget_used"] = max(stats["max_budget_used"], used)
+        entry = (used, index, seconds)
+        if len(slowest) < keep_slowest:
+            heapq.heappush(slowest, entry)
+        elif entry > slowest[0]:
+            heapq.heapreplace(slowest, entry)
+        for failure in broken:
+            key = _failure_key(failure)
+            if key in failures:
+                failures[key]["count"] += 1
+            else:
+                failures[key] = {"kind": failure[0], "message": failure[1], "count": 1,
+                                 "index": index, "strategy": strategy, "bytes": size}
+    seconds = time.perf_counter() - started
+
+    for failure in failures.values():
+        query = inputs.generate(failure["index"])[1]
+        failure["query_preview"] = query[:200]
+        # Latency depends on the machine, so only deterministic failures are minimized
+        if minimize_failures and failure["kind"] != "slow":
+            kind = failure["kind"]
+            failure["minimized"] = minimize(
+                query, lambda q: any(k == kind for k, _ in check_query(assembler, q, budget)[1])
+            )
+
+    return {
+        "meta": {
+            "engine_fingerprint": assembler.engine_fingerprint,
+            "seed": config.seed,
+            "inputs": count,
+            "workers": workers,
+            "seconds": seconds,
+            "inputs_per_second": count / seconds if seconds else 0.0,
+            "latency_budget": {"base_ms": budget.base_seconds * 1000,
+                               "per_byte_us": budget.per_byte_seconds * 1e6},
+        },
+        "strategies": per_strategy,
+        "failures": list(failures.values()),
+        "slowest": [
+            {"index": index, "strategy": inputs.generate(index)[0], "seconds": secs, "budget_used": used,
+             "query": inputs.generate(index)[1]}
+            for used, index, secs in sorted(slowest, reverse=True)
+        ],
+    }
+
+
+def replay(path: str, budget: LatencyBudget = LatencyBudget()) -> List[Dict]:
+    """Re-check a saved corpus (e.g. earlier slowest inputs); returns the cases that fail"""
+    assembler = ResponseRunner().response_assembler
+    failing = []
+    for case in iter_dataset(path):
+        seconds, broken = check_query(assembler, case["user_query"], budget)
+        if broken:
+            failing.append({"test_id": case.get("test_id"), "seconds": seconds,
+                            "failures": [f"{kind}: {message}" for kind, message in broken]})
+    return failing
+
+
+def print_report(report: Dict) -> None:
+    meta = report["meta"]
+    print("🎲 PC-MLRA Fuzz Harness")
+    print("=" * 72)
+    print(f"{meta['inputs']} inputs (seed {meta['seed']}) in {meta['seconds']:.1f} s "
+          f"({meta['inputs_per_second']:,.0f}/s, {meta['workers']} workers)")
+    print(f"{'strategy':<18}{'inputs':>9}{'mean bytes':>12}{'mean ms':>9}{'max budget':>12}")
+    for name, s in report["strategies"].items():
+        if s["inputs"]:
+            print(f"{name:<18}{s['inputs']:>9}{s['bytes'] / s['inputs']:>12.0f}"
+                  f"{s['seconds'] / s['inputs'] * 1000:>9.2f}{s['max_budget_used']:>12.0%}")
+    print("=" * 72)
+    if not report["failures"]:
+        print("✅ All invariants held")
+    for failure in report["failures"]:
+        print(f"❌ {failure['kind']} ×{failure['count']}: {failure['message']}")
+        print(f"   first at input {failure['index']} ({failure['strategy']}, {failure['bytes']} bytes)")
+        if "minimized" in failure:
+            print(f"   minimized: {failure['minimized']!r}")
+    print("🐢 Slowest against budget:")
+    for entry in report["slowest"][:5]:
+        print(f"   #{entry['index']} {entry['strategy']}: {entry['seconds'] * 1000:.2f} ms "
+              f"({entry['budget_used']:.0%} of budget)")
+
+
+def main(argv=None):
+    defaults, budget_defaults = FuzzConfig(), LatencyBudget()
+    parser = argparse.ArgumentParser(description="Fuzz the PC-MLRA pipeline with generated adversarial queries")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--max-chars", type=int, default=defaults.max_chars)
+    parser.add_argument("--base-ms", type=float, default=budget_defaults.base_seconds * 1000,
+                        help="latency budget for an empty query")
+    parser.add_argument("--per-byte-us", type=float, default=budget_defaults.per_byte_seconds * 1e6,
+                        help="latency budget added per UTF-8 byte")
+    parser.add_argument("--keep-slowest", type=int, default=20)
+    parser.add_argument("--no-minimize", action="store_true")
+    parser.add_argument("--output", type=Path, default=REPORT_FILE)
+    parser.add_argument("--slowest-output", type=Path, default=SLOWEST_FILE,
+                        help="slowest inputs as a JSONL corpus, for --replay")
+    parser.add_argument("--replay", default=None, help="re-check a saved corpus instead of fuzzing")
+    args = parser.parse_args(argv)
+
+    budget = LatencyBudget(args.base_ms / 1000, args.per_byte_us / 1e6)
+    if args.replay:
+        failing = replay(args.replay, budget)
+        for case in failing:
+            print(f"❌ {case['test_id']}: {'; '.join(case['failures'])}")
+        print(f"{'❌' if failing else '✅'} {len(failing)} replayed cases break an invariant")
+        return 1 if failing else 0
+
+    config = FuzzConfig(seed=args.seed, max_chars=args.max_chars)
+    report = run_fuzz(args.count, config, budget, args.workers, args.chunk_size,
+                      args.keep_slowest, not args.no_minimize)
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.slowest_output.parent.mkdir(parents=True, exist_ok=True)
+    # ASCII escapes: fuzz inputs can hold lone surrogates, which UTF-8 cannot encode
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=True)
+    with open(args.slowest_output, "w", encoding="utf-8") as f:
+        for entry in report["slowest"]:
+            f.write(json.dumps({"test_id": f"FUZZ_{config.seed}_{entry['index']}", "user_query": entry["query"],
+                                "strategy": entry["strategy"], "seconds": entry["seconds"]}))
+            f.write("\n")
+    print(f"📄 Report written to {args.output}, slowest inputs to {args.slowest_output}")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
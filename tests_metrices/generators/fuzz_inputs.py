@@ -0,0 +1,174 @@
+# tests_metrices/generators/fuzz_inputs.py
+
+"""
+Seeded adversarial queries for the fuzz harness.
+
+Input i is a pure function of (seed, i), so workers generate their own
+share from indices alone and any failure can be regenerated from its
+index. Strategies aim at the text handling on the hot path: very long
+pasted complaints, Unicode and control characters, one keyword repeated
+thousands of times, and punctuation runs for the classifier's
+re.sub(r'[^\\w\\s]', ...) to scan.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from tests_metrices.generators.synthetic_corpus import CorpusConfig, CorpusGenerator, IntentProfile
+
+# Assigned round-robin by index, so every strategy gets an equal share
+STRATEGIES = (
+    "complaint",
+    "long_paste",
+    "repeated_keyword",
+    "unicode",
+    "punctuation",
+    "whitespace",
+    "degenerate",
+)
+
+UNICODE_SNIPPETS = [
+    "डॉक्टर ने इलाज से मना किया", "अस्पताल ने बिल", "مستشفى", "医院拒绝", "больница",
+    "😡🏥", "👨‍⚕️", "🇮🇳", "émergency", "ﬁle", "ß", "İstanbul",
+    "​", "‍", "‏", "‮", "﻿", "�", "\U0010ffff",
+    # Lone surrogate: valid in a str decoded from JSON, but not encodable as UTF-8
+    "\ud83d",
+]
+
+PUNCTUATION = "!?.,;:'\"()[]{}<>/\\|@#$%^&*-_=+~`…—–“”‘’«»¿¡·•"
+CONTROL_CHARACTERS = "\x00\x01\x07\x08\x1b\x7f"
+WHITESPACE = [" ", "\t", "\n", "\r\n", " ", " ", "　", "\x0b", "\x0c", " ", "\u0085"]
+
+
+@dataclass(frozen=True)
+class FuzzConfig:
+    seed: int = 0
+    # Inputs are cut to this many characters
+    max_chars: int = 64_000
+    max_paste_words: int = 8_000
+    max_repeats: int = 5_000
+
+
+def _fullwidth(text: str) -> str:
+    return "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in text)
+
+
+def _bold(text: str) -> str:
+    """Mathematical bold letters, which look like ASCII but are not"""
+    return "".join(
+        chr(0x1D400 + ord(c) - ord("A")) if "A" <= c <= "Z"
+        else chr(0x1D41A + ord(c) - ord("a")) if "a" <= c <= "z" else c
+        for c in text
+    )
+
+
+class FuzzInputs:
+    def __init__(self, profiles: List[IntentProfile], config: FuzzConfig = FuzzConfig()):
+        if not profiles:
+            raise ValueError("Fuzz inputs need at least one intent profile")
+        self.profiles = profiles
+        self.config = config
+        self.vocabulary = tuple(dict.fromkeys(
+            term
+            for p in profiles
+            for term in p.keywords + p.verbs + p.patterns + p.clause_keywords
+        ))
+
+    def generate(self, index: int) -> Tuple[str, str]:
+        """(strategy, query) for input index"""
+        rng = random.Random(f"{self.config.seed}:{index}")
+        strategy = STRATEGIES[index % len(STRATEGIES)]
+        query = getattr(self, f"_{strategy}")(rng)
+        return strategy, query[:self.config.max_chars]
+
+    def _complaint_text(self, rng: random.Random, median_words: int = 25, max_words: int = 400) -> str:
+        config = CorpusConfig(seed=rng.getrandbits(32), median_words=median_words,
+                              length_sigma=0.3, max_words=max_words, mix_probability=0.5)
+        return CorpusGenerator(self.profiles, config).generate_query()[0]
+
+    def _mutate(self, rng: random.Random, text: str) -> str:
+        """Apply one small edit: case, a stray character or a doubled word"""
+        words = text.split(" ")
+        i = rng.randrange(len(words))
+        mutation = rng.randrange(5)
+        if mutation == 0:
+            words[i] = words[i].upper()
+        elif mutation == 1:
+            words[i] = words[i] + rng.choice(PUNCTUATION) * rng.randint(1, 3)
+        elif mutation == 2:
+            words.insert(i, rng.choice(UNICODE_SNIPPETS))
+        elif mutation == 3:
+            words.insert(i, words[i])
+        else:
+            words[i] = rng.choice(WHITESPACE).join(words[i:i + 2])
+            del words[i + 1:i + 2]
+        return " ".join(words)
+
+    def _complaint(self, rng: random.Random) -> str:
+        text = self._complaint_text(rng)
+        for _ in range(rng.randint(0, 4)):
+            text = self._mutate(rng, text)
+        return text
+
+    def _long_paste(self, rng: random.Random) -> str:
+        words = rng.randint(500, self.config.max_paste_words)
+        text = self._complaint_text(rng, median_words=words, max_words=words * 2)
+        if rng.random() < 0.5:
+            # Pasted from an email or document: hard line breaks
+            tokens = text.split(" ")
+            text = "\n".join(" ".join(tokens[i:i + 12]) for i in range(0, len(tokens), 12))
+        return text
+
+    def _repeated_keyword(self, rng: random.Random) -> str:
+        keyword = rng.choice(self.vocabulary)
+        separator = rng.choice([" ", "", ",", "!!! ", "\n", " and "])
+        repeated = separator.join([keyword] * rng.randint(2, self.config.max_repeats))
+        if rng.random() < 0.5:
+            return f"{self._complaint_text(rng)} {repeated}"
+        return repeated
+
+    def _unicode(self, rng: random.Random) -> str:
+        words = self._complaint_text(rng).split(" ")
+        style = rng.randrange(4)
+        if style == 0:
+            return " ".join(_fullwidth(w) if rng.random() < 0.5 else w for w in words)
+        if style == 1:
+            return " ".join(_bold(w) if rng.random() < 0.5 else w for w in words)
+        if style == 2:
+            # Combining accent after every letter
+            return "".join(c + "́" if c.isalpha() else c for c in " ".join(words))
+        for _ in range(rng.randint(1, 20)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(UNICODE_SNIPPETS))
+        return " ".join(words)
+
+    def _punctuation(self, rng: random.Random) -> str:
+        style = rng.randrange(3)
+        if style == 0:
+            run = "".join(rng.choice(PUNCTUATION) for _ in range(rng.randint(1, 20_000)))
+            return f"{rng.choice(self.vocabulary)}{run}{rng.choice(self.vocabulary)}"
+        if style == 1:
+            # Punctuation between the letters of keywords
+            mark = rng.choice(PUNCTUATION)
+            return " ".join(mark.join(rng.choice(self.vocabulary)) for _ in range(rng.randint(1, 50)))
+        words = self._complaint_text(rng).split(" ")
+        return "".join(w + rng.choice(PUNCTUATION) * rng.randint(0, 5) for w in words)
+
+    def _whitespace(self, rng: random.Random) -> str:
+        words = self._complaint_text(rng).split(" ")
+        padding = rng.choice(WHITESPACE) * rng.randint(0, 5_000)
+        body = "".join(w + rng.choice(WHITESPACE) * rng.randint(1, 4) for w in words)
+        return padding + body + padding
+
+    def _degenerate(self, rng: random.Random) -> str:
+        choices = [
+            "",
+            rng.choice(PUNCTUATION),
+            rng.choice(WHITESPACE) * rng.randint(1, 100),
+            "".join(rng.choice(CONTROL_CHARACTERS) for _ in range(rng.randint(1, 50))),
+            "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 1_000))),
+            # One very long token: no whitespace for split() to work with
+            "".join(rng.choice(self.vocabulary).replace(" ", "") for _ in range(rng.randint(1, 5_000))),
+            rng.choice(self.vocabulary),
+        ]
+        return rng.choice(choices)
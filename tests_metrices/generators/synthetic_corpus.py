@@ -0,0 +1,232 @@
+# tests_metrices/generators/synthetic_corpus.py
+
+"""
+Seeded synthetic complaint corpus for throughput and cache-sizing runs.
+
+Queries are composed from the classifier's keyword / verb /
+negative_pattern tables and the keywords of the KB clauses mapped to each
+intent. Intent popularity follows a Zipf-like law, a query may mix
+several issues, and query length follows a log-normal word-count target
+(a query never drops its issue sentences to meet it). The
+same seed and parameters always produce the same corpus, written as
+streaming JSONL in the golden-case format.
+
+Usage:
+    python -m tests_metrices.generators.synthetic_corpus --count 1000000 --output corpus.jsonl
+"""
+
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, Iterator, List, Tuple
+
+from src.intent_classifier import IntentClassifier
+from src.knowledge_loader import KnowledgeBase
+from tests_metrices.loaders.dataset_loader import write_jsonl
+
+ACTORS = ["doctor", "hospital", "nurse", "hospital staff", "clinic", "surgeon", "billing department"]
+ROLES = ["patient", "patient", "patient", "caregiver", "family member", "doctor"]
+
+OPENERS = [
+    "",
+    "I am a patient.",
+    "My mother was admitted last month.",
+    "My father is in the ICU right now.",
+    "Please help me understand my options.",
+    "I need some advice.",
+    "This happened at a private hospital in my city.",
+]
+
+# Negative patterns are a mix of verb and noun phrases, so they stand on their own
+ISSUE_TEMPLATES = [
+    "My complaint against the {actor}: {pattern}.",
+    "{Pattern}, that is what happened when I asked about my {keyword}.",
+    "I want to report the {actor} for this: {pattern}.",
+    "What are my rights about {keyword} if the {actor} {verb}?",
+    "Can the {actor} {verb} like this? It is about my {keyword}.",
+    "Nobody explained the {keyword} or the {clause_keyword}, and now {pattern}.",
+    "The {actor} mentioned {keyword} and {clause_keyword} but {pattern}.",
+]
+
+CONTEXT_SENTENCES = [
+    "I have all the receipts and documents with me.",
+    "Nobody at the front desk is responding to my complaints.",
+    "We have been waiting for three days.",
+    "The staff said this is the hospital policy.",
+    "I tried calling the administration several times.",
+    "We are not from this city and do not know anyone here.",
+    "My family is very worried about this.",
+    "I do not want to make trouble but this does not seem right.",
+    "Another patient in the ward had the same experience.",
+    "The doctor only came for two minutes.",
+]
+
+CLOSERS = ["", "What can I do?", "What are my rights?", "Is this allowed?", "Where can I complain?"]
+
+
+@dataclass(frozen=True)
+class IntentProfile:
+    name: str
+    keywords: Tuple[str, ...]
+    verbs: Tuple[str, ...]
+    patterns: Tuple[str, ...]
+    clause_keywords: Tuple[str, ...]
+    imc_linked: bool
+
+
+@dataclass(frozen=True)
+class CorpusConfig:
+    seed: int = 42
+    zipf_exponent: float = 1.1
+    median_words: int = 25
+    length_sigma: float = 0.6
+    min_words: int = 4
+    max_words: int = 400
+    mix_probability: float = 0.3
+    max_issues: int = 3
+
+
+def _unique(items) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(items))
+
+
+def load_profiles(classifier: IntentClassifier, kb: KnowledgeBase) -> List[IntentProfile]:
+    """One vocabulary profile per intent, in the classifier's intent order"""
+    profiles = []
+    for name, intent in classifier.intents.items():
+        clauses = kb.clauses_by_intent.get(name, ())
+        profiles.append(IntentProfile(
+            name=name,
+            keywords=_unique(intent.get("keywords", ())),
+            verbs=_unique(intent.get("verbs", ())),
+            patterns=_unique(intent.get("negative_patterns", ())),
+            clause_keywords=_unique(k for clause in clauses for k in clause.get("keywords", ())) or ("treatment",),
+            imc_linked=any(clause.get("document") == "IMC" for clause in clauses),
+        ))
+    return profiles
+
+
+class CorpusGenerator:
+    def __init__(self, profiles: List[IntentProfile], config: CorpusConfig = CorpusConfig()):
+        if not profiles:
+            raise ValueError("Corpus generator needs at least one intent profile")
+        self.config = config
+        self.rng = random.Random(config.seed)
+
+        # Popularity rank is a seeded permutation, so different seeds stress different intents
+        self.profiles = self.rng.sample(profiles, len(profiles))
+        weights = [1 / (rank ** config.zipf_exponent) for rank in range(1, len(profiles) + 1)]
+        self._cum_weights = list(accumulate(weights))
+
+    def _pick_issues(self) -> List[IntentProfile]:
+        count = 1
+        while count < self.config.max_issues and self.rng.random() < self.config.mix_probability:
+            count += 1
+        count = min(count, len(self.profiles))
+
+        issues = []
+        while len(issues) < count:
+            profile = self.rng.choices(self.profiles, cum_weights=self._cum_weights)[0]
+            if profile not in issues:
+                issues.append(profile)
+        return issues
+
+    def _issue_sentence(self, profile: IntentProfile) -> str:
+        rng = self.rng
+        pattern = rng.choice(profile.patterns or profile.verbs or profile.keywords)
+        return rng.choice(ISSUE_TEMPLATES).format(
+            actor=rng.choice(ACTORS),
+            pattern=pattern,
+            Pattern=pattern[:1].upper() + pattern[1:],
+            verb=rng.choice(profile.verbs or profile.patterns or profile.keywords),
+            keyword=rng.choice(profile.keywords or profile.clause_keywords),
+            clause_keyword=rng.choice(profile.clause_keywords),
+        )
+
+    def _target_words(self) -> int:
+        config = self.config
+        words = round(self.rng.lognormvariate(math.log(config.median_words), config.length_sigma))
+        return max(config.min_words, min(config.max_words, words))
+
+    def generate_query(self) -> Tuple[str, List[IntentProfile]]:
+        rng = self.rng
+        issues = self._pick_issues()
+        target = self._target_words()
+
+        sentences = [rng.choice(OPENERS)] + [self._issue_sentence(p) for p in issues]
+        closer = rng.choice(CLOSERS)
+
+        words = sum(len(s.split()) for s in sentences) + len(closer.split())
+        while words < target:
+            sentence = rng.choice(CONTEXT_SENTENCES)
+            sentences.append(sentence)
+            words += len(sentence.split())
+
+        sentences.append(closer)
+        query = " ".join(s for s in sentences if s)
+
+        # The last filler sentence can overshoot max_words
+        tokens = query.split()
+        if len(tokens) > self.config.max_words:
+            query = " ".join(tokens[:self.config.max_words])
+        return query, issues
+
+    def cases(self, count: int, start: int = 0) -> Iterator[Dict]:
+        """count golden-format cases; test ids continue from start"""
+        for index in range(start, start + count):
+            query, issues = self.generate_query()
+            imc_expected = any(p.imc_linked for p in issues)
+            yield {
+                "test_id": f"SYN_{index:07d}",
+                "user_query": query,
+                "user_role": self.rng.choice(ROLES),
+                "scenario_type": "mixed" if len(issues) > 1 else "single_issue",
+                "expected_primary_legal_triggers": [issues[0].name],
+                "expected_secondary_legal_triggers": [p.name for p in issues[1:]],
+                "required_nhrc_clauses": [],
+                "forbidden_nhrc_clauses": [],
+                "imc_awareness_expected": imc_expected,
+                "required_imc_clauses": [],
+                "misconduct_awareness_expected": imc_expected,
+                "proof_required": True,
+            }
+
+
+def generate_corpus(count: int, config: CorpusConfig = CorpusConfig()) -> Iterator[Dict]:
+    profiles = load_profiles(IntentClassifier(), KnowledgeBase())
+    return CorpusGenerator(profiles, config).cases(count)
+
+
+if __name__ == "__main__":
+    defaults = CorpusConfig()
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic complaint corpus as JSONL")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--output", required=True, help="JSONL file to write")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--zipf", type=float, default=defaults.zipf_exponent,
+                        help="popularity exponent; 0 makes every intent equally likely")
+    parser.add_argument("--median-words", type=int, default=defaults.median_words,
+                        help="median target length in words")
+    parser.add_argument("--length-sigma", type=float, default=defaults.length_sigma,
+                        help="log-normal spread of query length")
+    parser.add_argument("--min-words", type=int, default=defaults.min_words)
+    parser.add_argument("--max-words", type=int, default=defaults.max_words)
+    parser.add_argument("--mix", type=float, default=defaults.mix_probability,
+                        help="probability of adding each further issue to a query")
+    parser.add_argument("--max-issues", type=int, default=defaults.max_issues)
+    args = parser.parse_args()
+
+    config = CorpusConfig(
+        seed=args.seed,
+        zipf_exponent=args.zipf,
+        median_words=args.median_words,
+        length_sigma=args.length_sigma,
+        min_words=args.min_words,
+        max_words=args.max_words,
+        mix_probability=args.mix,
+        max_issues=args.max_issues,
+    )
+    written = write_jsonl(generate_corpus(args.count, config), args.output)
+    print(f"✅ Wrote {written} synthetic cases to {args.output}")
@@ -2,12 +2,12 @@
 
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 
 
-def load_dataset(relative_path: str) -> List[Dict]:
+def resolve_dataset_path(relative_path: str) -> Path:
     """
-    Load dataset using path relative to tests_metrices directory,
+    Resolve a dataset path relative to the tests_metrices directory,
     regardless of where script is executed from.
     """
     base_dir = Path(__file__).resolve().parent.parent
@@ -18,6 +18,19 @@ def load_dataset(relative_path: str) -> List[Dict]:
             f"Dataset not found at: {dataset_path}"
         )
 
+    return dataset_path
+
+
+def load_dataset(relative_path: str) -> List[Dict]:
+    """
+    Load dataset using path relative to tests_metrices directory,
+    regardless of where script is executed from.
+    """
+    dataset_path = resolve_dataset_path(relative_path)
+
+    if dataset_path.suffix == ".jsonl":
+        return list(iter_dataset(relative_path))
+
     with open(dataset_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
@@ -25,3 +38,39 @@ def load_dataset(relative_path: str) -> List[Dict]:
         raise ValueError("Dataset must be a list of test cases")
 
     return data
+
+
+def iter_dataset(relative_path: str) -> Iterator[Dict]:
+    """
+    Yield test cases one at a time. A .jsonl dataset (one case object
+    per line, blank lines ignored) is streamed, so memory stays constant
+    however large it is; a .json list is loaded whole.
+    """
+    dataset_path = resolve_dataset_path(relative_path)
+
+    if dataset_path.suffix != ".jsonl":
+        yield from load_dataset(relative_path)
+        return
+
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                case = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{dataset_path}:{line_number}: invalid JSON ({e.msg})") from None
+            if not isinstance(case, dict):
+                raise ValueError(f"{dataset_path}:{line_number}: test case must be an object")
+            yield case
+
+
+def write_jsonl(records: Iterable[Dict], path) -> int:
+    """Write records one per line as they arrive; returns the count"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
@@ -0,0 +1,155 @@
+# tests_metrices/loaders/determinism_check.py
+
+"""
+Cross-process determinism check.
+
+Rerunning one query in one process cannot expose nondeterminism that
+comes from string hashing or set/dict iteration order, because the hash
+seed is fixed for the life of the interpreter. This check evaluates the
+whole dataset in one fresh interpreter per PYTHONHASHSEED value, all
+running concurrently. Each interpreter writes an 8-byte digest per case
+to a file, and the digests are compared case by case afterwards.
+
+Usage:
+    python -m tests_metrices.loaders.determinism_check --dataset datasets/golden_cases_v6.json --seeds 0,1,2
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from tests_metrices.loaders.dataset_loader import iter_dataset
+from tests_metrices.loaders.response_runner import ResponseRunner
+
+DEFAULT_HASH_SEEDS = (0, 1, 2)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def case_digest(runner: ResponseRunner, query: str) -> str:
+    """Compact digest of everything a case's evaluation depends on"""
+    detected, response_text = runner.run_with_response(query)
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(json.dumps(detected, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((response_text or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_digests(dataset_path: str, output_path: str) -> None:
+    """One 'test_id<TAB>digest' line per case, in dataset order"""
+    runner = ResponseRunner()
+    with open(output_path, "w", encoding="utf-8") as f:
+        for index, case in enumerate(iter_dataset(dataset_path)):
+            test_id = case.get("test_id", f"#{index}")
+            f.write(f"{test_id}\t{case_digest(runner, case['user_query'])}\n")
+
+
+@dataclass
+class DeterminismReport:
+    seeds: Tuple[int, ...]
+    cases: int = 0
+    # (test_id, {seed: digest}) for every case whose digests differ
+    divergent: List[Tuple[str, Dict[int, str]]] = field(default_factory=list)
+
+    @property
+    def score(self) -> float:
+        return 1 - len(self.divergent) / self.cases if self.cases else 1.0
+
+
+class SeedRuns:
+    """
+    One digest subprocess per hash seed, started immediately so the check
+    overlaps with whatever the caller does before collect()
+    """
+
+    def __init__(self, dataset_path: str, seeds: Sequence[int] = DEFAULT_HASH_SEEDS):
+        if len(seeds) < 2:
+            raise ValueError("Determinism check needs at least two hash seeds")
+
+        self.seeds = tuple(seeds)
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="pc_mlra_determinism_")
+        self._runs = []
+
+        pythonpath = os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))
+        for seed in self.seeds:
+            output_path = os.path.join(self._tmpdir.name, f"seed_{seed}.tsv")
+            env = {**os.environ, "PYTHONHASHSEED": str(seed), "PYTHONPATH": pythonpath}
+            process = subprocess.Popen(
+                [sys.executable, "-m", "tests_metrices.loaders.determinism_check",
+                 "--dataset", dataset_path, "--digest-output", output_path],
+                env=env,
+                stdout=subprocess.DEVNULL,
+            )
+            self._runs.append((seed, process, output_path))
+
+    def collect(self) -> DeterminismReport:
+        """Wait for every seed and compare digests case by case"""
+        try:
+            for seed, process, _ in self._runs:
+                if process.wait() != 0:
+                    raise RuntimeError(f"Determinism run with PYTHONHASHSEED={seed} exited with {process.returncode}")
+
+            report = DeterminismReport(seeds=self.seeds)
+            files = [open(path, encoding="utf-8") for _, _, path in self._runs]
+            try:
+                for lines in zip(*files):
+                    report.cases += 1
+                    digests = [line.rstrip("\n").split("\t") for line in lines]
+                    if len({digest for _, digest in digests}) > 1:
+                        test_id = digests[0][0]
+                        report.divergent.append((test_id, {seed: d for seed, (_, d) in zip(self.seeds, digests)}))
+            finally:
+                for f in files:
+                    f.close()
+            return report
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for _, process, _ in self._runs:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        self._tmpdir.cleanup()
+
+
+def check_determinism(dataset_path: str, seeds: Sequence[int] = DEFAULT_HASH_SEEDS) -> DeterminismReport:
+    return SeedRuns(dataset_path, seeds).collect()
+
+
+def parse_seeds(spec: str) -> Tuple[int, ...]:
+    """'0,1,2' -> (0, 1, 2); an empty string disables the check"""
+    return tuple(int(seed) for seed in spec.split(",") if seed.strip())
+
+
+def print_report(report: DeterminismReport) -> None:
+    seeds = ", ".join(str(seed) for seed in report.seeds)
+    print(f"Cross-process determinism (PYTHONHASHSEED {seeds}): "
+          f"{report.cases - len(report.divergent)}/{report.cases} cases identical")
+    for test_id, digests in report.divergent:
+        detail = "  ".join(f"{seed}={digest}" for seed, digest in digests.items())
+        print(f"  ❌ {test_id}: {detail}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-case responses across hash seeds")
+    parser.add_argument("--dataset", default="datasets/golden_cases_v6.json")
+    parser.add_argument("--seeds", default=",".join(str(s) for s in DEFAULT_HASH_SEEDS),
+                        help="comma-separated PYTHONHASHSEED values, one process each")
+    parser.add_argument("--digest-output", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.digest_output:
+        write_digests(args.dataset, args.digest_output)
+    else:
+        report = check_determinism(args.dataset, parse_seeds(args.seeds))
+        print_report(report)
+        sys.exit(1 if report.divergent else 0)
@@ -0,0 +1,89 @@
+# tests_metrices/loaders/evaluation_cache.py
+
+"""
+Persistent cache of per-case detected outputs.
+
+Entries are keyed by (case content hash, evaluation fingerprint). The
+fingerprint changes whenever intents, KB, templates or pipeline code
+change, so a rerun only recomputes cases that are new or edited. Storage
+is SQLite: lookups are point queries, so the cache never has to fit in
+memory alongside a streamed dataset.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+# Pending writes are committed in batches of this many
+COMMIT_INTERVAL = 500
+
+
+def case_hash(case: Dict) -> str:
+    """Stable hash of a test case's full content"""
+    canonical = json.dumps(case, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class EvaluationCache:
+    def __init__(self, path, fingerprint: str):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._pending = []
+
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detected ("
+            " case_hash TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " detected TEXT NOT NULL,"
+            " PRIMARY KEY (case_hash, fingerprint))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Detected output for a case_hash under the current fingerprint"""
+        row = self._conn.execute(
+            "SELECT detected FROM detected WHERE case_hash = ? AND fingerprint = ?",
+            (key, self.fingerprint),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, detected: Dict) -> None:
+        self._pending.append((key, self.fingerprint, json.dumps(detected, ensure_ascii=False)))
+        if len(self._pending) >= COMMIT_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._conn.executemany("INSERT OR REPLACE INTO detected VALUES (?, ?, ?)", self._pending)
+            self._conn.commit()
+            self._pending = []
+
+    def prune(self) -> int:
+        """Drop entries from other fingerprints; returns how many"""
+        self.flush()
+        deleted = self._conn.execute(
+            "DELETE FROM detected WHERE fingerprint != ?", (self.fingerprint,)
+        ).rowcount
+        self._conn.commit()
+        return deleted
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
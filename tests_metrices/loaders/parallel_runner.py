@@ -0,0 +1,114 @@
+# tests_metrices/loaders/parallel_runner.py
+
+"""
+Process-pool evaluation for the metrics harness.
+
+Building a ResponseRunner (classifier plus assembler) is the expensive
+part of starting a worker, so each worker builds exactly one in its
+initializer and reuses it for every chunk it is given. Chunks are mapped
+in order, so results come back in dataset order and anything computed
+from them matches a sequential run exactly. Only a bounded window of
+chunks is in flight at once, so a streamed dataset is never read ahead
+of the results.
+"""
+
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from tests_metrices.loaders.response_runner import ResponseRunner
+
+# evaluate(runner, case) -> anything picklable; must be a module-level function
+CaseEvaluator = Callable[[ResponseRunner, Dict], Any]
+
+# Chunks per worker: enough to balance uneven chunks, few enough to keep IPC cheap
+CHUNKS_PER_WORKER = 4
+
+# Chunk size when the number of cases is not known up front
+DEFAULT_CHUNK_SIZE = 64
+
+_worker_runner: Optional[ResponseRunner] = None
+_worker_evaluate: Optional[CaseEvaluator] = None
+
+
+def detect_case(runner: ResponseRunner, case: Dict) -> Dict:
+    """Default evaluator: the detected fields for one case"""
+    return runner.run_for_metrics(case["user_query"])
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """None or 0 means one worker per CPU"""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker(evaluate: CaseEvaluator):
+    global _worker_runner, _worker_evaluate
+    _worker_runner = ResponseRunner()
+    _worker_evaluate = evaluate
+
+
+def _evaluate_chunk(cases: Sequence[Dict]) -> List[Any]:
+    return [_worker_evaluate(_worker_runner, case) for case in cases]
+
+
+def iter_evaluated(
+    cases: Iterable[Dict],
+    evaluate: CaseEvaluator = detect_case,
+    workers: Optional[int] = 1,
+    chunk_size: Optional[int] = None,
+    runner: Optional[ResponseRunner] = None,
+) -> Iterator[Any]:
+    """
+    evaluate(runner, case) for every case, yielded in dataset order.
+
+    workers=1 runs in this process (reusing runner if given); more workers
+    evaluate chunks of chunk_size cases in a process pool, keeping at most
+    CHUNKS_PER_WORKER chunks per worker queued.
+    """
+    workers = resolve_workers(workers)
+    if isinstance(cases, Sequence):
+        if len(cases) <= 1:
+            workers = 1
+        workers = min(workers, max(1, len(cases)))
+        chunk_size = chunk_size or max(1, math.ceil(len(cases) / (workers * CHUNKS_PER_WORKER)))
+
+    if workers == 1:
+        runner = runner or ResponseRunner()
+        for case in cases:
+            yield evaluate(runner, case)
+        return
+
+    window = workers * CHUNKS_PER_WORKER
+    chunks = chunked(cases, chunk_size or DEFAULT_CHUNK_SIZE)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(evaluate,)) as pool:
+        pending = deque(pool.submit(_evaluate_chunk, chunk) for chunk in islice(chunks, window))
+        while pending:
+            results = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(pool.submit(_evaluate_chunk, chunk))
+            yield from results
+
+
+def evaluate_cases(
+    cases: Sequence[Dict],
+    evaluate: CaseEvaluator = detect_case,
+    workers: Optional[int] = 1,
+    chunk_size: Optional[int] = None,
+    runner: Optional[ResponseRunner] = None,
+) -> List[Any]:
+    """iter_evaluated collected into a list"""
+    return list(iter_evaluated(cases, evaluate, workers, chunk_size, runner))
@@ -1,5 +1,7 @@
 # tests_metrices/loaders/response_runner.py
 
+import hashlib
+from time import perf_counter
 from typing import Dict, Any, List
 
 from src.intent_classifier import IntentClassifier
@@ -16,6 +18,18 @@ class ResponseRunner:
         self.intent_classifier = IntentClassifier()
         self.response_assembler = ResponseAssembler()
 
+    @property
+    def fingerprint(self) -> str:
+        """
+        Engine fingerprint (intents, KB, templates, engine code) plus this
+        file, since run_for_metrics decides what gets recorded as detected.
+        """
+        with open(__file__, "rb") as f:
+            runner_source = f.read()
+        digest = hashlib.sha256(self.response_assembler.engine_fingerprint.encode("utf-8"))
+        digest.update(runner_source)
+        return digest.hexdigest()[:16]
+
     # -------------------------------------------------
     # Intent-only run (optional diagnostic)
     # -------------------------------------------------
@@ -34,6 +48,23 @@ class ResponseRunner:
     # Full pipeline run (canonical, USED BY METRICS)
     # -------------------------------------------------
     def run_for_metrics(self, query: str) -> dict:
+        return self._run(query)[0]
+
+    def run_with_response(self, query: str):
+        """(detected fields, response text) from a single pipeline run"""
+        detected, response_text, _ = self._run(query)
+        return detected, response_text
+
+    def run_timed(self, query: str):
+        """
+        (detected fields, timings): per-stage seconds from the assembler
+        plus "total" for the whole run; the response cache is bypassed
+        """
+        started = perf_counter()
+        detected, _, timings = self._run(query, collect_timings=True)
+        return detected, {**timings, "total": perf_counter() - started}
+
+    def _run(self, query: str, collect_timings: bool = False):
         intent_result = self.intent_classifier.classify(query)
 
         if not isinstance(intent_result, list):
@@ -41,7 +72,8 @@ class ResponseRunner:
 
         response_text, proof_trace = self.response_assembler.generate_response(
             query,
-            show_proof=True
+            show_proof=True,
+            collect_timings=collect_timings,
         )
         
         #print("PROOF TRACE TYPE:", type(proof_trace))
@@ -70,7 +102,7 @@ class ResponseRunner:
 
         imc_awareness = bool(detected_imc)
 
-        return {
+        detected = {
             "detected_primary_intents": (
                 [intents_sorted[0][0]] if intents_sorted else []
             ),
@@ -84,3 +116,4 @@ class ResponseRunner:
             "proof_present": bool(proof_trace),
             "template_id": getattr(proof_trace, "template_id", None),
         }
+        return detected, response_text, proof_trace.stage_timings
@@ -0,0 +1,57 @@
+# tests_metrices/metrics/accumulator.py
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+class MetricAccumulator(ABC):
+    """
+    Incremental form of a metric: update() once per case record,
+    result() at any point. Holds only counters, so memory does not
+    grow with the dataset.
+    """
+
+    @abstractmethod
+    def update(self, item: Dict) -> None:
+        """Count one case record"""
+
+    @abstractmethod
+    def result(self) -> float:
+        """The metric over the records counted so far"""
+
+    @classmethod
+    def over(cls, results: Iterable[Dict]) -> float:
+        """The metric over a whole iterable of records"""
+        accumulator = cls()
+        for item in results:
+            accumulator.update(item)
+        return accumulator.result()
+
+
+class RatioAccumulator(MetricAccumulator):
+    """numerator / denominator, or empty_value when nothing was counted"""
+
+    empty_value = 1.0
+
+    def __init__(self):
+        self.numerator = 0
+        self.denominator = 0
+
+    def result(self) -> float:
+        return self.numerator / self.denominator if self.denominator else self.empty_value
+
+
+class MetricSuite:
+    """Named accumulators updated together in a single pass"""
+
+    def __init__(self, metrics: List[Tuple[str, Callable[[], MetricAccumulator]]]):
+        self.accumulators = [(name, factory()) for name, factory in metrics]
+        self.count = 0
+
+    def update(self, item: Dict) -> None:
+        self.count += 1
+        for _, accumulator in self.accumulators:
+            accumulator.update(item)
+
+    def summary(self) -> Dict[str, float]:
+        return {name: accumulator.result() for name, accumulator in self.accumulators}
@@ -2,72 +2,69 @@
 
 from typing import List, Dict, Set
 
+from tests_metrices.metrics.accumulator import RatioAccumulator
 
-def nhrc_clause_coverage(results: List[Dict]) -> float:
-    """
-    Metric — NHRC Clause Coverage Accuracy
-    """
-    correct = 0
-    total = 0
 
-    for item in results:
-        required = {
-            c.replace("-", "_") for c in item.get("required_nhrc_clauses", [])
-        }
-        detected = {
-            c.replace("-", "_") for c in item.get("detected_nhrc_clauses", [])
-        }
+def _normalized(item: Dict, key: str) -> Set[str]:
+    return {c.replace("-", "_") for c in item.get(key, [])}
+
+
+class NhrcClauseCoverage(RatioAccumulator):
+    def update(self, item: Dict) -> None:
+        required = _normalized(item, "required_nhrc_clauses")
+        detected = _normalized(item, "detected_nhrc_clauses")
 
         if not required:
-            continue
+            return
 
-        total += 1
+        self.denominator += 1
         if required.issubset(detected):
-            correct += 1
+            self.numerator += 1
 
-    return correct / total if total else 1.0
 
+class ForbiddenClauseViolationRate(RatioAccumulator):
+    empty_value = 0.0
 
-def forbidden_clause_violation_rate(results: List[Dict]) -> float:
-    """
-    Metric — Forbidden Clause Violation Rate
-    """
-    violations = 0
-    total = 0
-
-    for item in results:
-        forbidden = {
-            c.replace("-", "_") for c in item.get("forbidden_nhrc_clauses", [])
-        }
-        detected = {
-            c.replace("-", "_") for c in item.get("detected_nhrc_clauses", [])
-        }
+    def update(self, item: Dict) -> None:
+        forbidden = _normalized(item, "forbidden_nhrc_clauses")
+        detected = _normalized(item, "detected_nhrc_clauses")
 
         if not forbidden:
-            continue
+            return
 
-        total += 1
+        self.denominator += 1
         if forbidden & detected:
-            violations += 1
+            self.numerator += 1
+
 
-    return violations / total if total else 0.0
+class ImcClausePrecision(RatioAccumulator):
+    def update(self, item: Dict) -> None:
+        required = set(item.get("required_imc_clauses", []))
+        detected = set(item.get("detected_imc_clauses", []))
 
+        if not detected:
+            return
 
-def imc_clause_precision(results: List[Dict]) -> float:
+        self.denominator += len(detected)
+        self.numerator += len(required & detected)
+
+
+def nhrc_clause_coverage(results: List[Dict]) -> float:
     """
-    Metric — IMC Clause Precision
+    Metric — NHRC Clause Coverage Accuracy
     """
-    correct = 0
-    total = 0
+    return NhrcClauseCoverage.over(results)
 
-    for item in results:
-        required = set(item.get("required_imc_clauses", []))
-        detected = set(item.get("detected_imc_clauses", []))
 
-        if not detected:
-            continue
+def forbidden_clause_violation_rate(results: List[Dict]) -> float:
+    """
+    Metric — Forbidden Clause Violation Rate
+    """
+    return ForbiddenClauseViolationRate.over(results)
 
-        total += len(detected)
-        correct += len(required & detected)
 
-    return correct / total if total else 1.0
+def imc_clause_precision(results: List[Dict]) -> float:
+    """
+    Metric — IMC Clause Precision
+    """
+    return ImcClausePrecision.over(results)
@@ -2,6 +2,22 @@
 
 from typing import List, Dict
 
+from tests_metrices.metrics.accumulator import RatioAccumulator
+
+
+class ImcAwarenessAccuracy(RatioAccumulator):
+    def update(self, item: Dict) -> None:
+        self.denominator += 1
+        if item["imc_awareness_expected"] == item["imc_awareness_detected"]:
+            self.numerator += 1
+
+
+class MisconductAwarenessAccuracy(RatioAccumulator):
+    def update(self, item: Dict) -> None:
+        self.denominator += 1
+        if item["misconduct_awareness_expected"] == item["misconduct_awareness_detected"]:
+            self.numerator += 1
+
 
 def imc_awareness_accuracy(results: List[Dict]) -> float:
     """
@@ -9,18 +25,7 @@ def imc_awareness_accuracy(results: List[Dict]) -> float:
 
     Checks whether IMC awareness is shown when expected.
     """
-    correct = 0
-    total = 0
-
-    for item in results:
-        expected = item["imc_awareness_expected"]
-        detected = item["imc_awareness_detected"]
-
-        total += 1
-        if expected == detected:
-            correct += 1
-
-    return correct / total if total else 1.0
+    return ImcAwarenessAccuracy.over(results)
 
 
 def misconduct_awareness_accuracy(results: List[Dict]) -> float:
@@ -29,15 +34,4 @@ def misconduct_awareness_accuracy(results: List[Dict]) -> float:
 
     Binary check: awareness surfaced or not.
     """
-    correct = 0
-    total = 0
-
-    for item in results:
-        expected = item["misconduct_awareness_expected"]
-        detected = item["misconduct_awareness_detected"]
-
-        total += 1
-        if expected == detected:
-            correct += 1
-
-    return correct / total if total else 1.0
+    return MisconductAwarenessAccuracy.over(results)
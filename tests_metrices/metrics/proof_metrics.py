@@ -2,6 +2,15 @@
 
 from typing import List, Dict
 
+from tests_metrices.metrics.accumulator import RatioAccumulator
+
+
+class ProofCompletenessScore(RatioAccumulator):
+    def update(self, item: Dict) -> None:
+        self.denominator += 1
+        if item["proof_present"]:
+            self.numerator += 1
+
 
 def proof_completeness_score(results: List[Dict]) -> float:
     """
@@ -9,12 +18,4 @@ def proof_completeness_score(results: List[Dict]) -> float:
 
     Checks whether proof trace and legal sources are present.
     """
-    correct = 0
-    total = 0
-
-    for item in results:
-        total += 1
-        if item["proof_present"]:
-            correct += 1
-
-    return correct / total if total else 1.0
+    return ProofCompletenessScore.over(results)
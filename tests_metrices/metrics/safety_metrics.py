@@ -3,6 +3,10 @@
 import hashlib
 from typing import List, Dict
 
+from tests_metrices.metrics.accumulator import RatioAccumulator
+
+PIPELINE_STEPS = ("intent_ok", "clauses_ok", "ethics_ok", "template_ok", "proof_ok")
+
 
 def _hash_response(response: dict) -> str:
     """
@@ -26,6 +30,15 @@ def determinism_score(responses: List[dict]) -> float:
 
     return identical / len(hashes)
 
+
+class PipelineCorrectnessIndex(RatioAccumulator):
+    def update(self, item: Dict) -> None:
+        steps = [item[step] for step in PIPELINE_STEPS]
+
+        self.numerator += sum(1 for s in steps if s)
+        self.denominator += len(steps)
+
+
 def pipeline_correctness_index(results: List[Dict]) -> float:
     """
     Metric 10 — Pipeline Correctness Index (PCI)
@@ -33,20 +46,4 @@ def pipeline_correctness_index(results: List[Dict]) -> float:
     Each step is binary:
     intent_ok, clauses_ok, ethics_ok, template_ok, proof_ok
     """
-    total = 0
-    score = 0
-
-    for r in results:
-        steps = [
-            r["intent_ok"],
-            r["clauses_ok"],
-            r["ethics_ok"],
-            r["template_ok"],
-            r["proof_ok"],
-        ]
-
-        score += sum(1 for s in steps if s)
-        total += len(steps)
-
-    return score / total if total else 1.0
-
+    return PipelineCorrectnessIndex.over(results)
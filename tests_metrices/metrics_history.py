@@ -0,0 +1,264 @@
+# tests_metrices/metrics_history.py
+
+"""
+Structured metrics history: one JSON object per evaluation run, appended
+to a JSONL file, so the history can be parsed whole, trended and diffed.
+
+Each run records the accuracy summary alongside per-case latency and
+stage-timing distributions, peak RSS, engine build time and the
+intent / KB / template / code fingerprints the run was made with.
+Only cases recomputed rather than reused from the evaluation cache are
+timed, so a run also records a digest of which cases those were; diffs
+compare latency and wall time only between runs that timed the same cases.
+
+Usage:
+    python -m tests_metrices.metrics_history list
+    python -m tests_metrices.metrics_history show -1
+    python -m tests_metrices.metrics_history diff -2 -1
+    python -m tests_metrices.metrics_history import-legacy tests_metrices/results/metrics_history.json
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.stage_timing import BUCKET_BOUNDS, STAGES, StageHistograms
+
+HISTORY_PATH = Path("tests_metrices/results/metrics_history.jsonl")
+LEGACY_HISTORY_PATH = Path("tests_metrices/results/metrics_history.json")
+
+# Stage bounds plus room for whole-case latencies
+LATENCY_BOUNDS = BUCKET_BOUNDS + (0.25, 0.5, 1.0, 2.5, 10.0)
+
+# Relative performance change shown as a regression or improvement in diffs
+NOTABLE_CHANGE = 0.05
+
+# Summary metrics where a decrease is an improvement
+LOWER_IS_BETTER = {"forbidden_clause_violation_rate"}
+
+
+def histogram_percentile(buckets, count: int, fraction: float, maximum: float) -> float:
+    """Upper bound of the bucket holding the given fraction of samples"""
+    target = fraction * count
+    for bound, cumulative in buckets:
+        if cumulative >= target:
+            return maximum if bound == "+Inf" else min(bound, maximum)
+    return maximum
+
+
+class RunTimings:
+    """Per-case latency and stage-timing distributions for one run"""
+
+    def __init__(self):
+        self.histograms = StageHistograms(enabled=True, bounds=LATENCY_BOUNDS)
+        self.maximum: Dict[str, float] = {}
+
+    def record(self, timings: Dict[str, float]) -> None:
+        self.histograms.record(timings)
+        for stage, seconds in timings.items():
+            if seconds > self.maximum.get(stage, 0.0):
+                self.maximum[stage] = seconds
+
+    def to_dict(self) -> Dict:
+        snapshot = self.histograms.snapshot()
+        total = snapshot.get("total")
+        if total is None:
+            return {"cases_timed": 0}
+
+        def summary(stage: str, scale: float) -> Dict[str, float]:
+            entry = snapshot[stage]
+            top = self.maximum[stage]
+            return {
+                "mean": entry["sum"] / entry["count"] * scale,
+                **{
+                    name: histogram_percentile(entry["buckets"], entry["count"], q, top) * scale
+                    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+                },
+                "max": top * scale,
+            }
+
+        return {
+            "cases_timed": total["count"],
+            "latency_ms": summary("total", 1000),
+            "latency_histogram": [[bound, cumulative] for bound, cumulative in total["buckets"]],
+            "stages_us": {stage: summary(stage, 1e6) for stage in snapshot if stage in STAGES},
+        }
+
+
+def timed_cases_digest(case_ids: List[str]) -> str:
+    """Identifies the set of cases a run timed, whatever order they finished in"""
+    return hashlib.sha256("\n".join(sorted(case_ids)).encode("utf-8")).hexdigest()[:16]
+
+
+def new_run_id(timestamp: datetime, fingerprint: str) -> str:
+    return f"{timestamp.strftime('%Y%m%dT%H%M%S')}{timestamp.microsecond // 1000:03d}-{fingerprint[:6]}"
+
+
+def append_run(record: Dict, path: Path = HISTORY_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n")
+
+
+def iter_runs(path: Path = HISTORY_PATH) -> Iterator[Dict]:
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def find_run(ref: str, path: Path = HISTORY_PATH) -> Dict:
+    """A run by id (or unique id prefix), or by index such as -1 for the latest"""
+    runs = list(iter_runs(path))
+    matches = [run for run in runs if run["run_id"].startswith(ref)]
+    if len(matches) == 1:
+        return matches[0]
+    if not matches and ref.lstrip("-").isdigit():
+        try:
+            return runs[int(ref)]
+        except IndexError:
+            raise KeyError(f"No run at index {ref} ({len(runs)} runs recorded)") from None
+    raise KeyError(f"{len(matches)} runs match '{ref}'")
+
+
+def import_legacy(legacy_path: Path = LEGACY_HISTORY_PATH, path: Path = HISTORY_PATH) -> int:
+    """
+    Convert the old history format (indented JSON records separated by
+    lines of '=') into runs placed ahead of those already recorded, which
+    are newer; returns how many were imported
+    """
+    text = legacy_path.read_text(encoding="utf-8")
+    imported = []
+    for block in text.split("\n" + "=" * 80 + "\n"):
+        if not block.strip().strip("="):
+            continue
+        legacy = json.loads(block)
+        imported.append({
+            "run_id": new_run_id(datetime.fromisoformat(legacy["timestamp"]), "legacy"),
+            "timestamp": legacy["timestamp"],
+            "dataset": legacy.get("dataset"),
+            "summary": legacy["summary"],
+            "imported_from": str(legacy_path),
+        })
+
+    existing = list(iter_runs(path))
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    for run in imported + existing:
+        append_run(run, tmp_path)
+    tmp_path.replace(path)
+    return len(imported)
+
+
+def _relative(old: float, new: float) -> Optional[float]:
+    return (new - old) / old if old else None
+
+
+def diff_runs(old: Dict, new: Dict) -> List[str]:
+    """Human-readable differences in correctness, fingerprints and performance"""
+    lines = [f"{old['run_id']} → {new['run_id']}"]
+
+    lines.append("Correctness:")
+    for name in dict.fromkeys([*old.get("summary", {}), *new.get("summary", {})]):
+        a, b = old.get("summary", {}).get(name), new.get("summary", {}).get(name)
+        if a is None or b is None:
+            lines.append(f"  {name}: {a} → {b}")
+        elif a != b:
+            improved = b < a if name in LOWER_IS_BETTER else b > a
+            lines.append(f"  {'✅' if improved else '❌'} {name}: {a:.4f} → {b:.4f} ({b - a:+.4f})")
+        else:
+            lines.append(f"     {name}: {a:.4f}")
+
+    old_prints, new_prints = old.get("fingerprints", {}), new.get("fingerprints", {})
+    changed = [name for name in dict.fromkeys([*old_prints, *new_prints]) if old_prints.get(name) != new_prints.get(name)]
+    lines.append(f"Fingerprints changed: {', '.join(changed) if changed else 'none'}")
+
+    old_perf, new_perf = old.get("performance", {}), new.get("performance", {})
+    if old_perf and new_perf:
+        lines.append("Performance:")
+        if "recomputed" in old and "recomputed" in new:
+            lines.append(f"     cases recomputed (rest from cache): {old['recomputed']}/{old.get('cases')}"
+                         f" → {new['recomputed']}/{new.get('cases')}")
+        rows = [
+            ("engine build (s)", old_perf.get("engine_build_seconds"), new_perf.get("engine_build_seconds")),
+            ("peak RSS (KiB)", old_perf.get("peak_rss_kib"), new_perf.get("peak_rss_kib")),
+        ]
+        # Runs recorded before the digest existed are compared as they always were
+        old_timed, new_timed = old_perf.get("timed_cases"), new_perf.get("timed_cases")
+        if old_timed is not None and new_timed is not None and old_timed != new_timed:
+            lines.append(f"  ⚠️  wall time, latency and stages not compared: the runs timed different cases"
+                         f" ({old_perf.get('cases_timed', 0)} vs {new_perf.get('cases_timed', 0)} timed)")
+        else:
+            rows.append(("wall time (s)", old_perf.get("wall_seconds"), new_perf.get("wall_seconds")))
+            old_latency = old_perf.get("latency_ms", {})
+            new_latency = new_perf.get("latency_ms", {})
+            rows += [(f"latency {k} (ms)", old_latency.get(k), new_latency.get(k))
+                     for k in ("mean", "p50", "p95", "p99", "max")]
+            old_stages, new_stages = old_perf.get("stages_us", {}), new_perf.get("stages_us", {})
+            rows += [
+                (f"stage {stage} mean (µs)", old_stages[stage]["mean"], new_stages[stage]["mean"])
+                for stage in STAGES if stage in old_stages and stage in new_stages
+            ]
+        for label, a, b in rows:
+            if a is None or b is None:
+                continue
+            change = _relative(a, b)
+            marker = "   "
+            if change is not None and abs(change) >= NOTABLE_CHANGE:
+                marker = "❌ " if change > 0 else "✅ "
+            suffix = f" ({change:+.1%})" if change is not None else ""
+            lines.append(f"  {marker}{label}: {a:.4g} → {b:.4g}{suffix}")
+    else:
+        lines.append("Performance: not recorded for both runs")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the PC-MLRA metrics history")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="one line per recorded run")
+    show = commands.add_parser("show", help="print one run as JSON")
+    show.add_argument("run", help="run id (prefix) or index, e.g. -1 for the latest")
+    diff = commands.add_parser("diff", help="compare two runs")
+    diff.add_argument("old", nargs="?", default="-2")
+    diff.add_argument("new", nargs="?", default="-1")
+    legacy = commands.add_parser("import-legacy", help="append runs from the old '=' separated history")
+    legacy.add_argument("legacy_path", nargs="?", type=Path, default=LEGACY_HISTORY_PATH)
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "list":
+            for run in iter_runs(args.history):
+                pci = run.get("summary", {}).get("pipeline_correctness_index")
+                latency = run.get("performance", {}).get("latency_ms", {})
+                pci = f"{pci:.3f}" if pci is not None else "-"
+                p95 = f"{latency['p95']:.2f} ms" if "p95" in latency else "-"
+                print(f"{run['run_id']:<27}{run.get('dataset') or '-':<36}"
+                      f"cases={run.get('cases', '-'):<8}recomputed={run.get('recomputed', '-'):<8}"
+                      f"PCI={pci}  p95={p95}")
+        elif args.command == "show":
+            print(json.dumps(find_run(args.run, args.history), indent=2, ensure_ascii=False))
+        elif args.command == "diff":
+            print("\n".join(diff_runs(find_run(args.old, args.history), find_run(args.new, args.history))))
+        elif args.command == "import-legacy":
+            count = import_legacy(args.legacy_path, args.history)
+            print(f"✅ Imported {count} runs into {args.history}")
+    except KeyError as e:
+        print(f"❌ {e.args[0]}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,30 +3,40 @@
 from tests_metrices.results.failure_explainer import explain_case_failure
 print(">>> Starting PC-MLRA Metrics Evaluation <<<")
 
+import argparse
 import json
+import resource
+import time
 from pathlib import Path
 from datetime import datetime
 
-from tests_metrices.loaders.dataset_loader import load_dataset
+from src.engine_fingerprint import component_fingerprints
+
+from tests_metrices.loaders.dataset_loader import iter_dataset
+from tests_metrices.loaders.determinism_check import DEFAULT_HASH_SEEDS, SeedRuns, parse_seeds, print_report
+from tests_metrices.loaders.evaluation_cache import EvaluationCache, case_hash
+from tests_metrices.loaders.parallel_runner import iter_evaluated
 from tests_metrices.loaders.response_runner import ResponseRunner
+from tests_metrices.metrics_history import HISTORY_PATH, RunTimings, append_run, new_run_id, timed_cases_digest
 
+from tests_metrices.metrics.accumulator import MetricSuite
 from tests_metrices.metrics.intent_metrics import (
-    primary_intent_accuracy,
-    secondary_intent_recall,
+    PrimaryIntentAccuracy,
+    SecondaryIntentRecall,
 )
 from tests_metrices.metrics.clause_metrics import (
-    nhrc_clause_coverage,
-    forbidden_clause_violation_rate,
-    imc_clause_precision,
+    NhrcClauseCoverage,
+    ForbiddenClauseViolationRate,
+    ImcClausePrecision,
 )
 from tests_metrices.metrics.ethics_metrics import (
-    imc_awareness_accuracy,
-    misconduct_awareness_accuracy,
+    ImcAwarenessAccuracy,
+    MisconductAwarenessAccuracy,
 )
-from tests_metrices.metrics.proof_metrics import proof_completeness_score
+from tests_metrices.metrics.proof_metrics import ProofCompletenessScore
 from tests_metrices.metrics.safety_metrics import (
     determinism_score,
-    pipeline_correctness_index,
+    PipelineCorrectnessIndex,
 )
 
 from tests_metrices.results.case_evaluator import evaluate_case
@@ -35,74 +45,194 @@ from tests_metrices.results.case_evaluator import evaluate_case
 RESULTS_DIR = Path("tests_metrices/results")
 RESULTS_DIR.mkdir(exist_ok=True)
 
-HISTORY_FILE = RESULTS_DIR / "metrics_history.json"
-
-
-def run_all_metrics(dataset_path: str):
-    dataset = load_dataset(dataset_path)
-    runner = ResponseRunner()
+HISTORY_FILE = HISTORY_PATH
+CACHE_FILE = RESULTS_DIR / "evaluation_cache.sqlite3"
+
+# Recomputed case ids listed individually up to this many
+MAX_LISTED_RECOMPUTED = 20
+
+# Summary metrics, in report order; each is updated once per case record
+SUMMARY_METRICS = [
+    ("primary_intent_accuracy", PrimaryIntentAccuracy),
+    ("secondary_intent_recall", SecondaryIntentRecall),
+    ("nhrc_clause_coverage", NhrcClauseCoverage),
+    ("forbidden_clause_violation_rate", ForbiddenClauseViolationRate),
+    ("imc_clause_precision", ImcClausePrecision),
+    ("imc_awareness_accuracy", ImcAwarenessAccuracy),
+    ("misconduct_awareness_accuracy", MisconductAwarenessAccuracy),
+    ("proof_completeness_score", ProofCompletenessScore),
+]
+
+
+def evaluate_record(runner: ResponseRunner, item):
+    """
+    (key, record, PCI input, freshly detected output, timings) for a
+    (key, case, cached detected) item; the detected output and timings
+    are None when the cached one was used. Runs in a pool worker when
+    workers > 1
+    """
+    key, case, cached = item
+    if cached is not None:
+        detected, timings = cached, None
+    else:
+        detected, timings = runner.run_timed(case["user_query"])
+
+    evaluation = evaluate_case(case, detected)
+    failure_reasons = explain_case_failure({**case, **detected})
+
+    record = {
+        **case,
+        **detected,
+        **evaluation.__dict__,
+        "failure_reasons": failure_reasons,
+    }
+    return key, record, evaluation.__dict__, None if cached is not None else detected, timings
 
-    per_case_results = []
-    pci_inputs = []
 
-    # -------- run system ONCE per query --------
-    for case in dataset:
-        detected = runner.run_for_metrics(case["user_query"])
+def with_cached(cases, cache):
+    for case in cases:
+        if cache is None:
+            yield None, case, None
+        else:
+            key = case_hash(case)
+            yield key, case, cache.get(key)
 
-        evaluation = evaluate_case(case, detected)
-        failure_reasons = explain_case_failure({**case, **detected})
 
-        record = {
-            **case,
-            **detected,
-            **evaluation.__dict__,
-            "failure_reasons": failure_reasons,
-        }
+def run_all_metrics(
+    dataset_path: str,
+    workers: int = 1,
+    chunk_size: int = None,
+    use_cache: bool = True,
+    hash_seeds=DEFAULT_HASH_SEEDS,
+):
+    # Seed runs evaluate the dataset in their own interpreters alongside the main pass
+    seed_runs = SeedRuns(dataset_path, hash_seeds) if hash_seeds else None
 
-        per_case_results.append(record)
-        pci_inputs.append(evaluation.__dict__)
+    started = time.perf_counter()
+    runner = ResponseRunner()
+    engine_build_seconds = time.perf_counter() - started
+    cache = EvaluationCache(CACHE_FILE, runner.fingerprint) if use_cache else None
+
+    suite = MetricSuite(SUMMARY_METRICS)
+    pci = PipelineCorrectnessIndex()
+    sample_query = None
+    recomputed = []
+    timings = RunTimings()
+
+    # -------- run system ONCE per changed query, single pass, records streamed to disk --------
+    items = with_cached(iter_dataset(dataset_path), cache)
+    evaluated = iter_evaluated(items, evaluate_record, workers=workers, chunk_size=chunk_size, runner=runner)
+
+    try:
+        with open(RESULTS_DIR / "per_case_results.jsonl", "w", encoding="utf-8") as f:
+            for index, (key, record, pci_input, detected, case_timings) in enumerate(evaluated):
+                if sample_query is None:
+                    sample_query = record["user_query"]
+
+                if detected is not None:
+                    recomputed.append(record.get("test_id", f"#{index}"))
+                    timings.record(case_timings)
+                    if cache is not None:
+                        cache.put(key, detected)
+
+                suite.update(record)
+                pci.update(pci_input)
+
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+    finally:
+        if cache is not None:
+            # Entries from earlier engine builds can never be hit again
+            cache.prune()
+            cache.close()
+
+    if sample_query is None:
+        raise ValueError(f"Dataset {dataset_path} has no test cases")
 
     # -------- compute metrics --------
-    summary = {
-        "primary_intent_accuracy": primary_intent_accuracy(per_case_results),
-        "secondary_intent_recall": secondary_intent_recall(per_case_results),
-        "nhrc_clause_coverage": nhrc_clause_coverage(per_case_results),
-        "forbidden_clause_violation_rate": forbidden_clause_violation_rate(per_case_results),
-        "imc_clause_precision": imc_clause_precision(per_case_results),
-        "imc_awareness_accuracy": imc_awareness_accuracy(per_case_results),
-        "misconduct_awareness_accuracy": misconduct_awareness_accuracy(per_case_results),
-        "proof_completeness_score": proof_completeness_score(per_case_results),
-        "pipeline_correctness_index": pipeline_correctness_index(pci_inputs),
-    }
+    summary = suite.summary()
+    summary["pipeline_correctness_index"] = pci.result()
 
     # -------- determinism check --------
-    sample_query = dataset[0]["user_query"]
     responses = [runner.run_for_metrics(sample_query) for _ in range(10)]
     summary["determinism_score"] = determinism_score(responses)
 
+    determinism_report = seed_runs.collect() if seed_runs is not None else None
+    if determinism_report is not None:
+        summary["cross_process_determinism"] = determinism_report.score
+
     # -------- save latest results --------
     with open(RESULTS_DIR / "metrics_summary.json", "w", encoding="utf-8") as f:
         json.dump(summary, f, indent=2)
 
-    with open(RESULTS_DIR / "per_case_results.json", "w", encoding="utf-8") as f:
-        json.dump(per_case_results, f, indent=2)
-
     # -------- append history (IMPORTANT PART) --------
+    assembler = runner.response_assembler
+    timestamp = datetime.now()
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
     history_record = {
-        "timestamp": datetime.now().isoformat(),
+        "run_id": new_run_id(timestamp, runner.fingerprint),
+        "timestamp": timestamp.isoformat(),
         "dataset": dataset_path,
+        "cases": suite.count,
+        "recomputed": len(recomputed),
         "summary": summary,
+        "fingerprints": {
+            "runner": runner.fingerprint,
+            "engine": assembler.engine_fingerprint,
+            **component_fingerprints(assembler.classifier, assembler.kb, assembler.template_engine),
+        },
+        "performance": {
+            "engine_build_seconds": engine_build_seconds,
+            "wall_seconds": time.perf_counter() - started,
+            # ru_maxrss is in KiB on Linux; children covers pool workers and seed runs
+            "peak_rss_kib": usage_self.ru_maxrss,
+            "peak_child_rss_kib": usage_children.ru_maxrss,
+            "workers": workers,
+            # Cache hits are not timed; diffs compare timings only over the same timed cases
+            "timed_cases": timed_cases_digest(recomputed),
+            **timings.to_dict(),
+        },
     }
-
-    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(history_record, indent=2))
-        f.write("\n" + "=" * 80 + "\n")
+    append_run(history_record, HISTORY_FILE)
 
     print("\n✅ METRICS GENERATED SUCCESSFULLY\n")
+    print(f"Recomputed {len(recomputed)} of {suite.count} cases"
+          + (f", reused {suite.count - len(recomputed)} from cache" if use_cache else ""))
+    if recomputed:
+        listed = ", ".join(recomputed[:MAX_LISTED_RECOMPUTED])
+        more = len(recomputed) - MAX_LISTED_RECOMPUTED
+        print(f"  {listed}" + (f" (+{more} more)" if more > 0 else ""))
+    latency = history_record["performance"].get("latency_ms")
+    if latency:
+        print(f"Latency over {history_record['performance']['cases_timed']} evaluated cases: "
+              f"p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, p99 {latency['p99']:.2f} ms")
+    if determinism_report is not None:
+        print_report(determinism_report)
+    print()
     for k, v in summary.items():
         print(f"{k}: {v:.3f}")
 
 
 if __name__ == "__main__":
-    run_all_metrics("datasets/golden_cases_v6.json")
+    parser = argparse.ArgumentParser(description="Run the PC-MLRA metrics evaluation")
+    parser.add_argument("--dataset", default="datasets/golden_cases_v6.json",
+                        help="a .json list or a streamed .jsonl file, relative to tests_metrices/")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="evaluation processes; 1 runs in-process, 0 uses every CPU")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="cases per pool task (default: about four chunks per worker, 64 for .jsonl)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="recompute every case instead of reusing cached detected outputs")
+    parser.add_argument("--hash-seeds", default=",".join(str(s) for s in DEFAULT_HASH_SEEDS),
+                        help="PYTHONHASHSEED values for the cross-process determinism check; empty disables it")
+    args = parser.parse_args()
+
+    run_all_metrics(
+        args.dataset,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        use_cache=not args.no_cache,
+        hash_seeds=parse_seeds(args.hash_seeds),
+    )
     print(">>> Entered main block <<<")
@@ -0,0 +1,38 @@
+# tests_metrices/tests/generators/test_synthetic_corpus.py
+
+from collections import Counter
+
+from src.intent_classifier import IntentClassifier
+from src.knowledge_loader import KnowledgeBase
+from tests_metrices.generators.synthetic_corpus import CorpusConfig, CorpusGenerator, load_profiles
+
+PROFILES = load_profiles(IntentClassifier(), KnowledgeBase())
+
+
+def generate(count, **config):
+    return list(CorpusGenerator(PROFILES, CorpusConfig(**config)).cases(count))
+
+
+def test_same_seed_same_corpus():
+    assert generate(200, seed=7) == generate(200, seed=7)
+    assert generate(200, seed=7) != generate(200, seed=8)
+
+
+def test_issues_are_distinct_known_intents():
+    intents = set(IntentClassifier().intents)
+
+    for case in generate(500, mix_probability=0.9, max_issues=3):
+        expected = case["expected_primary_legal_triggers"] + case["expected_secondary_legal_triggers"]
+        assert 1 <= len(expected) <= 3
+        assert len(set(expected)) == len(expected)
+        assert set(expected) <= intents
+        assert (case["scenario_type"] == "mixed") == (len(expected) > 1)
+
+
+def test_length_bounds_and_popularity_skew():
+    cases = generate(3000, max_words=60, zipf_exponent=1.5)
+
+    assert max(len(case["user_query"].split()) for case in cases) <= 60
+
+    counts = Counter(case["expected_primary_legal_triggers"][0] for case in cases).most_common()
+    assert counts[0][1] > 5 * counts[-1][1]
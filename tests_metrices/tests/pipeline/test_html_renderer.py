@@ -0,0 +1,74 @@
+# tests_metrices/tests/pipeline/test_html_renderer.py
+
+import re
+
+from src.engine import PCMLRAEngine, QueryOptions
+from src.html_renderer import CompiledComponent, render_markup
+from src.response_assembler import ResponseAssembler
+
+TAG = re.compile(r'<(/?)(h[1-3]|p|ul|ol|li|strong|em)>')
+
+
+def assert_balanced(html):
+    stack = []
+    for closing, tag in TAG.findall(html):
+        if closing:
+            assert stack and stack.pop() == tag, html
+        else:
+            stack.append(tag)
+    assert not stack, html
+
+
+def test_markup_pairs_tags_and_escapes():
+    html = render_markup("## Title\n**Bold:** a < b & *note*\n\n• one\n• **two**\n\n1. first\n2. second\n---\nstray * star")
+
+    print(html)
+
+    assert html == (
+        "<h2>Title</h2>"
+        "<p><strong>Bold:</strong> a &lt; b &amp; <em>note</em></p>"
+        "<ul><li>one</li><li><strong>two</strong></li></ul>"
+        "<ol><li>first</li><li>second</li></ol>"
+        "<hr>"
+        "<p>stray * star</p>"
+    )
+
+
+def test_compiled_component_escapes_variable_values():
+    component = CompiledComponent("**Your Rights:**\n{rights_bulleted}\n**Note:** {note}")
+    values = {"rights_bulleted": ["<b>read</b>", "copy"], "note": "**not** markup from <data>"}
+
+    html = component.render(values.get)
+
+    assert html == (
+        "<p><strong>Your Rights:</strong></p>"
+        "<ul><li>&lt;b&gt;read&lt;/b&gt;</li><li>copy</li></ul>"
+        "<p><strong>Note:</strong> <strong>not</strong> markup from &lt;data&gt;</p>"
+    )
+    assert component.variables == {"rights_bulleted", "note"}
+
+
+def test_engine_html_matches_text_and_is_cached():
+    engine = PCMLRAEngine(ResponseAssembler(response_cache_size=0))
+    queries = [
+        "The doctor shouted at me and refused to give my reports",
+        "Emergency! Hospital refused to admit my father after an accident",
+        "can the hospital keep my <belongings>?",
+    ]
+
+    for query in queries:
+        for show_proof in (True, False):
+            text_only = engine.answer(query, QueryOptions(show_proof=show_proof))
+            rendered = engine.answer(query, QueryOptions(show_proof=show_proof, html=True))
+            sections = engine.answer(query, QueryOptions(show_proof=show_proof, output_format="sections", html=True))
+
+            assert text_only.html is None
+            assert rendered.response == text_only.response
+            assert sections.html == rendered.html
+            assert_balanced(rendered.html)
+            assert "<belongings>" not in rendered.html
+            assert ("Proof Trace</strong></p>" in rendered.html) == show_proof
+
+    misses = engine.assembler.html_cache.misses
+    engine.answer(queries[0], QueryOptions(html=True))
+    assert engine.assembler.html_cache.misses == misses
@@ -0,0 +1,45 @@
+# tests_metrices/tests/pipeline/test_stage_timing.py
+
+from src.response_assembler import ResponseAssembler
+from src.stage_timing import STAGE_HISTOGRAMS, STAGES, StageHistograms
+
+
+def test_stage_timings_attached_on_request():
+    assembler = ResponseAssembler()
+    query = "The doctor shouted at me and refused to give my reports"
+
+    plain_text, plain_trace = assembler.generate_response(query)
+    timed_text, timed_trace = assembler.generate_response(query, collect_timings=True)
+
+    print(f"Stage timings: {timed_trace.stage_timings}")
+
+    assert timed_text == plain_text
+    assert plain_trace.stage_timings is None
+    assert "stage_timings" not in plain_trace.to_dict()
+    assert set(timed_trace.stage_timings) == set(STAGES)
+    assert all(seconds >= 0 for seconds in timed_trace.stage_timings.values())
+
+
+def test_histograms_are_cumulative():
+    histograms = StageHistograms(enabled=True, bounds=(0.001, 0.01))
+    histograms.record({"classify": 0.0005})
+    histograms.record({"classify": 0.005})
+    histograms.record({"classify": 0.5})
+
+    classify = histograms.snapshot()["classify"]
+
+    assert classify["buckets"] == [(0.001, 1), (0.01, 2), ("+Inf", 3)]
+    assert classify["count"] == 3
+
+
+def test_component_responses_record_stage_histograms(monkeypatch):
+    monkeypatch.setattr(STAGE_HISTOGRAMS, "enabled", True)
+    STAGE_HISTOGRAMS.reset()
+    try:
+        ResponseAssembler().generate_components("Doctor was rude to me")
+        stages = STAGE_HISTOGRAMS.snapshot()
+    finally:
+        STAGE_HISTOGRAMS.reset()
+
+    # Everything but the proof trace, which components leave to the caller
+    assert set(stages) == set(STAGES) - {"proof_formatting"}
@@ -0,0 +1,33 @@
+# tests_metrices/tests/safety/test_cross_process_determinism.py
+
+import pytest
+
+from tests_metrices.loaders.determinism_check import (
+    DeterminismReport,
+    SeedRuns,
+    check_determinism,
+    parse_seeds,
+)
+
+
+def test_golden_cases_match_across_hash_seeds():
+    report = check_determinism("datasets/golden_cases_v6.json", seeds=(0, 1, 2))
+
+    print(f"Cross-process determinism: {report.score:.3f}")
+
+    assert report.cases == 6
+    assert report.divergent == []
+    assert report.score == 1.0
+
+
+def test_report_scores_divergent_cases():
+    report = DeterminismReport(seeds=(0, 1), cases=4, divergent=[("TC_002", {0: "aa", 1: "bb"})])
+
+    assert report.score == 0.75
+
+
+def test_seed_parsing():
+    assert parse_seeds("0, 1,2") == (0, 1, 2)
+    assert parse_seeds("") == ()
+    with pytest.raises(ValueError):
+        SeedRuns("datasets/golden_cases_v6.json", seeds=(0,))
@@ -0,0 +1,44 @@
+# tests_metrices/tests/safety/test_fuzz_harness.py
+
+from src.response_assembler import ProofTrace
+from tests_metrices.fuzz_harness import LatencyBudget, check_query, minimize, run_fuzz
+from tests_metrices.generators.fuzz_inputs import STRATEGIES, FuzzConfig
+
+
+class CrashingAssembler:
+    """Raises whenever the query contains 'boom'"""
+
+    def generate_response(self, query, show_proof=True, collect_timings=False):
+        if "boom" in query:
+            raise ValueError("boom")
+        return "No matching rights found.", ProofTrace(query, [], [], "TEMPLATE_NO_MATCH_FOUND", [])
+
+
+def test_minimize_keeps_only_what_triggers_the_failure():
+    query = "the hospital said boom and then refused to discharge my father"
+
+    minimized = minimize(query, lambda q: "boom" in q)
+
+    assert minimized == "boom"
+
+
+def test_exceptions_are_reported_and_minimized():
+    assembler = CrashingAssembler()
+    query = "doctor was rude, boom!!! what are my rights"
+
+    _, failures = check_query(assembler, query)
+    minimized = minimize(query, lambda q: any(k == "exception" for k, _ in check_query(assembler, q)[1]))
+
+    assert failures == [("exception", "ValueError: boom")]
+    assert minimized == "boom"
+
+
+def test_every_strategy_holds_the_invariants():
+    count = len(STRATEGIES) * 6
+    # Generous budget: this checks correctness, not the machine running the tests
+    report = run_fuzz(count, FuzzConfig(seed=7, max_chars=8_000), LatencyBudget(base_seconds=1.0), keep_slowest=3)
+
+    assert report["failures"] == []
+    assert all(stats["inputs"] == 6 for stats in report["strategies"].values())
+    assert len(report["slowest"]) == 3
+    assert report["slowest"][0]["budget_used"] >= report["slowest"][-1]["budget_used"]
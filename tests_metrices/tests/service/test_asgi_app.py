@@ -0,0 +1,100 @@
+# tests_metrices/tests/service/test_asgi_app.py
+
+import asyncio
+import json
+
+from app import create_app
+from app.asgi import PCMLRAAsgiApp
+from src.engine import PCMLRAEngine
+
+
+def call(app, method, path, body=None, query_string=b"", headers=()):
+    """Run one request through the ASGI app; returns (status, headers, body)"""
+    messages = []
+    payload = json.dumps(body).encode() if body is not None else b""
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 5000),
+    }
+    asyncio.run(app(scope, receive, send))
+    start, body_message = messages
+    response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], response_headers, body_message["body"]
+
+
+def test_query_matches_flask_app():
+    asgi_app = PCMLRAAsgiApp(PCMLRAEngine())
+    flask_client = create_app().test_client()
+    query = {"query": "Hospital is charging too much", "show_proof": False}
+
+    status, headers, body = call(asgi_app, "POST", "/api/query", query)
+    expected = flask_client.post("/api/query", json=query).get_json()
+    result = json.loads(body)
+
+    assert status == 200
+    assert result["response"] == expected["response"]
+    assert result["intent"] == expected["intent"]
+    assert headers["set-cookie"].startswith("session=")
+
+    # The signed session cookie is accepted on the next request
+    cookie = headers["set-cookie"].split(";")[0]
+    _, again_headers, again = call(asgi_app, "POST", "/api/query", query, headers=[("cookie", cookie)])
+    assert json.loads(again)["session_id"] == result["session_id"]
+    assert "set-cookie" not in again_headers
+    assert asgi_app.chat_histories.get(result["session_id"])[-1]["query"] == query["query"]
+
+
+def test_read_only_routes_and_errors():
+    asgi_app = PCMLRAAsgiApp(PCMLRAEngine())
+
+    status, headers, body = call(asgi_app, "GET", "/api/system/stats")
+    assert status == 200 and json.loads(body)["system_status"] == "operational"
+    status, _, _ = call(asgi_app, "GET", "/api/system/stats", headers=[("if-none-match", headers["etag"])])
+    assert status == 304
+
+    status, _, body = call(asgi_app, "GET", "/api/knowledge/search", query_string=b"q=emergency")
+    assert status == 200 and json.loads(body)["total"] > 0
+
+    assert call(asgi_app, "GET", "/api/health")[0] == 200
+    assert call(asgi_app, "GET", "/api/query")[0] == 405
+    assert call(asgi_app, "GET", "/missing")[0] == 404
+    assert call(asgi_app, "POST", "/api/query", {"query": "  "})[0] == 400
+
+
+def test_flask_session_cookie_is_accepted():
+    flask_response = create_app().test_client().post("/api/query", json={"query": "hi"})
+    cookie = flask_response.headers["Set-Cookie"].split(";")[0]
+
+    _, headers, body = call(PCMLRAAsgiApp(None), "POST", "/api/query", {"query": "hi"}, headers=[("cookie", cookie)])
+
+    assert json.loads(body)["session_id"] == flask_response.get_json()["session_id"]
+    assert "set-cookie" not in headers
+
+
+def test_large_responses_are_compressed():
+    import gzip
+
+    asgi_app = PCMLRAAsgiApp(PCMLRAEngine())
+    query = {"query": "Doctor was rude to me"}
+
+    _, plain_headers, plain = call(asgi_app, "POST", "/api/query", query)
+    status, headers, body = call(asgi_app, "POST", "/api/query", query, headers=[("accept-encoding", "gzip")])
+
+    assert status == 200
+    assert "content-encoding" not in plain_headers
+    assert headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body))["response"] == json.loads(plain)["response"]
+    # Query bodies are per request: no validator, and If-None-Match does not skip the pipeline
+    assert "etag" not in headers
+    assert call(asgi_app, "POST", "/api/query", query, headers=[("if-none-match", '"anything"')])[0] == 200
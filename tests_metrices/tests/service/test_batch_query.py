@@ -0,0 +1,38 @@
+# tests_metrices/tests/service/test_batch_query.py
+
+import json
+
+from app import create_app
+
+
+def test_batch_streams_results_in_input_order():
+    client = create_app().test_client()
+    queries = [
+        "Doctor was rude to me",
+        "",
+        "I need a second opinion",
+        "Doctor was rude to me",
+    ]
+
+    response = client.post("/api/query/batch", json={"queries": queries})
+    items = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert items[1]["status"] == "error"
+    assert items[0]["response"] == items[3]["response"]
+
+    single = client.post("/api/query", json={"query": queries[2]}).get_json()
+    assert items[2]["response"] == single["response"]
+
+
+def test_batch_size_limit():
+    app = create_app()
+    limit = app.config["BATCH_MAX_QUERIES"]
+
+    response = app.test_client().post(
+        "/api/query/batch", json={"queries": ["help"] * (limit + 1)}
+    )
+
+    assert response.status_code == 413
@@ -0,0 +1,68 @@
+# tests_metrices/tests/service/test_compression.py
+
+import gzip
+import json
+
+import pytest
+
+from app import create_app
+from app.utils.compression import AVAILABLE_ENCODINGS, negotiate, parse_accept_encoding
+
+
+def test_query_responses_are_compressed_when_accepted():
+    client = create_app().test_client()
+    query = {"query": "Doctor was rude to me"}
+
+    plain = client.post("/api/query", json=query)
+    zipped = client.post("/api/query", json=query, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert len(zipped.data) < len(plain.data) / 2
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+
+    body = json.loads(gzip.decompress(zipped.data))
+    assert body["response"] == plain.get_json()["response"]
+
+
+def test_compressed_etags_revalidate():
+    client = create_app().test_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    zipped = client.get("/api/knowledge/search?q=emergency", headers=headers)
+    revalidated = client.get("/api/knowledge/search?q=emergency",
+                             headers={**headers, "If-None-Match": zipped.headers["ETag"]})
+
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert revalidated.status_code == 304
+
+
+def test_public_payloads_reuse_compressed_variants():
+    app = create_app()
+    client = app.test_client()
+
+    first = client.get("/api/knowledge/search?q=emergency", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/knowledge/search?q=emergency", headers={"Accept-Encoding": "gzip"})
+
+    assert first.data == second.data
+    assert app.compressed_variants.misses == 1
+    assert app.compressed_variants.hits == 1
+
+
+def test_streams_and_small_bodies_are_not_compressed():
+    client = create_app().test_client()
+
+    assert "Content-Encoding" not in client.get("/api/query/stream?q=hi", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/api/health", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_negotiation():
+    assert negotiate(parse_accept_encoding("")) is None
+    assert negotiate(parse_accept_encoding("gzip;q=0")) is None
+    assert negotiate(parse_accept_encoding("gzip, deflate")) == "gzip"
+    assert negotiate(parse_accept_encoding("*")) == AVAILABLE_ENCODINGS[0]
+
+
+def test_brotli_preferred_when_installed():
+    pytest.importorskip("brotli")
+    assert negotiate(parse_accept_encoding("gzip, br")) == "br"
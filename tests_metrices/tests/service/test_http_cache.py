@@ -0,0 +1,75 @@
+# tests_metrices/tests/service/test_http_cache.py
+
+import json
+
+from app import create_app
+
+
+def test_repeat_queries_are_answered_and_recorded():
+    app = create_app()
+    client = app.test_client()
+
+    first = client.post("/api/query", json={"query": "Doctor was rude to me"})
+
+    assert first.status_code == 200
+    assert "ETag" not in first.headers
+    assert first.headers["Cache-Control"] == app.config["API_QUERY_CACHE_CONTROL"]
+
+    # A stale validator on POST neither short-circuits the pipeline nor skips the chat history
+    repeat = client.post(
+        "/api/query",
+        json={"query": "  Doctor was   rude to me"},
+        headers={"If-None-Match": '"anything"'},
+    )
+    session_id = repeat.get_json()["session_id"]
+
+    assert repeat.status_code == 200
+    assert "ETag" not in repeat.headers
+    assert [e["query"] for e in app.chat_histories.get(session_id)] == [
+        "Doctor was rude to me", "Doctor was   rude to me"]
+
+
+def test_etag_depends_on_search_input():
+    client = create_app().test_client()
+
+    emergency = client.get("/api/knowledge/search?q=emergency")
+    consent = client.get("/api/knowledge/search?q=consent")
+
+    assert emergency.headers["ETag"] != consent.headers["ETag"]
+    assert client.get(
+        "/api/knowledge/search?q=emergency",
+        headers={"If-None-Match": emergency.headers["ETag"]},
+    ).status_code == 304
+
+
+
+def test_static_payloads_are_preserialized():
+    client = create_app().test_client()
+
+    first = client.get("/api/examples", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/examples", headers={"Accept-Encoding": "gzip"})
+
+    assert first.get_json()["examples"]
+    assert first.data == second.data
+    assert "Accept-Encoding" in first.headers["Vary"]
+    # Too small to benefit from gzip, so it is sent as-is
+    assert "Content-Encoding" not in first.headers
+
+
+def test_static_payload_gzip_variant():
+    import gzip
+
+    from app.services.payload_snapshot import PayloadSnapshot
+
+    payloads = {"big": {"items": ["Right to information"] * 50}, "small": {"ok": True}}
+    snapshot = PayloadSnapshot("fingerprint", payloads, json.dumps)
+
+    body, etag, encoding = snapshot["big"].variant("gzip")
+    plain_body, plain_etag, _ = snapshot["big"].variant(None)
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == plain_body
+    assert etag != plain_etag
+    assert snapshot["small"].variant("gzip")[2] is None
+
+    # Identical bytes in every worker
+    assert PayloadSnapshot("fingerprint", payloads, json.dumps)["big"].variant("gzip") == (body, etag, encoding)
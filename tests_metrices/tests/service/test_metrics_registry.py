@@ -0,0 +1,93 @@
+# tests_metrices/tests/service/test_metrics_registry.py
+
+import multiprocessing
+import os
+
+from app import create_app
+from app.services.metrics_registry import AGGREGATE_FILENAME, MetricsRegistry, clear_metrics_directory
+from src.stage_timing import STAGE_HISTOGRAMS
+
+
+def _worker(directory):
+    registry = MetricsRegistry(directory=directory)
+    registry.inc("pc_mlra_http_requests_total", {"route": "/api/query"}, 3)
+    registry.observe("pc_mlra_http_request_duration_seconds", 0.002, {"route": "/api/query"})
+    registry.add_collector(lambda snapshot: snapshot.gauge("pc_mlra_log_queue_depth", 7))
+    registry.flush()
+
+
+def test_counters_are_summed_across_worker_processes(tmp_path):
+    directory = str(tmp_path)
+    context = multiprocessing.get_context("fork")
+    for _ in range(2):
+        process = context.Process(target=_worker, args=(directory,))
+        process.start()
+        process.join()
+
+    registry = MetricsRegistry(directory=directory)
+    registry.inc("pc_mlra_http_requests_total", {"route": "/api/query"})
+    snapshot = registry.collect_all()
+
+    requests = snapshot.data["counters"]["pc_mlra_http_requests_total"]
+    latency = snapshot.data["histograms"]["pc_mlra_http_request_duration_seconds"]
+
+    assert list(requests.values()) == [7]
+    assert list(latency.values())[0]["buckets"][-1] == ["+Inf", 2]
+    # Gauges of exited workers are not reported
+    assert "pc_mlra_log_queue_depth" not in snapshot.data["gauges"]
+    # Exited workers were folded into the aggregate, and are not counted twice
+    assert set(os.listdir(directory)) == {".metrics.lock", AGGREGATE_FILENAME, registry._worker_filename()}
+    assert list(registry.collect_all().data["counters"]["pc_mlra_http_requests_total"].values()) == [7]
+
+
+def test_reused_pid_does_not_overwrite_counters(tmp_path):
+    directory = str(tmp_path)
+    # Two registries in one process stand in for two workers given the same pid
+    first = MetricsRegistry(directory=directory)
+    first.inc("pc_mlra_http_requests_total", value=5)
+    first.flush()
+    second = MetricsRegistry(directory=directory)
+    second.inc("pc_mlra_http_requests_total", value=2)
+
+    assert second.collect_all().data["counters"]["pc_mlra_http_requests_total"] == {"[]": 7}
+
+
+def test_clear_metrics_directory(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path))
+    registry.inc("pc_mlra_http_requests_total")
+    registry.collect_all()
+
+    clear_metrics_directory(str(tmp_path))
+
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("metrics_")]
+
+
+def test_metrics_endpoint_exposition():
+    client = create_app().test_client()
+    client.post("/api/query", json={"query": "Doctor was rude to me"})
+
+    response = client.get("/metrics")
+    body = response.data.decode()
+
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE pc_mlra_http_requests_total counter" in body
+    assert 'pc_mlra_http_requests_total{method="POST",route="/api/query",status="200"} 1' in body
+    assert 'pc_mlra_responses_by_intent_total{intent="doctor_misbehavior"} 1' in body
+    assert "pc_mlra_engine_info{fingerprint=" in body
+
+
+def test_query_route_records_stage_timings(monkeypatch):
+    monkeypatch.setattr(STAGE_HISTOGRAMS, "enabled", True)
+    STAGE_HISTOGRAMS.reset()
+    client = create_app().test_client()
+    try:
+        client.post("/api/query", json={"query": "Doctor was rude to me"})
+
+        stages = client.get("/api/debug/stage-timings").get_json()["stages"]
+        body = client.get("/metrics").data.decode()
+    finally:
+        STAGE_HISTOGRAMS.reset()
+
+    for stage in ("clean", "classify", "kb_retrieval", "template_selection", "fill", "disclaimer"):
+        assert stages[stage]["count"] == 1
+    assert 'pc_mlra_pipeline_stage_duration_seconds_count{stage="classify"} 1' in body
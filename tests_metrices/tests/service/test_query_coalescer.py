@@ -0,0 +1,63 @@
+# tests_metrices/tests/service/test_query_coalescer.py
+
+import threading
+import time
+
+from app.services.query_coalescer import QueryCoalescer
+
+
+def test_concurrent_identical_queries_share_one_run():
+    coalescer = QueryCoalescer()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "shared response"
+
+    results = []
+    queries = ["Doctor was rude to me", "  Doctor   was rude to me "] * 4
+
+    def worker(query):
+        key = coalescer.key_for(query, True)
+        results.append(coalescer.run(key, compute))
+
+    threads = [threading.Thread(target=worker, args=(q,)) for q in queries]
+    for t in threads:
+        t.start()
+
+    # Let every follower register before the leader finishes
+    deadline = time.time() + 5
+    while coalescer.stats()["requests_total"] < len(queries) and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+
+    for t in threads:
+        t.join()
+
+    stats = coalescer.stats()
+    print(f"Coalescing stats: {stats}")
+
+    assert len(calls) == 1
+    assert results == ["shared response"] * len(queries)
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == len(queries) - 1
+    assert stats["in_flight"] == 0
+
+
+def test_failed_run_propagates_and_is_not_cached():
+    coalescer = QueryCoalescer()
+    key = coalescer.key_for("hospital is charging too much")
+
+    def fail():
+        raise RuntimeError("pipeline down")
+
+    try:
+        coalescer.run(key, fail)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+
+    assert coalescer.run(key, lambda: "recovered") == "recovered"
+    assert coalescer.stats()["failed"] == 1
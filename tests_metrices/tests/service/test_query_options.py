@@ -0,0 +1,65 @@
+# tests_metrices/tests/service/test_query_options.py
+
+from app import create_app
+from src.engine import PCMLRAEngine, QueryOptions
+
+
+def test_console_commands_are_plain_queries_for_the_web_app():
+    client = create_app().test_client()
+
+    for command in ("proof off", "quit"):
+        response = client.post("/api/query", json={"query": command})
+        assert response.status_code == 200
+
+    # Another user's request still gets the proof trace
+    other = create_app().test_client()
+    body = other.post("/api/query", json={"query": "Can I get my medical reports?"}).get_json()
+    assert "**Proof Trace**" in body["response"]
+
+
+def test_show_proof_is_per_request():
+    client = create_app().test_client()
+
+    without = client.post("/api/query", json={"query": "Doctor was rude to me", "show_proof": False}).get_json()
+    with_proof = client.post("/api/query", json={"query": "Doctor was rude to me"}).get_json()
+
+    assert "**Proof Trace**" not in without["response"]
+    assert "**Proof Trace**" in with_proof["response"]
+    assert without["intent"] == with_proof["intent"] == "doctor_misbehavior"
+
+
+def test_invalid_options_are_rejected():
+    client = create_app().test_client()
+
+    assert client.post("/api/query", json={"query": "hi", "format": "xml"}).status_code == 400
+    assert client.post("/api/query", json={"query": "hi", "show_proof": "maybe"}).status_code == 400
+
+
+def test_sections_format_matches_text():
+    engine = PCMLRAEngine()
+    query = "Hospital is charging too much"
+
+    text = engine.answer(query)
+    sectioned = engine.answer(query, QueryOptions(output_format="sections"))
+
+    assert sectioned.response == text.response
+    assert sectioned.sections[-1][0] == "proof_trace"
+    assert sectioned.template_id == text.template_id
+
+
+def test_json_format_returns_components_without_text():
+    client = create_app().test_client()
+    query = "Doctor was rude to me"
+
+    body = client.post("/api/query", json={"query": query, "format": "json"}).get_json()
+    text = client.post("/api/query", json={"query": query}).get_json()
+
+    assert "response" not in body and "response_html" not in body
+    assert body["components"][0]["type"] == "header"
+    assert all(c["text"] in text["response"] for c in body["components"])
+    assert body["clauses"] == body["proof_trace"]["matched_clauses"]
+    assert body["clauses"][0]["id"] and body["clauses"][0]["citation"]
+    assert "**Proof Trace**" not in str(body["components"])
+
+    hidden = client.post("/api/query", json={"query": query, "format": "json", "show_proof": False}).get_json()
+    assert "proof_trace" not in hidden and hidden["clauses"] == body["clauses"]
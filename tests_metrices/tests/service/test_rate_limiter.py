@@ -0,0 +1,120 @@
+# tests_metrices/tests/service/test_rate_limiter.py
+
+import uuid
+
+import pytest
+
+from app import create_app
+from app.asgi import PCMLRAAsgiApp
+from app.services.rate_limiter import (
+    MemoryBucketStore, RateLimit, RateLimiter, SQLiteBucketStore, build_rate_limiter, parse_rate_limits
+)
+from tests_metrices.tests.service.test_asgi_app import call
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("200 per day, 50 per hour; 10/minute, 100 per 15 minutes") == (
+        RateLimit(200, 86400), RateLimit(50, 3600), RateLimit(10, 60), RateLimit(100, 900)
+    )
+    for spec in ("", "fast", "0 per hour", "10 per fortnight"):
+        with pytest.raises(ValueError):
+            parse_rate_limits(spec)
+
+
+@pytest.mark.parametrize("make_store", [MemoryBucketStore, lambda: None], ids=["memory", "sqlite"])
+def test_bucket_refills_continuously(make_store, tmp_path):
+    store = make_store() or SQLiteBucketStore(str(tmp_path / "buckets.sqlite3"))
+    limits = parse_rate_limits("2 per minute, 100 per day")
+
+    first = store.acquire("client", limits, want=5, now=1000.0)
+    empty = store.acquire("client", limits, want=1, now=1000.0)
+    refilled = store.acquire("client", limits, want=1, now=1030.0)
+
+    assert (first.granted, first.remaining) == (2, 0)
+    assert empty.granted == 0 and empty.retry_after == pytest.approx(30.0)
+    assert refilled.granted == 1
+    # The daily bucket kept counting
+    assert store.acquire("client", (limits[1],), want=100, now=1030.0).granted == 97
+
+
+def test_workers_share_one_quota(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    limits = parse_rate_limits("30 per hour")
+    # Two limiters over one file behave like two gunicorn workers
+    workers = [RateLimiter(limits, SQLiteBucketStore(path), lease_size=4) for _ in range(2)]
+
+    allowed = sum(workers[i % 2].hit("10.0.0.1|").allowed for i in range(60))
+
+    assert allowed == 30
+    assert not workers[0].hit("10.0.0.1|").allowed
+    assert workers[0].hit("10.0.0.2|").allowed
+
+
+def test_flask_app_reports_quota_and_rejects(monkeypatch):
+    monkeypatch.setenv("RATELIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATELIMIT_DEFAULT", "3 per minute")
+    monkeypatch.delenv("RATELIMIT_STORAGE_PATH", raising=False)
+    client = create_app().test_client()
+
+    responses = [client.get("/api/examples") for _ in range(4)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 429]
+    assert [r.headers["X-RateLimit-Remaining"] for r in responses] == ["2", "1", "0", "0"]
+    assert responses[0].headers["X-RateLimit-Limit"] == "3"
+    assert int(responses[3].headers["Retry-After"]) >= 1
+    assert client.get("/api/health").status_code == 200
+    assert "X-RateLimit-Limit" not in client.get("/").headers
+
+
+def test_rotating_the_session_cookie_does_not_reset_the_ip_quota(monkeypatch):
+    monkeypatch.setenv("RATELIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATELIMIT_DEFAULT", "3 per minute")
+    monkeypatch.setenv("RATELIMIT_PER_SESSION", "2 per minute")
+    monkeypatch.delenv("RATELIMIT_STORAGE_PATH", raising=False)
+    app = create_app()
+
+    def with_session(session_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["session_id"] = session_id
+        return client
+
+    # One session: the narrower per-session limit applies
+    client = with_session("kept")
+    assert [client.get("/api/examples").status_code for _ in range(3)] == [200, 200, 429]
+
+    # A fresh cookie per request: the per-IP limit still applies
+    app = create_app()
+    statuses = [with_session(str(uuid.uuid4())).get("/api/examples").status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_forwarded_clients_get_separate_buckets_behind_a_trusted_proxy(monkeypatch):
+    monkeypatch.setenv("RATELIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATELIMIT_DEFAULT", "2 per minute")
+    monkeypatch.delenv("RATELIMIT_STORAGE_PATH", raising=False)
+
+    def statuses(client, forwarded_for):
+        return [client.get("/api/examples", headers={"X-Forwarded-For": forwarded_for}).status_code
+                for _ in range(3)]
+
+    monkeypatch.setenv("RATELIMIT_TRUSTED_PROXIES", "1")
+    client = create_app().test_client()
+    assert statuses(client, "203.0.113.1") == [200, 200, 429]
+    assert statuses(client, "203.0.113.2") == [200, 200, 429]
+
+    # Without a trusted proxy the header is the client's word, and is ignored
+    monkeypatch.setenv("RATELIMIT_TRUSTED_PROXIES", "0")
+    client = create_app().test_client()
+    assert statuses(client, "203.0.113.1") == [200, 200, 429]
+    assert statuses(client, "203.0.113.2") == [429, 429, 429]
+
+
+def test_asgi_app_renews_shared_leases_off_the_event_loop(tmp_path):
+    limiter = build_rate_limiter("2 per minute", str(tmp_path / "buckets.sqlite3"))
+    asgi_app = PCMLRAAsgiApp(rate_limiter=limiter)
+
+    statuses = [call(asgi_app, "GET", "/api/system/stats")[0] for _ in range(3)]
+
+    assert limiter.blocking
+    assert statuses == [200, 200, 429]
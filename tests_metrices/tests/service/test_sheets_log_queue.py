@@ -0,0 +1,47 @@
+# tests_metrices/tests/service/test_sheets_log_queue.py
+
+import time
+
+from app.services.sheets_log_queue import SheetsLogQueue
+
+
+class FakeWorksheet:
+    def __init__(self):
+        self.rows = []
+
+    def append_row(self, row):
+        self.rows.append(row)
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def test_rows_are_written_in_background():
+    worksheet = FakeWorksheet()
+    log_queue = SheetsLogQueue(connect=lambda: worksheet)
+
+    # Rows queued before the connection exists are kept
+    assert log_queue.enqueue(["t0", "query 0"])
+    log_queue.start()
+    assert log_queue.enqueue(["t1", "query 1"])
+
+    _wait_for(lambda: log_queue.stats()["sent"] == 2)
+
+    assert worksheet.rows == [["t0", "query 0"], ["t1", "query 1"]]
+    assert log_queue.stats()["state"] == "connected"
+
+
+def test_unconfigured_sheets_never_block_requests():
+    log_queue = SheetsLogQueue(connect=lambda: None, max_size=1)
+    log_queue.enqueue(["t0", "pending"])
+    assert not log_queue.enqueue(["t1", "overflow"])
+
+    log_queue.start()
+    _wait_for(lambda: log_queue.stats()["dropped"] == 2)
+
+    assert not log_queue.enqueue(["t2", "ignored"])
+    assert log_queue.stats()["depth"] == 0
+    assert log_queue.stats()["dropped"] == 2
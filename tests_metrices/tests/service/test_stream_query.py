@@ -0,0 +1,47 @@
+# tests_metrices/tests/service/test_stream_query.py
+
+import json
+
+from app import create_app
+
+
+def _sse_events(body: str):
+    events = []
+    for block in body.split("\n\n"):
+        if not block.strip():
+            continue
+        event_line, data_line = block.split("\n", 1)
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_stream_matches_non_streaming_text():
+    client = create_app().test_client()
+    query = "The doctor shouted at me and refused to give my reports"
+
+    streamed = client.get("/api/query/stream", query_string={"q": query})
+    events = _sse_events(streamed.data.decode())
+    sections = [data for event, data in events if event == "section"]
+
+    full = client.post("/api/query", json={"query": query}).get_json()
+
+    assert streamed.mimetype == "text/event-stream"
+    assert sections[0]["section"] == "header"
+    assert sections[-1]["section"] == "proof_trace"
+    assert events[-1][0] == "done"
+    assert "".join(s["text"] for s in sections) == full["response"]
+
+
+def test_post_stream_keeps_query_out_of_url_and_ends_with_html():
+    client = create_app().test_client()
+    query = "Doctor was rude to me"
+
+    streamed = client.post("/api/query/stream", json={"query": query})
+    events = _sse_events(streamed.data.decode())
+
+    full = client.post("/api/query", json={"query": query}).get_json()
+
+    assert streamed.status_code == 200
+    assert "".join(data["text"] for event, data in events if event == "section") == full["response"]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["response_html"] == full["response_html"]
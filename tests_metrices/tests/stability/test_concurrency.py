@@ -0,0 +1,104 @@
+# tests_metrices/tests/stability/test_concurrency.py
+
+import copy
+import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import create_app
+from src.engine import PCMLRAEngine, QueryOptions
+
+THREADS = 8
+ROUNDS = 5
+
+QUERIES = [
+    case["user_query"]
+    for case in json.load(open("tests_metrices/datasets/golden_cases_v6.json", encoding="utf-8"))
+] + [
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "I need a second opinion",
+    "Hospital is charging too much",
+    "Emergency! Hospital refused to admit my father after an accident",
+    "The hospital will not release the body until we pay the bill",
+    "Was I enrolled in a clinical trial without consent?",
+    "proof off",
+    "quit",
+]
+
+
+def serial_answers(engine):
+    return {
+        (query, show_proof): engine.answer(query, QueryOptions(show_proof=show_proof)).response
+        for query in QUERIES for show_proof in (True, False)
+    }
+
+
+@pytest.mark.parametrize("cache_size", [0, 1024])
+def test_engine_is_identical_under_threads(cache_size):
+    from src.response_assembler import ResponseAssembler
+
+    engine = PCMLRAEngine(ResponseAssembler(response_cache_size=cache_size))
+    expected = serial_answers(PCMLRAEngine(ResponseAssembler(response_cache_size=0)))
+
+    def worker(seed):
+        # Each thread walks the queries in a different order
+        keys = list(expected)
+        keys = keys[seed:] + keys[:seed]
+        return [
+            (key, engine.answer(key[0], QueryOptions(show_proof=key[1])).response)
+            for _ in range(ROUNDS) for key in keys
+        ]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = [item for chunk in pool.map(worker, range(THREADS)) for item in chunk]
+
+    mismatches = [key for key, response in results if response != expected[key]]
+    assert not mismatches
+    assert len(results) == THREADS * ROUNDS * len(expected)
+
+
+def test_web_app_is_identical_under_threads():
+    app = create_app()
+    expected = {
+        query: app.test_client().post("/api/query", json={"query": query}).get_json()["response"]
+        for query in QUERIES
+    }
+
+    def worker(seed):
+        client = app.test_client()
+        return [
+            (query, client.post("/api/query", json={"query": query}).get_json()["response"])
+            for query in QUERIES[seed:] + QUERIES[:seed]
+        ]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = [item for chunk in pool.map(worker, range(THREADS)) for item in chunk]
+
+    assert all(response == expected[query] for query, response in results)
+
+
+def test_built_engine_is_read_only():
+    engine = PCMLRAEngine()
+    kb = engine.kb
+    clause = kb.get_all_clauses()[0]
+
+    with pytest.raises(TypeError):
+        clause["title"] = "changed"
+    with pytest.raises(TypeError):
+        kb.get_clauses_by_intent("emergency_care").append(clause)
+    with pytest.raises(TypeError):
+        engine.assembler.classifier.intents["emergency_care"]["keywords"].append("x")
+    with pytest.raises(TypeError):
+        engine.assembler.template_engine.templates.clear()
+
+    _, proof_trace = engine.assembler.generate_response("Doctor was rude to me")
+    with pytest.raises(TypeError):
+        proof_trace.matched_clauses.append(clause)
+
+    # Still usable as plain data
+    assert pickle.loads(pickle.dumps(clause)) == clause
+    assert copy.deepcopy(kb.data) is kb.data
+    assert json.loads(json.dumps(clause)) == clause
@@ -0,0 +1,47 @@
+# tests_metrices/tests/stability/test_decision_coverage.py
+
+from src.decision_coverage import DecisionCoverage
+from src.response_assembler import ResponseAssembler
+
+QUERIES = [
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "The hospital will not release the body until we pay the bill",
+    "The hospital will not release the body until we pay the bill",
+]
+
+
+def test_listener_counts_intents_clauses_templates_and_branches():
+    assembler = ResponseAssembler()
+    coverage = DecisionCoverage.for_assembler(assembler)
+    assembler.add_response_listener(coverage.observe)
+
+    traces = [assembler.generate_response(q)[1] for q in QUERIES]
+    snapshot = coverage.snapshot()
+
+    assert snapshot["responses"] == len(QUERIES)
+    assert snapshot["distinct_decisions"] == 3
+    assert snapshot["hits"]["templates"]["TEMPLATE_DISCLAIMER"] == len(QUERIES)
+    assert snapshot["hits"]["templates"]["TEMPLATE_RIGHT_TO_DISCHARGE_BODY"] == 2
+    assert snapshot["hits"]["branches"]["classify.nhrc15_first"] == 2
+    assert snapshot["hits"]["branches"]["decide.nhrc15_template"] == 2
+    for trace in traces:
+        for clause in trace.matched_clauses:
+            assert snapshot["hits"]["clauses"][clause["id"]] > 0
+    assert "classify.clinical_trial_first" in snapshot["unreached"]["branches"]
+
+
+def test_merge_and_unknown_names():
+    first = DecisionCoverage(intents=["emergency_care"], templates=["TEMPLATE_SINGLE_CLAUSE"])
+    second = DecisionCoverage()
+    first.add((("emergency_care",), ("NHRC-3",), "TEMPLATE_SINGLE_CLAUSE", ()))
+    second.add((("emergency_care",), ("NHRC-3",), "TEMPLATE_MISSING", ()), count=3)
+
+    first.merge(second)
+    snapshot = first.snapshot()
+
+    assert snapshot["responses"] == 4
+    assert snapshot["hits"]["intents"] == {"emergency_care": 4}
+    assert set(snapshot["unknown"]["templates"]) == {"TEMPLATE_MISSING", "TEMPLATE_DISCLAIMER"}
+    assert snapshot["unknown"]["clauses"] == ["NHRC-3"]
+    assert snapshot["coverage"]["templates"] == 1.0
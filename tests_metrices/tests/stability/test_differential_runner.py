@@ -0,0 +1,34 @@
+# tests_metrices/tests/stability/test_differential_runner.py
+
+from tests_metrices.differential_runner import REPO_ROOT, DiffReport, iter_diffs, signature_diff
+
+QUERIES = [
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "Hospital is charging too much",
+    "Emergency! Hospital refused to admit my father after an accident",
+    "The hospital will not release the body until we pay the bill",
+] * 3
+
+
+def test_signature_diff_reports_only_changed_parts():
+    old = (("emergency_care",), ("NHRC_EMERGENCY",), "TEMPLATE_RIGHT_TO_EMERGENCY_CARE")
+    new = (("emergency_care", "overcharging"), ("NHRC_EMERGENCY",), "TEMPLATE_MULTIPLE_CLAUSES")
+
+    diff = signature_diff(old, new)
+
+    assert set(diff) == {"intents", "template"}
+    assert diff["intents"]["added"] == ["overcharging"]
+    assert diff["intents"]["removed"] == []
+    assert diff["template"] == {"old": "TEMPLATE_RIGHT_TO_EMERGENCY_CARE", "new": "TEMPLATE_MULTIPLE_CLAUSES"}
+    assert signature_diff(old, old) == {}
+
+
+def test_same_build_has_no_divergent_queries():
+    report = DiffReport()
+
+    diffs = list(iter_diffs(str(REPO_ROOT), str(REPO_ROOT), QUERIES, workers=1, chunk_size=4, report=report))
+
+    assert diffs == []
+    assert report.queries == len(QUERIES)
+    assert report.divergent == 0
@@ -0,0 +1,30 @@
+# tests_metrices/tests/stability/test_evaluation_cache.py
+
+from tests_metrices.loaders.dataset_loader import load_dataset
+from tests_metrices.loaders.evaluation_cache import EvaluationCache, case_hash
+from tests_metrices.loaders.response_runner import ResponseRunner
+
+
+def test_cached_detected_outputs_follow_case_and_fingerprint(tmp_path):
+    runner = ResponseRunner()
+    case = load_dataset("datasets/golden_cases_v6.json")[0]
+    detected = runner.run_for_metrics(case["user_query"])
+    path = tmp_path / "cache.sqlite3"
+
+    with EvaluationCache(path, runner.fingerprint) as cache:
+        assert cache.get(case_hash(case)) is None
+        cache.put(case_hash(case), detected)
+
+    with EvaluationCache(path, ResponseRunner().fingerprint) as cache:
+        assert cache.get(case_hash(case)) == detected
+        assert cache.get(case_hash({**case, "user_query": case["user_query"] + "!"})) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    with EvaluationCache(path, "other-build") as cache:
+        assert cache.get(case_hash(case)) is None
+        assert cache.prune() == 1
+
+
+def test_case_hash_ignores_key_order():
+    assert case_hash({"a": 1, "b": [1, 2]}) == case_hash({"b": [1, 2], "a": 1})
+    assert case_hash({"a": 1}) != case_hash({"a": 2})
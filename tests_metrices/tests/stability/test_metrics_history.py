@@ -0,0 +1,81 @@
+# tests_metrices/tests/stability/test_metrics_history.py
+
+import json
+
+import pytest
+
+from tests_metrices.metrics_history import (
+    RunTimings, append_run, diff_runs, find_run, import_legacy, iter_runs, timed_cases_digest
+)
+
+
+def run(run_id, pci, p95_ms=None):
+    record = {"run_id": run_id, "summary": {"pipeline_correctness_index": pci}, "fingerprints": {"kb": run_id}}
+    if p95_ms is not None:
+        record["performance"] = {"latency_ms": {"p95": p95_ms}, "peak_rss_kib": 1000}
+    return record
+
+
+def test_run_timings_summarise_latency():
+    timings = RunTimings()
+    for ms in [0.2] * 90 + [3.0] * 10:
+        timings.record({"classify": ms / 2000, "total": ms / 1000})
+
+    summary = timings.to_dict()
+
+    assert summary["cases_timed"] == 100
+    assert summary["latency_ms"]["p50"] == pytest.approx(0.25)
+    assert summary["latency_ms"]["p99"] == pytest.approx(3.0)
+    assert summary["latency_ms"]["mean"] == pytest.approx(0.48)
+    assert set(summary["stages_us"]) == {"classify"}
+    assert RunTimings().to_dict() == {"cases_timed": 0}
+
+
+def test_history_appends_and_diffs(tmp_path):
+    path = tmp_path / "history.jsonl"
+    append_run(run("20260101T000000000-aaaaaa", 0.8, 2.0), path)
+    append_run(run("20260102T000000000-bbbbbb", 0.9, 3.0), path)
+
+    assert [r["run_id"] for r in iter_runs(path)] == ["20260101T000000000-aaaaaa", "20260102T000000000-bbbbbb"]
+    assert find_run("-1", path)["run_id"].endswith("bbbbbb")
+    assert find_run("20260101", path)["run_id"].endswith("aaaaaa")
+    with pytest.raises(KeyError):
+        find_run("2026", path)
+
+    lines = diff_runs(find_run("0", path), find_run("-1", path))
+
+    assert "  ✅ pipeline_correctness_index: 0.8000 → 0.9000 (+0.1000)" in lines
+    assert "Fingerprints changed: kb" in lines
+    assert "  ❌ latency p95 (ms): 2 → 3 (+50.0%)" in lines
+
+
+def test_legacy_history_is_imported_ahead_of_new_runs(tmp_path):
+    legacy = tmp_path / "metrics_history.json"
+    separator = "\n" + "=" * 80 + "\n"
+    legacy.write_text("".join(
+        json.dumps({"timestamp": f"2025-01-0{day}T10:00:00", "dataset": "d.json", "summary": {"x": day}}, indent=2) + separator
+        for day in (1, 2)
+    ), encoding="utf-8")
+    path = tmp_path / "history.jsonl"
+    append_run(run("20260101T000000000-aaaaaa", 0.8), path)
+
+    assert import_legacy(legacy, path) == 2
+    assert [r["summary"].get("x") for r in iter_runs(path)] == [1, 2, None]
+
+
+def test_diff_does_not_compare_timings_of_different_cases():
+    full = run("20260101T000000000-aaaaaa", 0.9, 2.0)
+    cached = run("20260102T000000000-aaaaaa", 0.9, 9.0)
+    full.update(cases=3, recomputed=3)
+    cached.update(cases=3, recomputed=1)
+    full["performance"].update(timed_cases=timed_cases_digest(["c", "a", "b"]), cases_timed=3, wall_seconds=10.0)
+    cached["performance"].update(timed_cases=timed_cases_digest(["b"]), cases_timed=1, wall_seconds=1.0)
+
+    lines = diff_runs(full, cached)
+
+    assert "     cases recomputed (rest from cache): 3/3 → 1/3" in lines
+    assert not [line for line in lines if "(ms)" in line or "wall time (s)" in line]
+    assert any("runs timed different cases (3 vs 1 timed)" in line for line in lines)
+    # The same cases, finished in another order, are comparable
+    cached["performance"]["timed_cases"] = timed_cases_digest(["a", "b", "c"])
+    assert "  ❌ latency p95 (ms): 2 → 9 (+350.0%)" in diff_runs(full, cached)
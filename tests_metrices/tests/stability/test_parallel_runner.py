@@ -0,0 +1,31 @@
+# tests_metrices/tests/stability/test_parallel_runner.py
+
+import json
+
+from tests_metrices.loaders.dataset_loader import load_dataset
+from tests_metrices.loaders.parallel_runner import chunked, evaluate_cases
+
+EXTRA_QUERIES = [
+    "Can I get my medical reports?",
+    "Doctor was rude to me",
+    "Hospital is charging too much",
+    "Emergency! Hospital refused to admit my father after an accident",
+    "The hospital will not release the body until we pay the bill",
+]
+
+
+def test_chunked_covers_every_item_in_order():
+    items = list(range(11))
+
+    chunks = list(chunked(items, 4))
+
+    assert chunks == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10]]
+
+
+def test_pool_matches_sequential_in_dataset_order():
+    cases = load_dataset("datasets/golden_cases_v6.json") + [{"user_query": q} for q in EXTRA_QUERIES]
+
+    sequential = evaluate_cases(cases, workers=1)
+    pooled = evaluate_cases(cases, workers=3, chunk_size=2)
+
+    assert json.dumps(pooled) == json.dumps(sequential)
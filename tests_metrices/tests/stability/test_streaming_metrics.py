@@ -0,0 +1,79 @@
+# tests_metrices/tests/stability/test_streaming_metrics.py
+
+import json
+
+import pytest
+
+from tests_metrices.loaders.dataset_loader import iter_dataset, load_dataset, write_jsonl
+from tests_metrices.loaders.parallel_runner import evaluate_cases, iter_evaluated
+from tests_metrices.metrics.accumulator import MetricSuite
+from tests_metrices.metrics.clause_metrics import (
+    ForbiddenClauseViolationRate,
+    ImcClausePrecision,
+    NhrcClauseCoverage,
+)
+from tests_metrices.metrics.ethics_metrics import ImcAwarenessAccuracy, MisconductAwarenessAccuracy
+from tests_metrices.metrics.intent_metrics import (
+    PrimaryIntentAccuracy,
+    SecondaryIntentRecall,
+    primary_intent_accuracy,
+    secondary_intent_recall,
+)
+from tests_metrices.metrics.proof_metrics import ProofCompletenessScore
+
+METRICS = [
+    ("primary_intent_accuracy", PrimaryIntentAccuracy),
+    ("secondary_intent_recall", SecondaryIntentRecall),
+    ("nhrc_clause_coverage", NhrcClauseCoverage),
+    ("forbidden_clause_violation_rate", ForbiddenClauseViolationRate),
+    ("imc_clause_precision", ImcClausePrecision),
+    ("imc_awareness_accuracy", ImcAwarenessAccuracy),
+    ("misconduct_awareness_accuracy", MisconductAwarenessAccuracy),
+    ("proof_completeness_score", ProofCompletenessScore),
+]
+
+
+@pytest.fixture
+def jsonl_dataset(tmp_path):
+    # Dataset paths resolve under tests_metrices/; an absolute path overrides that base
+    path = tmp_path / "golden.jsonl"
+    write_jsonl(load_dataset("datasets/golden_cases_v6.json"), path)
+    return str(path)
+
+
+def test_jsonl_streams_the_same_cases(jsonl_dataset):
+    assert list(iter_dataset(jsonl_dataset)) == load_dataset("datasets/golden_cases_v6.json")
+    assert load_dataset(jsonl_dataset) == load_dataset("datasets/golden_cases_v6.json")
+
+
+def test_jsonl_reports_bad_line(tmp_path):
+    path = tmp_path / "broken.jsonl"
+    path.write_text('{"user_query": "ok"}\n\n{not json}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError, match=":3:"):
+        list(iter_dataset(str(path)))
+
+
+def test_single_pass_suite_matches_list_metrics(jsonl_dataset):
+    records = [
+        {**case, **detected}
+        for case, detected in zip(load_dataset(jsonl_dataset), evaluate_cases(load_dataset(jsonl_dataset)))
+    ]
+    records[0]["detected_imc_clauses"] = ["IMC-6.1", "IMC-1.1.1"]
+
+    suite = MetricSuite(METRICS)
+    for record in records:
+        suite.update(record)
+    summary = suite.summary()
+
+    assert summary == {name: metric.over(records) for name, metric in METRICS}
+    assert summary["primary_intent_accuracy"] == primary_intent_accuracy(records)
+    assert summary["secondary_intent_recall"] == secondary_intent_recall(records)
+    assert suite.count == len(records)
+
+
+def test_streamed_pool_keeps_order(jsonl_dataset):
+    sequential = evaluate_cases(load_dataset(jsonl_dataset))
+    streamed = list(iter_evaluated(iter_dataset(jsonl_dataset), workers=2, chunk_size=1))
+
+    assert json.dumps(streamed) == json.dumps(sequential)